@@ -1,3 +1,9 @@
-from . import tapscript as tapscript
-
 __all__ = ["tapscript"]
+
+
+def __getattr__(name: str) -> object:
+    # Submodules load on first access so that `import ssv.cli` stays cheap.
+    if name in __all__:
+        import importlib
+        return importlib.import_module(f"{__name__}.{name}")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
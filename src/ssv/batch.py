@@ -0,0 +1,305 @@
+"""
+Batch helpers for high-volume vault work (streaming JSONL in, JSONL out).
+
+Records are processed in fixed-size chunks fanned out over a process pool;
+at most ``workers * 2`` chunks are in flight at any time, so memory stays
+bounded regardless of input size and results are emitted in input order.
+
+Finalize manifest lines use the ``ssv finalize`` option names (psbt_in,
+psbt_out, mode, sig, preimage, control, tapscript, require_anchor_*, ...);
+create-psbt manifest lines use the ``ssv create-psbt`` names (outpoint,
+amount, mode, hash_h, ..., internal_key or control, output, anchor, opret,
+psbt_out, format); estimate manifest lines use the ``ssv estimate`` names
+(psbt_in, index, mode, feerate, sig_bytes, tapscript, control, registry).
+
+Vault record fields (one JSON object per line):
+- h: 32-byte hex, sha256(s)
+- pk_b: 32-byte x-only borrower pubkey hex
+- pk_p: 32-byte x-only provider pubkey hex
+- csv_blocks: relative timelock in blocks (1-65535)
+- internal_key: 32-byte x-only Taproot internal key hex
+- id: optional caller reference, echoed back unchanged
+"""
+from __future__ import annotations
+
+import json
+import time
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .hexutil import parse_hex
+from .policy import PolicyParams
+from .registry import derive_vault
+
+DEFAULT_CHUNK_SIZE = 256
+_RECORD_PATHS = ('psbt_in', 'psbt_out', 'tx_out', 'tapscript_file', 'control_file', 'spec')
+
+Chunk = List[Tuple[int, str]]
+
+
+def _chunks(lines: Iterable[str], size: int) -> Iterator[Chunk]:
+    """Group non-blank lines into (line_no, text) chunks of at most ``size``."""
+    chunk: Chunk = []
+    for n, line in enumerate(lines, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        chunk.append((n, line))
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def ordered_chunk_map(
+    fn: Callable[[Chunk], List[Dict[str, Any]]],
+    lines: Iterable[str],
+    *,
+    workers: int = 1,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Iterator[Dict[str, Any]]:
+    """Apply ``fn`` to chunks of JSONL lines, yielding results in input order.
+
+    With ``workers <= 1`` everything runs inline (no pool). Otherwise chunks
+    are submitted to a process pool with a bounded number in flight.
+    """
+    if chunk_size <= 0:
+        raise ValueError('chunk_size must be positive')
+    if workers <= 1:
+        for chunk in _chunks(lines, chunk_size):
+            yield from fn(chunk)
+        return
+    pool: Executor = ProcessPoolExecutor(max_workers=workers)
+    try:
+        pending: Deque[Any] = deque()
+        for chunk in _chunks(lines, chunk_size):
+            pending.append(pool.submit(fn, chunk))
+            if len(pending) >= workers * 2:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+    finally:
+        pool.shutdown(cancel_futures=True)
+
+
+def build_vault(record: Dict[str, Any]) -> Dict[str, Any]:
+    """Derive tapscript, TapLeaf hash, output key and P2TR spk for one policy."""
+    params = PolicyParams(record.get('h'), record.get('pk_b'), record.get('pk_p'), record.get('csv_blocks'))
+    params.validate()
+    internal = parse_hex('internal_key', record.get('internal_key'), length=32)
+    vault = derive_vault(params, internal)
+    return {
+        'tapscript_hex': vault.tapscript.hex(),
+        'tapleaf_hash_tagged': vault.leaf_hash.hex(),
+        'output_key': vault.spk[2:].hex(),
+        'parity': vault.control[0] & 1,
+        'control_block_hex': vault.control.hex(),
+        'spk_hex': vault.spk.hex(),
+    }
+
+
+def _build_vault_chunk(chunk: Chunk) -> List[Dict[str, Any]]:
+    out: List[Dict[str, Any]] = []
+    for n, line in chunk:
+        row: Dict[str, Any] = {'line': n}
+        try:
+            record = json.loads(line)
+            if not isinstance(record, dict):
+                raise ValueError('record must be a JSON object')
+            if 'id' in record:
+                row['id'] = record['id']
+            row.update(build_vault(record))
+            row['ok'] = True
+        except Exception as e:
+            row['ok'] = False
+            row['error'] = str(e)
+        out.append(row)
+    return out
+
+
+def build_vaults(
+    lines: Iterable[str],
+    *,
+    workers: int = 1,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Iterator[Dict[str, Any]]:
+    """Stream vault records (JSONL lines) to result dicts in input order.
+
+    Invalid records do not abort the stream; they yield ``ok: False`` with an
+    ``error`` message and the 1-based ``line`` they came from.
+    """
+    return ordered_chunk_map(_build_vault_chunk, lines, workers=workers, chunk_size=chunk_size)
+
+
+_FINALIZE_PARSER: Any = None
+
+
+def _reject_stdio(record: Dict[str, Any]) -> None:
+    """Per-record paths may not be '-': stdin/stdout carry the manifest and the result rows."""
+    for key in _RECORD_PATHS:
+        if record.get(key) == '-':
+            raise ValueError(f"{key} may not be '-' in a manifest line (stdin/stdout carry the batch itself)")
+
+
+def _finalize_args(record: Dict[str, Any]) -> Any:
+    """Parse a manifest record into a finalize Namespace (parser built once per process)."""
+    global _FINALIZE_PARSER
+    import contextlib
+    import io
+    from .cli import argv_from_params, build_parser
+    _reject_stdio(record)
+    if _FINALIZE_PARSER is None:
+        _FINALIZE_PARSER = build_parser()
+    params = {k: v for k, v in record.items() if k != 'id'}
+    err = io.StringIO()
+    try:
+        with contextlib.redirect_stderr(err):
+            return _FINALIZE_PARSER.parse_args(argv_from_params('finalize', params))
+    except SystemExit:
+        lines = err.getvalue().strip().splitlines()
+        raise ValueError(lines[-1] if lines else 'invalid finalize arguments')
+
+
+def finalize_one(record: Dict[str, Any]) -> None:
+    """Run ``ssv finalize`` logic for one manifest record."""
+    from .cli import finalize_witness
+    finalize_witness(_finalize_args(record))
+
+
+def _finalize_chunk(chunk: Chunk) -> List[Dict[str, Any]]:
+    out: List[Dict[str, Any]] = []
+    for n, line in chunk:
+        row: Dict[str, Any] = {'line': n}
+        t0 = time.perf_counter()
+        try:
+            record = json.loads(line)
+            if not isinstance(record, dict):
+                raise ValueError('manifest line must be a JSON object')
+            if 'id' in record:
+                row['id'] = record['id']
+            row['psbt_out'] = record.get('psbt_out')
+            finalize_one(record)
+            row['ok'] = True
+        except Exception as e:
+            row['ok'] = False
+            row['error'] = f'{type(e).__name__}: {e}'
+        row['elapsed_ms'] = round((time.perf_counter() - t0) * 1e3, 3)
+        out.append(row)
+    return out
+
+
+def finalize_many(
+    lines: Iterable[str],
+    *,
+    workers: int = 1,
+    chunk_size: int = 16,
+) -> Iterator[Dict[str, Any]]:
+    """Finalize every PSBT named in a JSONL manifest, yielding per-line results.
+
+    A failing item yields ``ok: False`` with its error and never aborts the
+    rest of the batch.
+    """
+    return ordered_chunk_map(_finalize_chunk, lines, workers=workers, chunk_size=chunk_size)
+
+
+def _create_chunk(chunk: Chunk) -> List[Dict[str, Any]]:
+    from .psbtcreate import create_from_spec
+    from .psbtio import encode_psbt, write_output_bytes
+    out: List[Dict[str, Any]] = []
+    for n, line in chunk:
+        row: Dict[str, Any] = {'line': n}
+        try:
+            record = json.loads(line)
+            if not isinstance(record, dict):
+                raise ValueError('manifest line must be a JSON object')
+            if 'id' in record:
+                row['id'] = record['id']
+            _reject_stdio(record)
+            created = create_from_spec(record)
+            row['txid'] = created.txid
+            row['psbt_out'] = record.get('psbt_out')
+            if row['psbt_out']:
+                write_output_bytes(row['psbt_out'], encode_psbt(created.psbt, record.get('format') or 'base64'))
+            else:
+                row['psbt'] = encode_psbt(created.psbt, 'base64').decode()
+            row['ok'] = True
+        except Exception as e:
+            row['ok'] = False
+            row['error'] = f'{type(e).__name__}: {e}'
+        out.append(row)
+    return out
+
+
+def create_many(
+    lines: Iterable[str],
+    *,
+    workers: int = 1,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Iterator[Dict[str, Any]]:
+    """Build one unsigned PSBT per manifest line, yielding per-line results.
+
+    Lines without ``psbt_out`` get the base64 PSBT inline in the result row.
+    """
+    return ordered_chunk_map(_create_chunk, lines, workers=workers, chunk_size=chunk_size)
+
+
+def _estimate_chunk(chunk: Chunk) -> List[Dict[str, Any]]:
+    from .estimate import estimate_from_spec
+    out: List[Dict[str, Any]] = []
+    for n, line in chunk:
+        row: Dict[str, Any] = {'line': n}
+        try:
+            record = json.loads(line)
+            if not isinstance(record, dict):
+                raise ValueError('manifest line must be a JSON object')
+            if 'id' in record:
+                row['id'] = record['id']
+            row['psbt_in'] = record.get('psbt_in')
+            _reject_stdio(record)
+            row.update(estimate_from_spec(record))
+            row['ok'] = True
+        except Exception as e:
+            row['ok'] = False
+            row['error'] = f'{type(e).__name__}: {e}'
+        out.append(row)
+    return out
+
+
+def estimate_many(
+    lines: Iterable[str],
+    *,
+    workers: int = 1,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Iterator[Dict[str, Any]]:
+    """Project finalized size and fee for every PSBT named in a JSONL manifest."""
+    return ordered_chunk_map(_estimate_chunk, lines, workers=workers, chunk_size=chunk_size)
+
+
+def latency_summary(label: str, latencies_ms: List[float], errors: int, elapsed: float) -> str:
+    """Throughput plus p50/p95/max latency line for batch runs."""
+    if not latencies_ms:
+        return format_rate(label, 0, errors, elapsed, unit='items')
+    ordered = sorted(latencies_ms)
+
+    def pct(p: float) -> float:
+        return ordered[min(len(ordered) - 1, int(round(p * (len(ordered) - 1))))]
+
+    return (
+        format_rate(label, len(ordered), errors, elapsed, unit='items')
+        + f'; latency ms p50={pct(0.5):.2f} p95={pct(0.95):.2f} max={ordered[-1]:.2f}'
+    )
+
+
+def format_rate(label: str, count: int, errors: int, elapsed: float, unit: str = 'records') -> str:
+    rate = count / elapsed if elapsed > 0 else float('inf')
+    return f'{label}: {count} {unit} ({errors} errors) in {elapsed:.3f}s ({rate:.1f} {unit}/s)'
+
+
+def open_text(path: Optional[str], mode: str) -> Any:
+    """Open ``path`` for text IO; ``-`` or None maps to stdin/stdout."""
+    import sys
+    if path in (None, '-'):
+        return sys.stdin if 'r' in mode else sys.stdout
+    return open(path, mode)
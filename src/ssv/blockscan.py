@@ -0,0 +1,400 @@
+"""
+Raw block scanner: find SSV vault spends and the preimages they reveal.
+
+Input is a stream of serialized blocks, either bitcoind ``blk*.dat`` files
+(records of ``magic u32 | size u32 LE | block``, optionally obfuscated with
+the 8-byte key in the sibling ``xor.dat``) or text files with one hex block
+per line. Blocks are read and parsed one at a time and their rows emitted
+as soon as each block is scanned, so memory is bounded by the largest block
+rather than by the matches in a file. With several workers the parent
+indexes each file (record headers only) and hands out batches of blocks.
+
+Every witness whose last two elements (after dropping an annex) are a 0xC0
+control block and a tapscript matching :func:`ssv.tapscript.match_tapscript`
+is reported as one JSONL row:
+
+  {"block": <hash>, "txid": ..., "vin": i, "prevout": "<txid>:<n>",
+   "branch": "close" | "liquidate" | null, "hash_h": ..., "borrower_pk": ...,
+   "csv_blocks": n, "provider_pk": ..., "internal_key": ...,
+   "preimage": <hex> | null, "preimage_ok": true | false | null}
+
+CLOSE is ``[sig, s, IF_SELECTOR, tapscript, control]``; LIQUIDATE is
+``[sig, ELSE_SELECTOR, tapscript, control]`` (an empty selector, the
+MINIMALIF form, is accepted too). Other argument shapes are reported with
+``branch`` null. ``preimage_ok`` tells whether sha256(preimage) == hash_h.
+"""
+from __future__ import annotations
+
+import hashlib
+import os
+from collections import deque
+from typing import Any, Deque, Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+from .tapscript import LEAF_VERSION, match_tapscript
+from .witness import ELSE_SELECTOR, IF_SELECTOR, Branch
+
+BLOCK_FORMATS = ('blk', 'hex')
+NETWORK_MAGICS = {
+    bytes.fromhex('f9beb4d9'): 'main',
+    bytes.fromhex('0b110907'): 'testnet3',
+    bytes.fromhex('1c163f28'): 'testnet4',
+    bytes.fromhex('0a03cf40'): 'signet',
+    bytes.fromhex('fabfb5da'): 'regtest',
+}
+_HEADER_LEN = 80
+DEFAULT_BATCH_BLOCKS = 16
+_ANNEX_TAG = 0x50
+
+
+class ScanResult(NamedTuple):
+    path: str
+    rows: List[Dict[str, Any]]
+    blocks: int
+    txs: int
+    nbytes: int
+    error: Optional[str]
+
+
+def _compact(buf: Any, off: int) -> Tuple[int, int]:
+    if off >= len(buf):
+        raise ValueError('truncated block')
+    n = buf[off]
+    if n < 0xFD:
+        return n, off + 1
+    end = off + 1 + (2 if n == 0xFD else 4 if n == 0xFE else 8)
+    if end > len(buf):
+        raise ValueError('truncated block')
+    return int.from_bytes(buf[off + 1:end], 'little'), end
+
+
+def _sha256d(data: Any) -> bytes:
+    return hashlib.sha256(hashlib.sha256(data).digest()).digest()
+
+
+def match_witness(items: Sequence[Any]) -> Optional[Dict[str, Any]]:
+    """Recognize an SSV script-path witness stack; return its fields or None."""
+    if len(items) >= 2 and len(items[-1]) and items[-1][0] == _ANNEX_TAG:
+        items = items[:-1]
+    if len(items) < 3:
+        return None
+    control, script = items[-1], items[-2]
+    if len(control) < 33 or (len(control) - 33) % 32 or control[0] & 0xFE != LEAF_VERSION:
+        return None
+    params = match_tapscript(script)
+    if params is None:
+        return None
+    args = items[:-2]
+    branch: Optional[str] = None
+    preimage: Optional[bytes] = None
+    if len(args) == 3 and args[2] == IF_SELECTOR:
+        branch = Branch.CLOSE.value
+        preimage = bytes(args[1])
+    elif len(args) == 2 and (args[1] == ELSE_SELECTOR or len(args[1]) == 0):
+        branch = Branch.LIQUIDATE.value
+    preimage_ok = None
+    if preimage is not None:
+        preimage_ok = hashlib.sha256(preimage).hexdigest() == params.hash_h
+    return {
+        'branch': branch,
+        'hash_h': params.hash_h,
+        'borrower_pk': params.borrower_xonly,
+        'csv_blocks': params.csv_blocks,
+        'provider_pk': params.provider_xonly,
+        'internal_key': bytes(control[1:33]).hex(),
+        'preimage': None if preimage is None else preimage.hex(),
+        'preimage_ok': preimage_ok,
+    }
+
+
+def _scan_tx(buf: Any, off: int) -> Tuple[int, List[Tuple[int, Dict[str, Any]]], Optional[bytes]]:
+    """Walk one transaction at ``off``; return (end, [(vin, match)], txid or None).
+
+    The txid is only computed when the transaction contains a match.
+    """
+    start = off
+    segwit = off + 6 <= len(buf) and buf[off + 4] == 0 and buf[off + 5] == 1
+    p = off + 6 if segwit else off + 4
+    body = p
+    n_in, p = _compact(buf, p)
+    prevouts: List[int] = []
+    for _ in range(n_in):
+        prevouts.append(p)
+        slen, p = _compact(buf, p + 36)
+        p += slen + 4
+    n_out, p = _compact(buf, p)
+    for _ in range(n_out):
+        slen, p = _compact(buf, p + 8)
+        p += slen
+    body_end = p
+    hits: List[Tuple[int, Dict[str, Any]]] = []
+    if segwit:
+        for i in range(n_in):
+            n_items, p = _compact(buf, p)
+            if n_items < 3:  # key-path or v0 spend: just skip it
+                for _ in range(n_items):
+                    ln, p = _compact(buf, p)
+                    p += ln
+                continue
+            items = []
+            for _ in range(n_items):
+                ln, p = _compact(buf, p)
+                items.append(buf[p:p + ln])
+                p += ln
+            hit = match_witness(items)
+            if hit is not None:
+                po = prevouts[i]
+                hit['prevout'] = f"{bytes(buf[po:po + 32])[::-1].hex()}:{int.from_bytes(buf[po + 32:po + 36], 'little')}"
+                hits.append((i, hit))
+    end = p + 4
+    if end > len(buf):
+        raise ValueError('truncated block')
+    txid = None
+    if hits:
+        txid = _sha256d(b''.join([buf[start:start + 4], buf[body:body_end], buf[end - 4:end]]))
+    return end, hits, txid
+
+
+def scan_block(raw: Any) -> Tuple[int, List[Dict[str, Any]]]:
+    """Scan one serialized block; return (tx count, match rows)."""
+    with memoryview(raw) as buf:
+        if len(buf) < _HEADER_LEN + 1:
+            raise ValueError('truncated block')
+        block_hash = _sha256d(buf[:_HEADER_LEN])[::-1].hex()
+        n_tx, off = _compact(buf, _HEADER_LEN)
+        rows: List[Dict[str, Any]] = []
+        for _ in range(n_tx):
+            off, hits, txid = _scan_tx(buf, off)
+            if txid is not None:
+                display = txid[::-1].hex()
+                rows.extend(dict({'block': block_hash, 'txid': display, 'vin': vin}, **hit) for vin, hit in hits)
+        return n_tx, rows
+
+
+def _xor_key(path: str) -> Optional[bytes]:
+    """The blocksdir obfuscation key (bitcoind 28+), or None when unused."""
+    try:
+        with open(os.path.join(os.path.dirname(os.path.abspath(path)), 'xor.dat'), 'rb') as f:
+            key = f.read()
+    except FileNotFoundError:
+        return None
+    if len(key) != 8:
+        raise ValueError(f'xor.dat must hold an 8-byte key (got {len(key)} bytes)')
+    return key if any(key) else None
+
+
+def _unxor(data: bytes, key: bytes, offset: int) -> bytes:
+    n = len(data)
+    if not n:
+        return data
+    shift = offset % 8
+    stream = (key[shift:] + key[:shift]) * (n // 8 + 1)
+    return (int.from_bytes(data, 'little') ^ int.from_bytes(stream[:n], 'little')).to_bytes(n, 'little')
+
+
+def iter_blk_file(path: str) -> Iterator[bytes]:
+    """Yield the serialized blocks in a bitcoind ``blk*.dat`` file, one at a time.
+
+    Stops at zero padding (preallocated space) or a record cut short at EOF.
+    """
+    key = _xor_key(path)
+    with open(path, 'rb') as f:
+        off = 0
+        while True:
+            head = f.read(8)
+            if len(head) < 8:
+                return
+            if key is not None:
+                head = _unxor(head, key, off)
+            magic = head[:4]
+            if magic == b'\x00\x00\x00\x00':
+                return
+            if magic not in NETWORK_MAGICS:
+                raise ValueError(f'bad block magic {magic.hex()} at offset {off}')
+            size = int.from_bytes(head[4:], 'little')
+            block = f.read(size)
+            if len(block) < size:
+                return
+            if key is not None:
+                block = _unxor(block, key, off + 8)
+            off += 8 + size
+            yield block
+
+
+def iter_hex_file(path: str) -> Iterator[bytes]:
+    """Yield blocks from a text file with one hex-encoded block per line."""
+    from .hexutil import parse_hex
+    with open(path, 'rb') as f:
+        for n, line in enumerate(f, start=1):
+            if line.strip():
+                yield parse_hex(f'block on line {n}', line)
+
+
+def _check_format(fmt: str) -> None:
+    if fmt not in BLOCK_FORMATS:
+        raise ValueError(f'unknown block format {fmt!r} (expected one of: {", ".join(BLOCK_FORMATS)})')
+
+
+def scan_file(path: str, fmt: str = 'blk') -> Iterator[ScanResult]:
+    """Scan one file, yielding a result per block as it is scanned.
+
+    A damaged file stops at the first bad block with a final result that
+    carries the error (and no block).
+    """
+    _check_format(fmt)
+    reader = iter_blk_file if fmt == 'blk' else iter_hex_file
+    blocks = 0
+    try:
+        for block in reader(path):
+            n_tx, found = scan_block(block)
+            blocks += 1
+            yield ScanResult(path, found, 1, n_tx, len(block), None)
+    except (OSError, ValueError) as e:
+        yield ScanResult(path, [], 0, 0, 0, f'block {blocks}: {e}')
+
+
+Span = Tuple[int, int, Optional[int]]  # (byte offset, size, hex line number)
+
+
+def _blk_spans(path: str) -> Iterator[Span]:
+    """Locate the blocks of a ``blk*.dat`` file by reading record headers only."""
+    key = _xor_key(path)
+    with open(path, 'rb') as f:
+        end = os.fstat(f.fileno()).st_size
+        off = 0
+        while off + 8 <= end:
+            f.seek(off)
+            head = f.read(8)
+            if key is not None:
+                head = _unxor(head, key, off)
+            magic = head[:4]
+            if magic == b'\x00\x00\x00\x00':
+                return
+            if magic not in NETWORK_MAGICS:
+                raise ValueError(f'bad block magic {magic.hex()} at offset {off}')
+            size = int.from_bytes(head[4:], 'little')
+            if off + 8 + size > end:
+                return
+            yield off + 8, size, None
+            off += 8 + size
+
+
+def _hex_spans(path: str) -> Iterator[Span]:
+    with open(path, 'rb') as f:
+        off = 0
+        for n, line in enumerate(f, start=1):
+            if line.strip():
+                yield off, len(line), n
+            off += len(line)
+
+
+def _scan_spans(path: str, fmt: str, spans: List[Span], first: int) -> ScanResult:
+    """Pool task: scan a batch of located blocks of one file."""
+    from .hexutil import parse_hex
+    key = _xor_key(path) if fmt == 'blk' else None
+    rows: List[Dict[str, Any]] = []
+    blocks = txs = nbytes = 0
+    try:
+        with open(path, 'rb') as f:
+            for off, size, line in spans:
+                f.seek(off)
+                data = f.read(size)
+                if line is not None:
+                    data = parse_hex(f'block on line {line}', data)
+                elif key is not None:
+                    data = _unxor(data, key, off)
+                n_tx, found = scan_block(data)
+                blocks += 1
+                txs += n_tx
+                nbytes += len(data)
+                rows.extend(found)
+    except (OSError, ValueError) as e:
+        return ScanResult(path, rows, blocks, txs, nbytes, f'block {first + blocks}: {e}')
+    return ScanResult(path, rows, blocks, txs, nbytes, None)
+
+
+def _done(result: ScanResult) -> Any:
+    from concurrent.futures import Future
+    fut: Any = Future()
+    fut.set_result(result)
+    return fut
+
+
+def _file_tasks(pool: Any, path: str, fmt: str, batch_blocks: int) -> Iterator[Any]:
+    """Submit one file as batches of ``batch_blocks`` blocks; index errors become a final result."""
+    spans: List[Span] = []
+    first = 0
+    try:
+        for span in (_blk_spans if fmt == 'blk' else _hex_spans)(path):
+            spans.append(span)
+            if len(spans) >= batch_blocks:
+                yield pool.submit(_scan_spans, path, fmt, spans, first)
+                first += len(spans)
+                spans = []
+    except (OSError, ValueError) as e:
+        if spans:
+            yield pool.submit(_scan_spans, path, fmt, spans, first)
+            first += len(spans)
+        yield _done(ScanResult(path, [], 0, 0, 0, f'block {first}: {e}'))
+        return
+    if spans:
+        yield pool.submit(_scan_spans, path, fmt, spans, first)
+
+
+def expand_block_paths(paths: Iterable[str]) -> List[str]:
+    """Expand directories to their ``blk*.dat`` files (sorted); keep files as given."""
+    out: List[str] = []
+    for p in paths:
+        if os.path.isdir(p):
+            out.extend(sorted(os.path.join(p, n) for n in os.listdir(p) if n.startswith('blk') and n.endswith('.dat')))
+        else:
+            out.append(p)
+    return out
+
+
+def scan_files(
+    paths: Sequence[str],
+    *,
+    fmt: str = 'blk',
+    workers: int = 1,
+    batch_blocks: int = DEFAULT_BATCH_BLOCKS,
+) -> Iterator[ScanResult]:
+    """Scan files in order, yielding results in file and block order.
+
+    Inline, results are per block. With ``workers`` > 1, batches of
+    ``batch_blocks`` blocks are spread over a process pool with at most
+    ``workers * 2`` batches in flight; a file stops at its first error.
+    """
+    _check_format(fmt)
+    if workers <= 1:
+        for p in paths:
+            yield from scan_file(p, fmt)
+        return
+    from concurrent.futures import ProcessPoolExecutor
+    pool = ProcessPoolExecutor(max_workers=workers)
+    pending: Deque[Any] = deque()
+    failed = set()
+
+    def drain(limit: int) -> Iterator[ScanResult]:
+        while len(pending) > limit:
+            res = pending.popleft().result()
+            if res.path in failed:
+                continue  # batches queued past a file's first error
+            if res.error is not None:
+                failed.add(res.path)
+            yield res
+
+    try:
+        for p in paths:
+            for fut in _file_tasks(pool, p, fmt, batch_blocks):
+                pending.append(fut)
+                yield from drain(workers * 2)
+        yield from drain(0)
+    finally:
+        pool.shutdown(cancel_futures=True)
+
+
+def format_scan_rate(files: int, blocks: int, txs: int, nbytes: int, matches: int, errors: int, elapsed: float) -> str:
+    mb = nbytes / 1e6
+    rate = mb / elapsed if elapsed > 0 else float('inf')
+    return (f'scan-blocks: {files} files, {blocks} blocks, {txs} txs, {mb:.1f} MB in {elapsed:.3f}s '
+            f'({rate:.1f} MB/s); {matches} vault spends ({errors} errors)')
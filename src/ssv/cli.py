@@ -17,14 +17,11 @@ Notes
 """
 import argparse
 import sys
-from typing import Any, Optional, List, Dict, NamedTuple
+from typing import Any, Optional, List, Dict, Iterator, NamedTuple, Tuple
 
-from .tapscript import build_tapscript, tapleaf_hash, tapleaf_hash_tagged, disasm, pushdata as script_pushdata
-from .verify import verify_taproot_path
-from .hexutil import parse_hex, file_or_hex
-from .policy import PolicyParams
-from .psbtio import load_psbt_from_file, write_psbt, to_raw_tx_hex, cscript_witness, get_input_witness_spk_hex
-from .witness import Branch, build_witness
+# Subcommand handlers import their dependencies locally so that each
+# invocation only pays for the modules it actually uses (see
+# tools/bench_startup.py for the cold-start budget).
 
 
 class AnchorCheckResult(NamedTuple):
@@ -45,63 +42,47 @@ class OpretCheckResult(NamedTuple):
     actual_value: Optional[int]
 
 
-def cmd_build(args: argparse.Namespace) -> None:
+class OutputMatch(NamedTuple):
+    """An output whose spk (or OP_RETURN payload) matched; ``ok`` also requires the value."""
+    index: int
+    ok: bool
+    reason: Optional[str]
+    actual_spk: str
+    actual_value: Optional[int]
+
+
+def build_tapscript_info(hash_h: str, borrower_pk: str, csv_blocks: Any, provider_pk: str, *, with_disasm: bool = False) -> Dict[str, Any]:
+    """Validate the policy and return tapscript hex plus both TapLeaf hashes."""
+    from .policy import PolicyParams
+    from .tapscript import build_tapscript, tapleaf_hash, tapleaf_hash_tagged, disasm
     # validate via PolicyParams for clearer errors
-    PolicyParams(args.hash_h, args.borrower_pk, args.provider_pk, args.csv_blocks).validate()
-    script = build_tapscript(args.hash_h, args.borrower_pk, args.csv_blocks, args.provider_pk)
-    leaf_simple = tapleaf_hash(script)
-    leaf_tagged = tapleaf_hash_tagged(script)
+    params = PolicyParams(hash_h, borrower_pk, provider_pk, csv_blocks)
+    params.validate()
+    script = build_tapscript(hash_h, borrower_pk, params.csv_blocks, provider_pk)
+    out: Dict[str, Any] = {
+        'tapscript_hex': script.hex(),
+        'tapleaf_hash_simple': tapleaf_hash(script).hex(),
+        'tapleaf_hash_tagged': tapleaf_hash_tagged(script).hex(),
+    }
+    if with_disasm:
+        out['disasm'] = disasm(script)
+    return out
+
+
+def cmd_build(args: argparse.Namespace) -> None:
+    out = build_tapscript_info(args.hash_h, args.borrower_pk, args.csv_blocks, args.provider_pk, with_disasm=args.disasm)
     if args.json:
         import json
-        out = {
-            'tapscript_hex': script.hex(),
-            'tapleaf_hash_simple': leaf_simple.hex(),
-            'tapleaf_hash_tagged': leaf_tagged.hex(),
-        }
-        if args.disasm:
-            out['disasm'] = disasm(script)
         print(json.dumps(out))
     else:
-        print("tapscript_hex       =", script.hex())
-        print("tapleaf_hash_simple =", leaf_simple.hex())
-        print("tapleaf_hash_tagged =", leaf_tagged.hex())
+        print("tapscript_hex       =", out['tapscript_hex'])
+        print("tapleaf_hash_simple =", out['tapleaf_hash_simple'])
+        print("tapleaf_hash_tagged =", out['tapleaf_hash_tagged'])
         if args.disasm:
-            print("disasm        =", disasm(script))
+            print("disasm        =", out['disasm'])
 
 
 # PSBT/tx helpers and verifiers
-def _tx_from_psbt(psbt: Any) -> Any:
-    return getattr(psbt, 'tx', None) or getattr(psbt, 'unsigned_tx', None)
-
-
-def _get_vout_list(tx: Any) -> List[Any]:
-    vout = getattr(tx, 'vout', None)
-    if vout is None:
-        raise RuntimeError('Transaction has no outputs list (vout)')
-    return list(vout)
-
-
-def _get_out_value(out: Any) -> Optional[int]:
-    v = getattr(out, 'nValue', None)
-    if v is None:
-        v = getattr(out, 'value', None)
-    return None if v is None else int(v)
-
-
-def _require_non_negative_int(name: str, value: Any) -> int:
-    try:
-        ivalue = int(value)
-    except Exception as exc:  # pragma: no cover - defensive
-        raise ValueError(f'{name} must be an integer') from exc
-    if ivalue < 0:
-        raise ValueError(f'{name} must be non-negative')
-    return ivalue
-
-
-def _canonicalize_script_hex(name: str, script_hex: str) -> str:
-    return parse_hex(name, script_hex).hex()
-
-
 def _normalize_hex_arg(value: Optional[str]) -> Optional[str]:
     if value is None:
         return None
@@ -109,68 +90,111 @@ def _normalize_hex_arg(value: Optional[str]) -> Optional[str]:
 
 
 def verify_anchor_output(psbt: Any, index: int, spk_hex: str, value: int) -> AnchorCheckResult:
-    tx = _tx_from_psbt(psbt)
-    if tx is None:
-        raise RuntimeError('PSBT does not expose unsigned transaction (tx)')
-    vout = _get_vout_list(tx)
+    from .guards import anchor_guard, evaluate_guards, tx_outputs
+    vout = tx_outputs(psbt)
     if index < 0 or index >= len(vout):
         raise IndexError(f'output index {index} out of range (num_outputs={len(vout)})')
-    out_obj: Any = vout[index]
-    expected_spk = _canonicalize_script_hex('spk', spk_hex)
-    expected_value = _require_non_negative_int('value', value)
-    actual_spk: str = out_obj.scriptPubKey.hex().lower()
-    actual_value = _get_out_value(out_obj)
-    if actual_value is None:
-        raise RuntimeError('Could not read output value')
-    actual_value_int = int(actual_value)
-    ok_spk = (actual_spk == expected_spk)
-    ok_value = (actual_value_int == expected_value)
-    ok = ok_spk and ok_value
-    reason: Optional[str] = None if ok else ('spk mismatch' if not ok_spk else 'value mismatch')
-    return AnchorCheckResult(ok, reason, expected_spk, actual_spk, expected_value, actual_value_int)
+    res = evaluate_guards(vout, [anchor_guard(index, spk_hex, value)])[0]
+    return AnchorCheckResult(res.ok, res.reason, str(res.expected_spk), str(res.actual_spk), int(res.expected_value or 0), res.actual_value)
 
 
 def verify_opret_output(psbt: Any, index: int, data_hex: str, value: Optional[int] = None) -> OpretCheckResult:
-    tx = _tx_from_psbt(psbt)
-    if tx is None:
-        raise RuntimeError('PSBT does not expose unsigned transaction (tx)')
-    vout = _get_vout_list(tx)
+    from .guards import evaluate_guards, opret_guard, tx_outputs
+    vout = tx_outputs(psbt)
     if index < 0 or index >= len(vout):
         raise IndexError(f'output index {index} out of range (num_outputs={len(vout)})')
-    out_obj: Any = vout[index]
-    actual_spk: str = out_obj.scriptPubKey.hex().lower()
-    data_bytes = parse_hex('data', data_hex)
-    expected_spk: str = (b"\x6a" + script_pushdata(data_bytes)).hex()
-    ok_spk = (actual_spk == expected_spk)
-    actual_value_raw = _get_out_value(out_obj)
-    actual_value = None if actual_value_raw is None else int(actual_value_raw)
-    ok_value = True
-    expected_value: Optional[int] = None
-    if value is not None:
-        expected_value = _require_non_negative_int('value', value)
-        if actual_value is None:
-            raise RuntimeError('Could not read output value')
-        ok_value = (actual_value == expected_value)
-    ok = ok_spk and ok_value
-    reason: Optional[str] = None if ok else ('spk mismatch' if not ok_spk else 'value mismatch')
-    return OpretCheckResult(ok, reason, expected_spk, actual_spk, expected_value, actual_value)
+    res = evaluate_guards(vout, [opret_guard(index, data_hex, value)])[0]
+    return OpretCheckResult(res.ok, res.reason, str(res.expected_spk), str(res.actual_spk), res.expected_value, res.actual_value)
+
+
+def _matches(outputs: Any, indices: List[int], value: Optional[int]) -> List[OutputMatch]:
+    from .guards import output_value
+    found: List[OutputMatch] = []
+    for i in indices:
+        out = outputs[i]
+        actual = output_value(out)
+        ok = value is None or actual == value
+        found.append(OutputMatch(i, ok, None if ok else 'value mismatch', out.scriptPubKey.hex().lower(), actual))
+    return found
+
+
+def find_anchor_outputs(psbt: Any, spk_hex: str, value: Optional[int] = None, *, index: Any = None) -> List[OutputMatch]:
+    """Every output carrying ``spk_hex``, in output order.
+
+    ``index`` may be a prebuilt :class:`ssv.guards.OutputIndex` so several
+    lookups against one PSBT share a single pass over its outputs.
+    """
+    from .guards import OutputIndex, anchor_guard, tx_outputs
+    g = anchor_guard(None, spk_hex, 0 if value is None else value)
+    idx = index if index is not None else OutputIndex(tx_outputs(psbt))
+    return _matches(idx.outputs, idx.spk_indices(g.spk_hex or ''), value)
+
+
+def find_opret_outputs(psbt: Any, data_hex: str, value: Optional[int] = None, *, index: Any = None) -> List[OutputMatch]:
+    """Every ``OP_RETURN <data_hex>`` output, in output order (any push encoding)."""
+    from .guards import OutputIndex, opret_guard, tx_outputs
+    g = opret_guard(None, data_hex, value)
+    idx = index if index is not None else OutputIndex(tx_outputs(psbt))
+    return _matches(idx.outputs, idx.opret_indices(g.data_hex or ''), value)
+
+
+def _print_matches(label: str, args: argparse.Namespace, expected_spk: Optional[str], matches: List[OutputMatch]) -> None:
+    ok = any(m.ok for m in matches)
+    reason = None if ok else ('value mismatch' if matches else f'no {label} output found')
+    if args.json:
+        import json
+        print(json.dumps({
+            'ok': ok,
+            'index': None,
+            'expected_spk': expected_spk,
+            'expected_value': args.value,
+            'matches': [m._asdict() for m in matches],
+            'reason': reason,
+        }))
+        return
+    if ok:
+        print(f'[OK] {label} output found at index ' + ', '.join(str(m.index) for m in matches if m.ok))
+    else:
+        print(f'[FAIL] {label} output not found')
+    print('expected_spk  =', expected_spk)
+    if args.value is not None:
+        print('expected_sat  =', args.value)
+    for m in matches:
+        print(f'match         = index {m.index} value={m.actual_value}' + ('' if m.ok else f' ({m.reason})'))
+    if reason:
+        print('reason        =', reason)
 
 
 def cmd_verify_path(args: argparse.Namespace) -> None:
-    taps_hex = file_or_hex('tapscript', args.tapscript, args.tapscript_file).hex()
-    ctrl_hex = file_or_hex('control', args.control, args.control_file).hex()
-    spk_hex: Optional[str] = args.witness_spk
-    psbt_in: Optional[str] = args.psbt_in
-    if spk_hex is None and psbt_in is not None:
+    from .hexutil import file_or_hex, parse_hex
+    from .registry import registry_path_from_env
+    from .verify import check_taproot_path
+    registry = args.registry or registry_path_from_env()
+    tapscript = control = None
+    if args.tapscript or args.tapscript_file or not registry:
+        tapscript = file_or_hex('tapscript', args.tapscript, args.tapscript_file)
+    if args.control or args.control_file or not registry:
+        control = file_or_hex('control', args.control, args.control_file)
+    spk: Optional[bytes] = None
+    if args.witness_spk is not None:
+        spk = parse_hex('witness spk', args.witness_spk)
+    elif args.psbt_in is not None:
+        from .psbtcache import load_readonly_psbt
+        from .psbtio import get_input_witness_spk
         try:
-            psbt = load_psbt_from_file(psbt_in)
-        except Exception:
-            print('Install python-bitcointx to read PSBTs for verification', file=sys.stderr)
+            psbt = load_readonly_psbt(args.psbt_in)
+        except Exception as e:
+            print(f'ERROR: verify-path could not read PSBT ({e})', file=sys.stderr)
             raise
-        spk_hex = get_input_witness_spk_hex(psbt, 0)
-    if spk_hex is None:
+        spk = get_input_witness_spk(psbt, 0)
+    if spk is None:
         raise ValueError('Provide --witness-spk or --psbt-in')
-    res = verify_taproot_path(taps_hex, ctrl_hex, spk_hex)
+    if tapscript is None or control is None:
+        from .registry import resolve_spk
+        vault = resolve_spk(registry, spk)
+        tapscript = vault.tapscript if tapscript is None else tapscript
+        control = vault.control if control is None else control
+    res = check_taproot_path(tapscript, control, spk).as_dict()
     if args.json:
         import json
         print(json.dumps(res))
@@ -187,12 +211,16 @@ def cmd_verify_path(args: argparse.Namespace) -> None:
 
 
 def cmd_anchor_verify(args: argparse.Namespace) -> None:
+    from .psbtcache import load_readonly_psbt
     try:
-        psbt = load_psbt_from_file(args.psbt_in)
+        psbt = load_readonly_psbt(args.psbt_in)
     except Exception as e:
-        print(f'ERROR: anchor-verify requires python-bitcointx to read PSBTs ({e})', file=sys.stderr)
+        print(f'ERROR: anchor-verify could not read PSBT ({e})', file=sys.stderr)
         raise
     spk_arg = _normalize_hex_arg(args.spk)
+    if args.index is None:
+        _print_matches('anchor', args, spk_arg, find_anchor_outputs(psbt, spk_arg or '', args.value))
+        return
     res = verify_anchor_output(psbt, args.index, spk_arg, args.value)
     if args.json:
         import json
@@ -217,11 +245,17 @@ def cmd_anchor_verify(args: argparse.Namespace) -> None:
 
 
 def cmd_opret_verify(args: argparse.Namespace) -> None:
+    from .psbtcache import load_readonly_psbt
     try:
-        psbt = load_psbt_from_file(args.psbt_in)
+        psbt = load_readonly_psbt(args.psbt_in)
     except Exception as e:
-        print(f'ERROR: opret-verify requires python-bitcointx to read PSBTs ({e})', file=sys.stderr)
+        print(f'ERROR: opret-verify could not read PSBT ({e})', file=sys.stderr)
         raise
+    if args.index is None:
+        from .guards import opret_spk_hex
+        matches = find_opret_outputs(psbt, args.data, args.value)
+        _print_matches('OP_RETURN', args, opret_spk_hex(''.join(args.data.split())), matches)
+        return
     res = verify_opret_output(psbt, args.index, args.data, args.value)
     if args.json:
         import json
@@ -247,19 +281,17 @@ def cmd_opret_verify(args: argparse.Namespace) -> None:
 
 
 def cmd_anchor_show(args: argparse.Namespace) -> None:
+    from .psbtcache import load_readonly_psbt
     try:
-        psbt = load_psbt_from_file(args.psbt_in)
+        psbt = load_readonly_psbt(args.psbt_in)
     except Exception as e:
-        print(f'ERROR: anchor-show requires python-bitcointx to read PSBTs ({e})', file=sys.stderr)
+        print(f'ERROR: anchor-show could not read PSBT ({e})', file=sys.stderr)
         raise
-    tx = _tx_from_psbt(psbt)
-    if tx is None:
-        raise RuntimeError('PSBT does not expose unsigned transaction (tx)')
-    vout = _get_vout_list(tx)
+    from .guards import output_value, tx_outputs
     rows: List[Dict[str, Any]] = []
-    for i, out_obj in enumerate(vout):
+    for i, out_obj in enumerate(tx_outputs(psbt)):
         spk = out_obj.scriptPubKey.hex()
-        val = _get_out_value(out_obj)
+        val = output_value(out_obj)
         rows.append({'index': i, 'value': val, 'spk': spk})
     if args.json:
         import json
@@ -267,86 +299,474 @@ def cmd_anchor_show(args: argparse.Namespace) -> None:
     else:
         for r in rows:
             print(f"{r['index']}: value={r['value']} spk={r['spk']}")
-def finalize_witness(args: argparse.Namespace) -> None:
+
+
+def cmd_build_vaults(args: argparse.Namespace) -> None:
+    import json
+    import time
+    from .batch import build_vaults, format_rate, open_text
+    src = open_text(args.input, 'rt')
+    dst = open_text(args.output, 'wt')
+    count = errors = 0
+    t0 = time.perf_counter()
     try:
-        CScriptWitness = cscript_witness()
-    except Exception:
-        print("ERROR: finalize requires python-bitcointx. Install with: pip install python-bitcointx", file=sys.stderr)
-        raise
+        for row in build_vaults(src, workers=args.workers, chunk_size=args.chunk_size):
+            count += 1
+            if not row['ok']:
+                errors += 1
+            dst.write(json.dumps(row) + '\n')
+        dst.flush()
+    finally:
+        if src is not sys.stdin:
+            src.close()
+        if dst is not sys.stdout:
+            dst.close()
+    print(format_rate('build-vaults', count, errors, time.perf_counter() - t0), file=sys.stderr)
+
+
+def cmd_finalize_batch(args: argparse.Namespace) -> None:
+    import json
+    import time
+    from .batch import finalize_many, latency_summary, open_text
+    src = open_text(args.manifest, 'rt')
+    dst = open_text(args.output, 'wt')
+    latencies: List[float] = []
+    errors = 0
+    t0 = time.perf_counter()
+    try:
+        for row in finalize_many(src, workers=args.workers, chunk_size=args.chunk_size):
+            latencies.append(row['elapsed_ms'])
+            if not row['ok']:
+                errors += 1
+            dst.write(json.dumps(row) + '\n')
+            dst.flush()
+    finally:
+        if src is not sys.stdin:
+            src.close()
+        if dst is not sys.stdout:
+            dst.close()
+    print(latency_summary('finalize-batch', latencies, errors, time.perf_counter() - t0), file=sys.stderr)
+
+
+def _combine_paths(args: argparse.Namespace) -> Iterator[str]:
+    yield from args.psbt_in or []
+    if args.from_list:
+        from .batch import open_text
+        src = open_text(args.from_list, 'rt')
+        try:
+            for line in src:
+                if line.strip():
+                    yield line.strip()
+        finally:
+            if src is not sys.stdin:
+                src.close()
+
+
+def cmd_combine(args: argparse.Namespace) -> None:
+    from .psbtio import combine_by_txid, combine_files, encode_psbt, read_psbt_bytes, write_output_bytes
+    if not args.batch:
+        if not args.psbt_out:
+            raise ValueError('--psbt-out is required (or use --batch --out-dir)')
+        write_output_bytes(args.psbt_out, encode_psbt(combine_files(_combine_paths(args)), args.format))
+        return
+
+    import json
+    import os
+    import time
+    if not args.out_dir:
+        raise ValueError('--batch requires --out-dir')
+    os.makedirs(args.out_dir, exist_ok=True)
+    read_errors: List[Dict[str, Any]] = []
+
+    def _read_all() -> Iterator[bytes]:
+        for path in _combine_paths(args):
+            try:
+                yield read_psbt_bytes(path)
+            except (OSError, ValueError) as e:
+                read_errors.append({'path': path, 'ok': False, 'error': f'{type(e).__name__}: {e}'})
+
+    t0 = time.perf_counter()
+    groups = combine_by_txid(_read_all())
+    errors = len(read_errors)
+    for g in groups:
+        row: Dict[str, Any] = {'txid': g.txid, 'count': g.count, 'ok': g.error is None}
+        if g.psbt is not None:
+            row['psbt_out'] = os.path.join(args.out_dir, f'{g.txid}.psbt')
+            write_output_bytes(row['psbt_out'], encode_psbt(g.psbt, args.format))
+        else:
+            errors += 1
+            row['error'] = g.error
+        print(json.dumps(row))
+    for row in read_errors:
+        print(json.dumps(row))
+    from .batch import format_rate
+    print(format_rate('combine', len(groups) + len(read_errors), errors, time.perf_counter() - t0, unit='groups'),
+          file=sys.stderr)
+
+
+def cmd_scan_blocks(args: argparse.Namespace) -> None:
+    import json
+    import time
+    from .batch import open_text
+    from .blockscan import expand_block_paths, format_scan_rate, scan_files
+    paths = expand_block_paths(args.paths)
+    if not paths:
+        raise ValueError('no block files to scan')
+    dst = open_text(args.output, 'wt')
+    blocks = txs = nbytes = matches = errors = 0
+    t0 = time.perf_counter()
+    try:
+        for res in scan_files(paths, fmt=args.format, workers=args.workers):
+            blocks += res.blocks
+            txs += res.txs
+            nbytes += res.nbytes
+            matches += len(res.rows)
+            for row in res.rows:
+                dst.write(json.dumps(row) + '\n')
+            if res.error is not None:
+                errors += 1
+                dst.write(json.dumps({'file': res.path, 'ok': False, 'error': res.error}) + '\n')
+            dst.flush()
+    finally:
+        if dst is not sys.stdout:
+            dst.close()
+    print(format_scan_rate(len(paths), blocks, txs, nbytes, matches, errors, time.perf_counter() - t0), file=sys.stderr)
+
+
+def cmd_registry_import(args: argparse.Namespace) -> None:
+    import json
+    import time
+    from .batch import format_rate, open_text
+    from .registry import import_vaults, open_registry
+    src = open_text(args.input, 'rt')
+    count = errors = 0
+    t0 = time.perf_counter()
+    try:
+        with open_registry(args.registry, create=True, cached=False) as reg:
+            for row in import_vaults(reg, src, workers=args.workers, chunk_size=args.chunk_size):
+                count += 1
+                if not row['ok']:
+                    errors += 1
+                    print(json.dumps(row))
+    finally:
+        if src is not sys.stdin:
+            src.close()
+    print(format_rate('registry-import', count, errors, time.perf_counter() - t0, unit='vaults'), file=sys.stderr)
+
+
+def cmd_registry_show(args: argparse.Namespace) -> None:
+    import json
+    from .hexutil import parse_hex
+    from .registry import open_registry
+    with open_registry(args.registry, cached=False) as reg:
+        if args.outpoint:
+            vault = reg.lookup_outpoint(args.outpoint)
+            key = args.outpoint
+        elif args.spk:
+            vault = reg.lookup_spk(parse_hex('spk', args.spk))
+            key = args.spk
+        else:
+            raise ValueError('Provide --spk or --outpoint')
+    if vault is None:
+        raise ValueError(f'no vault registered for {key}')
+    print(json.dumps(vault.as_dict()))
+
+
+def cmd_taptree(args: argparse.Namespace) -> None:
+    import json
+    from .hexutil import parse_hex
+    from .taptree import build_taptree, leaves_from_json
+    with open(args.leaves, 'rt') as f:
+        leaves = leaves_from_json(json.load(f))
+    tree = build_taptree(leaves, parse_hex('internal_key', args.internal_key, length=32))
+    print(json.dumps(tree.as_dict()))
+
+
+def cmd_estimate(args: argparse.Namespace) -> None:
+    import json
+    if args.manifest:
+        import time
+        from .batch import estimate_many, format_rate, open_text
+        src = open_text(args.manifest, 'rt')
+        dst = open_text(args.output, 'wt')
+        count = errors = 0
+        t0 = time.perf_counter()
+        try:
+            for row in estimate_many(src, workers=args.workers, chunk_size=args.chunk_size):
+                count += 1
+                if not row['ok']:
+                    errors += 1
+                dst.write(json.dumps(row) + '\n')
+        finally:
+            if src is not sys.stdin:
+                src.close()
+            if dst is not sys.stdout:
+                dst.close()
+        print(format_rate('estimate', count, errors, time.perf_counter() - t0, unit='psbts'), file=sys.stderr)
+        return
+    if not args.psbt_in:
+        raise ValueError('Provide --psbt-in (or --manifest for batch mode)')
+    from .estimate import estimate_from_spec
+    print(json.dumps(estimate_from_spec(vars(args))))
+
+
+def cmd_create_psbt(args: argparse.Namespace) -> None:
+    import json
+    if args.manifest:
+        import time
+        from .batch import create_many, format_rate, open_text
+        src = open_text(args.manifest, 'rt')
+        dst = open_text(args.output_rows, 'wt')
+        count = errors = 0
+        t0 = time.perf_counter()
+        try:
+            for row in create_many(src, workers=args.workers, chunk_size=args.chunk_size):
+                count += 1
+                if not row['ok']:
+                    errors += 1
+                dst.write(json.dumps(row) + '\n')
+            dst.flush()
+        finally:
+            if src is not sys.stdin:
+                src.close()
+            if dst is not sys.stdout:
+                dst.close()
+        print(format_rate('create-psbt', count, errors, time.perf_counter() - t0, unit='psbts'), file=sys.stderr)
+        return
+
+    from .psbtcreate import create_from_spec
+    from .psbtio import encode_psbt, write_output_bytes
+    missing = [f'--{k.replace("_", "-")}' for k in ('outpoint', 'amount', 'mode', 'psbt_out') if getattr(args, k) is None]
+    if missing:
+        raise ValueError(f'missing required option(s): {", ".join(missing)} (or use --manifest)')
+    created = create_from_spec(vars(args))
+    write_output_bytes(args.psbt_out, encode_psbt(created.psbt, args.format))
+    if args.json:
+        print(json.dumps({'txid': created.txid, 'vault_spk': created.vault_spk, 'n_sequence': created.n_sequence,
+                          'psbt_out': args.psbt_out}))
+
+
+def cmd_serve(args: argparse.Namespace) -> None:
+    from .server import serve_forever
+    serve_forever(args.socket, workers=args.workers)
+
+
+_FINALIZE_INPUT_FIELDS = (
+    'input_index', 'mode', 'sig', 'preimage', 'control', 'control_file',
+    'tapscript', 'tapscript_file', 'hash_h', 'borrower_pk', 'csv_blocks', 'provider_pk',
+)
+
+
+def _load_finalize_spec(path: str) -> List[Dict[str, Any]]:
+    """Read a finalize spec: a JSON list of per-input objects (or {"inputs": [...]})."""
+    import json
+    with open(path, 'rt') as f:
+        data = json.load(f)
+    if isinstance(data, dict):
+        data = data.get('inputs')
+    if not isinstance(data, list) or not data:
+        raise ValueError('finalize spec must be a non-empty JSON list of inputs (or {"inputs": [...]})')
+    specs: List[Dict[str, Any]] = []
+    for i, entry in enumerate(data):
+        if not isinstance(entry, dict):
+            raise ValueError(f'spec entry {i}: must be a JSON object')
+        norm = {k.replace('-', '_'): v for k, v in entry.items()}
+        unknown = sorted(set(norm) - set(_FINALIZE_INPUT_FIELDS))
+        if unknown:
+            raise ValueError(f'spec entry {i}: unknown field(s) {", ".join(unknown)}')
+        if norm.get('mode') not in ('borrower', 'provider'):
+            raise ValueError(f"spec entry {i}: mode must be 'borrower' or 'provider'")
+        if 'input_index' not in norm:
+            raise ValueError(f'spec entry {i}: input_index is required')
+        index = norm['input_index']
+        if not isinstance(index, int) or isinstance(index, bool):
+            raise ValueError(f'spec entry {i}: input_index must be an integer (got {index!r})')
+        specs.append(norm)
+    return specs
+
+
+def _needs_registry(spec: Dict[str, Any]) -> bool:
+    has_script = spec.get('tapscript') or spec.get('tapscript_file') or spec.get('hash_h')
+    return not (has_script and (spec.get('control') or spec.get('control_file')))
+
+
+def _resolve_from_registry(spec: Dict[str, Any], psbt: Any, registry: str) -> Dict[str, Any]:
+    """Fill a finalize entry's missing tapscript/control from the vault registry."""
+    from .psbtio import get_input_witness_spk
+    from .registry import resolve_spk
+    idx = int(spec['input_index'])
+    if idx < 0 or idx >= len(psbt.inputs):
+        raise IndexError(f"Input index {idx} out of range")
+    vault = resolve_spk(registry, get_input_witness_spk(psbt, idx))
+    out = dict(spec)
+    if not (spec.get('tapscript') or spec.get('tapscript_file') or spec.get('hash_h')):
+        out['tapscript'] = vault.tapscript.hex()
+    if not (spec.get('control') or spec.get('control_file')):
+        out['control'] = vault.control.hex()
+    return out
+
+
+def build_input_witness(spec: Dict[str, Any]) -> List[bytes]:
+    """Validate one input's finalize fields and return its witness stack.
+
+    ``spec`` uses the ``ssv finalize`` option names (``mode``, ``sig``,
+    ``preimage``, ``control``/``control_file``, ``tapscript``/``tapscript_file``
+    or ``hash_h``/``borrower_pk``/``csv_blocks``/``provider_pk``).
+    """
+    from .hexutil import parse_hex, file_or_hex
+    from .policy import PolicyParams
+    from .tapscript import build_tapscript
+    from .witness import Branch, build_witness
 
     # tapscript can come from hex or file, else we build
-    if args.tapscript or getattr(args, 'tapscript_file', None):
-        tapscript = file_or_hex('tapscript', args.tapscript, getattr(args, 'tapscript_file', None))
+    if spec.get('tapscript') or spec.get('tapscript_file'):
+        tapscript = file_or_hex('tapscript', spec.get('tapscript'), spec.get('tapscript_file'))
     else:
-        if not (args.hash_h and args.borrower_pk and args.csv_blocks and args.provider_pk):
+        hash_h, borrower_pk, csv_blocks, provider_pk = (spec.get(k) for k in ('hash_h', 'borrower_pk', 'csv_blocks', 'provider_pk'))
+        if not (hash_h and borrower_pk and csv_blocks and provider_pk):
             raise ValueError("Either --tapscript[(-file)] or (--hash-h --borrower-pk --csv-blocks --provider-pk) must be supplied")
-        PolicyParams(args.hash_h, args.borrower_pk, args.provider_pk, args.csv_blocks).validate()
-        tapscript = build_tapscript(args.hash_h, args.borrower_pk, args.csv_blocks, args.provider_pk)
+        params = PolicyParams(hash_h, borrower_pk, provider_pk, csv_blocks)
+        params.validate()
+        tapscript = build_tapscript(hash_h, borrower_pk, params.csv_blocks, provider_pk)
 
     # control block from hex or file
-    control = file_or_hex('control', args.control, getattr(args, 'control_file', None))
-    sig = parse_hex('sig', args.sig)
+    control = file_or_hex('control', spec.get('control'), spec.get('control_file'))
+    sig = parse_hex('sig', spec.get('sig'))
 
-    # Load PSBT (auto-detect hex or base64)
-    psbt = load_psbt_from_file(args.psbt_in)
+    if spec.get('mode') == 'borrower':
+        if not spec.get('preimage'):
+            raise ValueError("--preimage required in borrower mode")
+        preimage = parse_hex('preimage', spec['preimage'], length=32)
+        return build_witness(Branch.CLOSE, sig, tapscript, control, preimage=preimage)
+    return build_witness(Branch.LIQUIDATE, sig, tapscript, control)
 
-    # Optional guards: verify presence of anchors before finalizing
 
-    # TapRet anchor guard
-    if any(getattr(args, k, None) is not None for k in ('require_anchor_index','require_anchor_spk','require_anchor_value')):
-        if args.require_anchor_index is None or args.require_anchor_spk is None or args.require_anchor_value is None:
+def _split_guard_spec(flag: str, form: str, spec: str, min_parts: int, max_parts: int) -> List[str]:
+    parts = spec.split(':')
+    if not min_parts <= len(parts) <= max_parts:
+        raise ValueError(f'{flag} expects {form} (got {spec!r})')
+    return parts
+
+
+def finalize_guards_from_args(args: argparse.Namespace) -> List[Any]:
+    """Collect every guard requested via --require-* flags and --guards files."""
+    from .guards import anchor_guard, load_guards_file, opret_guard, value_guard
+    guards: List[Any] = []
+
+    # Legacy triplets (repeatable; matched up by position)
+    a_idx, a_spk, a_val = (getattr(args, k, None) or [] for k in ('require_anchor_index', 'require_anchor_spk', 'require_anchor_value'))
+    if a_idx or a_spk or a_val:
+        # without --require-anchor-index the spk may sit at any output
+        idxs: List[Optional[int]] = list(a_idx) if a_idx else [None] * len(a_spk)
+        if not (len(idxs) == len(a_spk) == len(a_val)) or not a_spk:
             raise ValueError('When using --require-anchor-*, provide all of: --require-anchor-index, --require-anchor-spk, --require-anchor-value')
-        res = verify_anchor_output(
-            psbt,
-            int(args.require_anchor_index),
-            _normalize_hex_arg(args.require_anchor_spk),
-            int(args.require_anchor_value),
-        )
-        if not res.ok:
-            raise ValueError(f'Anchor guard failed: {res.reason}')
-
-    # OP_RETURN guard
-    if any(getattr(args, k, None) is not None for k in ('require_opret_index','require_opret_data','require_opret_value')):
-        if args.require_opret_index is None or args.require_opret_data is None:
+        guards += [anchor_guard(i, spk, v) for i, spk, v in zip(idxs, a_spk, a_val)]
+    o_idx, o_data, o_val = (getattr(args, k, None) or [] for k in ('require_opret_index', 'require_opret_data', 'require_opret_value'))
+    if o_idx or o_data or o_val:
+        o_idxs: List[Optional[int]] = list(o_idx) if o_idx else [None] * len(o_data)
+        if len(o_idxs) != len(o_data) or not o_data or (o_val and len(o_val) != len(o_data)):
             raise ValueError('When using --require-opret-*, provide at least: --require-opret-index and --require-opret-data [--require-opret-value optional]')
-        res = verify_opret_output(psbt, int(args.require_opret_index), args.require_opret_data, args.require_opret_value)
-        if not res.ok:
-            raise ValueError(f'OP_RETURN guard failed: {res.reason}')
+        vals: List[Optional[int]] = list(o_val) if o_val else [None] * len(o_data)
+        guards += [opret_guard(i, d, v) for i, d, v in zip(o_idxs, o_data, vals)]
+
+    # Compact repeatable forms; INDEX may be '*' to match by spk/data at any output
+    for spec in getattr(args, 'require_anchor', None) or []:
+        i, spk, v = _split_guard_spec('--require-anchor', 'INDEX:SPK:VALUE', spec, 3, 3)
+        guards.append(anchor_guard(None if i == '*' else i, spk, v))
+    for spec in getattr(args, 'require_opret', None) or []:
+        parts = _split_guard_spec('--require-opret', 'INDEX:DATA[:VALUE]', spec, 2, 3)
+        guards.append(opret_guard(None if parts[0] == '*' else parts[0], parts[1], parts[2] if len(parts) == 3 else None))
+    for spec in getattr(args, 'require_value', None) or []:
+        i, v = _split_guard_spec('--require-value', 'INDEX:VALUE', spec, 2, 2)
+        guards.append(value_guard(i, v))
+
+    for path in getattr(args, 'guards', None) or []:
+        guards += load_guards_file(path)
+    return guards
+
+
+def _apply_finalize_guards(psbt: Any, args: argparse.Namespace) -> None:
+    from .guards import evaluate_guards, failure_message, tx_outputs
+    guards = finalize_guards_from_args(args)
+    if not guards:
+        return
+    msg = failure_message(evaluate_guards(tx_outputs(psbt), guards))
+    if msg:
+        raise ValueError(msg)
 
-    if args.input_index < 0 or args.input_index >= len(psbt.inputs):
-        raise IndexError(f"Input index {args.input_index} out of range")
 
-    if args.mode == 'borrower':
-        if not args.preimage:
-            raise ValueError("--preimage required in borrower mode")
-        preimage = parse_hex('preimage', args.preimage, length=32)
-        stack_items = build_witness(Branch.CLOSE, sig, tapscript, control, preimage=preimage)
+def finalize_witness(args: argparse.Namespace) -> None:
+    from .psbtio import (
+        STDIO, cscript_witness, extract_psbt_tx, load_psbt_from_file, set_final_witness, write_output_bytes, write_psbt,
+    )
+    try:
+        cscript_witness()
+    except Exception:
+        print("ERROR: finalize requires python-bitcointx. Install with: pip install python-bitcointx", file=sys.stderr)
+        raise
+
+    from .registry import registry_path_from_env
+
+    # Per-input fields come from --spec (many inputs) or the flags (one input);
+    # a vault registry fills in tapscript/control from each input's spk.
+    # Every witness is built and validated before the PSBT is touched.
+    from_spec = bool(getattr(args, 'spec', None))
+    if from_spec:
+        flags = [k for k in _FINALIZE_INPUT_FIELDS if k != 'input_index' and getattr(args, k, None) is not None]
+        if flags:
+            given = ', '.join('--' + k.replace('_', '-') for k in flags)
+            raise ValueError(f'{given} cannot be combined with --spec (set per-input fields in the spec)')
+        specs = _load_finalize_spec(args.spec)
     else:
-        stack_items = build_witness(Branch.LIQUIDATE, sig, tapscript, control)
+        if args.mode is None or args.sig is None:
+            raise ValueError('--mode and --sig are required unless --spec is given')
+        specs = [{k: getattr(args, k, None) for k in _FINALIZE_INPUT_FIELDS}]
+    psbt = None
+    registry = getattr(args, 'registry', None) or registry_path_from_env()
+    if registry and any(_needs_registry(spec) for spec in specs):
+        psbt = load_psbt_from_file(args.psbt_in)
+        specs = [_resolve_from_registry(spec, psbt, registry) if _needs_registry(spec) else spec for spec in specs]
+    stacks: List[Tuple[int, List[bytes]]] = []
+    for i, spec in enumerate(specs):
+        try:
+            stacks.append((int(spec['input_index']), build_input_witness(spec)))
+        except ValueError as e:
+            if not from_spec:
+                raise
+            raise ValueError(f'spec entry {i} (input {spec["input_index"]}): {e}') from e
+    indices = [idx for idx, _stack in stacks]
+    if len(set(indices)) != len(indices):
+        raise ValueError('each input may appear only once in a finalize spec')
+    if args.psbt_out == STDIO and args.tx_out == STDIO:
+        raise ValueError("only one of --psbt-out and --tx-out may be '-' (stdout)")
+
+    # Load PSBT once (auto-detect binary, hex or base64)
+    if psbt is None:
+        psbt = load_psbt_from_file(args.psbt_in)
 
-    psbt.inputs[args.input_index].final_scriptwitness = CScriptWitness(stack_items)
-    pi = psbt.inputs[args.input_index]
-    pi.partial_sigs = {}
-    if hasattr(pi, 'taproot_leaf_script'):
-        pi.taproot_leaf_script = []
-    if hasattr(pi, 'taproot_bip32_derivations'):
-        pi.taproot_bip32_derivations = {}
-    if hasattr(pi, 'taproot_internal_key'):
-        pi.taproot_internal_key = None
+    # Optional guards: verify presence of anchors before finalizing
+    _apply_finalize_guards(psbt, args)
 
-    write_psbt(psbt, args.psbt_out)
+    for idx in indices:
+        if idx < 0 or idx >= len(psbt.inputs):
+            raise IndexError(f"Input index {idx} out of range")
+
+    for idx, stack_items in stacks:
+        set_final_witness(psbt, idx, stack_items)
+
+    write_psbt(psbt, args.psbt_out, getattr(args, 'format', None) or 'base64')
 
     if args.tx_out:
         try:
-            raw = to_raw_tx_hex(psbt)
-            with open(args.tx_out, 'wt') as f:
-                f.write(raw)
+            tx = extract_psbt_tx(psbt, dict(stacks))
+            write_output_bytes(args.tx_out, tx.hex.encode() + (b'\n' if args.tx_out == STDIO else b''))
+            print(f'txid {tx.txid} wtxid {tx.wtxid}', file=sys.stderr)
         except Exception as e:
             print(f"Note: could not produce raw tx: {e}", file=sys.stderr)
             print("Finalized PSBT written; broadcast via bitcoin-cli.", file=sys.stderr)
 
 
-def main():
+def build_parser() -> argparse.ArgumentParser:
     epilog = (
         "Quick start (regtest):\n"
         "  1) bitcoind -regtest; create wallets provider/borrower/vault\n"
@@ -357,6 +777,7 @@ def main():
     )
     ap = argparse.ArgumentParser(description="SSV CLI (build tapscript, finalize PSBT)", epilog=epilog,
                                  formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument('--connect', metavar='SOCKET', help='forward this invocation to a running `ssv serve` daemon (must come first)')
     sub = ap.add_subparsers(dest='cmd', required=True)
 
     ap_b = sub.add_parser('build-tapscript', help='build the tapscript and compute tapleaf hash')
@@ -368,13 +789,15 @@ def main():
     ap_b.add_argument('--json', action='store_true', help='print JSON output')
     ap_b.set_defaults(func=cmd_build)
 
-    ap_f = sub.add_parser('finalize', help='finalize a PSBT input with Taproot script-path witness')
-    ap_f.add_argument('--mode', choices=['borrower','provider'], required=True, help='borrower=CLOSE (IF); provider=LIQUIDATE (ELSE)')
-    ap_f.add_argument('--psbt-in', required=True, help='input PSBT file (base64 or hex)')
-    ap_f.add_argument('--psbt-out', required=True, help='output PSBT file (base64)')
-    ap_f.add_argument('--tx-out', help='optional raw tx hex file to write')
+    ap_f = sub.add_parser('finalize', help='finalize PSBT input(s) with Taproot script-path witness')
+    ap_f.add_argument('--mode', choices=['borrower','provider'], help='borrower=CLOSE (IF); provider=LIQUIDATE (ELSE); required unless --spec')
+    ap_f.add_argument('--psbt-in', required=True, help="input PSBT file (binary, base64 or hex; '-' for stdin)")
+    ap_f.add_argument('--psbt-out', required=True, help="output PSBT file ('-' for stdout)")
+    ap_f.add_argument('--format', choices=('base64', 'hex', 'binary'), default='base64', help='output PSBT encoding (default base64)')
+    ap_f.add_argument('--tx-out', help="optional raw tx hex file to write ('-' for stdout)")
     ap_f.add_argument('--input-index', type=int, default=0, help='which input to finalize')
-    ap_f.add_argument('--sig', required=True, help='Schnorr signature hex (64/65 bytes)')
+    ap_f.add_argument('--sig', help='Schnorr signature hex (64/65 bytes); required unless --spec')
+    ap_f.add_argument('--spec', help='JSON file listing inputs to finalize in one pass: [{input_index, mode, sig, preimage, control, tapscript | hash_h/borrower_pk/csv_blocks/provider_pk}, ...]')
     ap_f.add_argument('--preimage', help='borrower mode only: preimage s hex')
     ap_f.add_argument('--control', help='Taproot control block hex')
     ap_f.add_argument('--control-file', help='read control block hex from file')
@@ -384,13 +807,18 @@ def main():
     ap_f.add_argument('--borrower-pk', help='x-only, 32B hex')
     ap_f.add_argument('--csv-blocks', type=int, help='relative timelock blocks (1-65535, BIP-68)')
     ap_f.add_argument('--provider-pk', help='x-only, 32B hex')
-    # Optional guards to enforce anchors before finalizing
-    ap_f.add_argument('--require-anchor-index', type=int, help='require a TapRet anchor at this output index')
-    ap_f.add_argument('--require-anchor-spk', help='expected TapRet anchor SPK hex at the index')
-    ap_f.add_argument('--require-anchor-value', type=int, help='expected anchor value (sats) at the index')
-    ap_f.add_argument('--require-opret-index', type=int, help='require an OP_RETURN output at this index')
-    ap_f.add_argument('--require-opret-data', help='expected OP_RETURN data (hex)')
-    ap_f.add_argument('--require-opret-value', type=int, help='optional expected OP_RETURN value (sats)')
+    # Optional guards to enforce anchors before finalizing (all repeatable)
+    ap_f.add_argument('--require-anchor-index', type=int, action='append', help='require a TapRet anchor at this output index (omit to match the spk anywhere)')
+    ap_f.add_argument('--require-anchor-spk', action='append', help='expected TapRet anchor SPK hex at the index')
+    ap_f.add_argument('--require-anchor-value', type=int, action='append', help='expected anchor value (sats) at the index')
+    ap_f.add_argument('--require-opret-index', type=int, action='append', help='require an OP_RETURN output at this index (omit to match the data anywhere)')
+    ap_f.add_argument('--require-opret-data', action='append', help='expected OP_RETURN data (hex)')
+    ap_f.add_argument('--require-opret-value', type=int, action='append', help='optional expected OP_RETURN value (sats)')
+    ap_f.add_argument('--require-anchor', action='append', metavar='INDEX:SPK:VALUE', help="compact anchor guard (INDEX '*' = any output)")
+    ap_f.add_argument('--require-opret', action='append', metavar='INDEX:DATA[:VALUE]', help="compact OP_RETURN guard (INDEX '*' = any output)")
+    ap_f.add_argument('--require-value', action='append', metavar='INDEX:VALUE', help='require an exact output value (sats)')
+    ap_f.add_argument('--guards', action='append', metavar='FILE', help='JSON guards file: [{"type": "anchor"|"opret"|"value", "index", ...}]')
+    ap_f.add_argument('--registry', metavar='DB', help='vault registry; resolves tapscript/control from each input spk (default: $SSV_REGISTRY)')
     ap_f.set_defaults(func=finalize_witness)
 
     ap_v = sub.add_parser('verify-path', help='verify tapscript/control block against input witness_utxo spk')
@@ -399,14 +827,15 @@ def main():
     ap_v.add_argument('--control', help='control block hex')
     ap_v.add_argument('--control-file', help='read control block hex from file')
     ap_v.add_argument('--witness-spk', help='witness scriptPubKey hex (v1 segwit taproot)')
-    ap_v.add_argument('--psbt-in', help='optional PSBT (base64 or hex) to extract witness_utxo spk from input 0')
+    ap_v.add_argument('--psbt-in', help="optional PSBT (binary, base64 or hex; '-' for stdin) to extract witness_utxo spk from input 0")
+    ap_v.add_argument('--registry', metavar='DB', help='vault registry; resolves tapscript/control from the spk (default: $SSV_REGISTRY)')
     ap_v.add_argument('--json', action='store_true', help='print JSON output')
     ap_v.set_defaults(func=cmd_verify_path)
 
     # anchor-verify: lean check that a given output index matches expected SPK/value
     ap_a = sub.add_parser('anchor-verify', help='verify that a PSBT has an output matching index/SPK/value (TapRet anchor check)')
-    ap_a.add_argument('--psbt-in', required=True, help='input PSBT file (base64 or hex)')
-    ap_a.add_argument('--index', required=True, type=int, help='output index to check')
+    ap_a.add_argument('--psbt-in', required=True, help="input PSBT file (binary, base64 or hex; '-' for stdin)")
+    ap_a.add_argument('--index', type=int, help='output index to check (omit to list every output with the spk)')
     ap_a.add_argument('--spk', required=True, help='expected scriptPubKey hex at the index (TapRet P2TR)')
     ap_a.add_argument('--value', required=True, type=int, help='expected output value in sats at the index')
     ap_a.add_argument('--json', action='store_true', help='print JSON output')
@@ -414,8 +843,8 @@ def main():
 
     # opret-verify: verify an OP_RETURN output contains the expected data push (and optional value)
     ap_o = sub.add_parser('opret-verify', help='verify that a PSBT has an OP_RETURN output with expected data at index')
-    ap_o.add_argument('--psbt-in', required=True, help='input PSBT file (base64 or hex)')
-    ap_o.add_argument('--index', required=True, type=int, help='output index to check')
+    ap_o.add_argument('--psbt-in', required=True, help="input PSBT file (binary, base64 or hex; '-' for stdin)")
+    ap_o.add_argument('--index', type=int, help='output index to check (omit to list every OP_RETURN with the data)')
     ap_o.add_argument('--data', required=True, help='expected OP_RETURN data (hex)')
     ap_o.add_argument('--value', type=int, help='optional expected output value in sats (commonly 0)')
     ap_o.add_argument('--json', action='store_true', help='print JSON output')
@@ -423,11 +852,145 @@ def main():
 
     # anchor-show: list outputs for convenience
     ap_s = sub.add_parser('anchor-show', help='list transaction outputs (index, value, scriptPubKey hex) from a PSBT')
-    ap_s.add_argument('--psbt-in', required=True, help='input PSBT file (base64 or hex)')
+    ap_s.add_argument('--psbt-in', required=True, help="input PSBT file (binary, base64 or hex; '-' for stdin)")
     ap_s.add_argument('--json', action='store_true', help='print JSON output')
     ap_s.set_defaults(func=cmd_anchor_show)
 
-    args = ap.parse_args()
+    # build-vaults: batch tapscript/output-key derivation over a JSONL stream
+    ap_bv = sub.add_parser('build-vaults', help='batch-build vaults from JSONL policy records (h, pk_b, pk_p, csv_blocks, internal_key)')
+    ap_bv.add_argument('--in', dest='input', default='-', help='input JSONL file (default: stdin)')
+    ap_bv.add_argument('--out', dest='output', default='-', help='output JSONL file (default: stdout)')
+    ap_bv.add_argument('--workers', type=int, default=1, help='worker processes (default: 1, inline)')
+    ap_bv.add_argument('--chunk-size', type=int, default=256, help='records per work unit')
+    ap_bv.set_defaults(func=cmd_build_vaults)
+
+    # finalize-batch: many independent PSBTs from a JSONL manifest
+    ap_fb = sub.add_parser('finalize-batch', help='finalize many PSBTs from a JSONL manifest (one `finalize` option object per line)')
+    ap_fb.add_argument('--manifest', default='-', help='JSONL manifest (default: stdin)')
+    ap_fb.add_argument('--out', dest='output', default='-', help='per-item JSONL results (default: stdout)')
+    ap_fb.add_argument('--workers', type=int, default=1, help='worker processes (default: 1, inline)')
+    ap_fb.add_argument('--chunk-size', type=int, default=16, help='manifest lines per work unit')
+    ap_fb.set_defaults(func=cmd_finalize_batch)
+
+    # combine: BIP-174 combiner (one unsigned tx, or many grouped by txid)
+    ap_c = sub.add_parser('combine', help='merge partially signed copies of a PSBT (BIP-174 combiner)')
+    ap_c.add_argument('--psbt-in', action='append', help="PSBT to merge (repeatable; binary, base64 or hex; '-' for stdin)")
+    ap_c.add_argument('--from-list', metavar='FILE', help="file with one PSBT path per line ('-' for stdin)")
+    ap_c.add_argument('--psbt-out', help="combined PSBT file ('-' for stdout)")
+    ap_c.add_argument('--format', choices=('base64', 'hex', 'binary'), default='base64', help='output PSBT encoding (default base64)')
+    ap_c.add_argument('--batch', action='store_true', help='group inputs by unsigned txid and write one combined PSBT per group')
+    ap_c.add_argument('--out-dir', help='directory for --batch results (<txid>.psbt); a JSONL row per group goes to stdout')
+    ap_c.set_defaults(func=cmd_combine)
+
+    # create-psbt: unsigned CLOSE/LIQUIDATE PSBT for a vault UTXO, no wallet needed
+    ap_cp = sub.add_parser('create-psbt', help='build an unsigned CLOSE/LIQUIDATE PSBT spending a vault UTXO')
+    ap_cp.add_argument('--outpoint', metavar='TXID:VOUT', help='vault UTXO')
+    ap_cp.add_argument('--amount', type=int, help='vault UTXO value (sats)')
+    ap_cp.add_argument('--mode', choices=['borrower', 'provider'], help='borrower=CLOSE, provider=LIQUIDATE (nSequence=csv_blocks)')
+    ap_cp.add_argument('--hash-h', help='32B hex, SHA256(s)')
+    ap_cp.add_argument('--borrower-pk', help='x-only, 32B hex')
+    ap_cp.add_argument('--csv-blocks', type=int, help='relative timelock in blocks (1-65535, BIP-68)')
+    ap_cp.add_argument('--provider-pk', help='x-only, 32B hex')
+    ap_cp.add_argument('--internal-key', help='x-only Taproot internal key (single-leaf tree)')
+    ap_cp.add_argument('--control', help='control block hex (use for trees with more than one leaf)')
+    ap_cp.add_argument('--output', action='append', metavar='SPK:SAT', help='destination output (repeatable)')
+    ap_cp.add_argument('--anchor', action='append', metavar='SPK:SAT', help='TapRet anchor output (repeatable, after destinations)')
+    ap_cp.add_argument('--opret', action='append', metavar='DATA[:SAT]', help='OP_RETURN anchor output (repeatable, last)')
+    ap_cp.add_argument('--locktime', type=int, default=0, help='nLockTime (default 0)')
+    ap_cp.add_argument('--psbt-out', help="output PSBT file ('-' for stdout)")
+    ap_cp.add_argument('--format', choices=('base64', 'hex', 'binary'), default='base64', help='output PSBT encoding (default base64)')
+    ap_cp.add_argument('--json', action='store_true', help='print txid, vault spk and nSequence as JSON')
+    ap_cp.add_argument('--manifest', help='batch mode: JSONL of create-psbt option objects (- for stdin)')
+    ap_cp.add_argument('--out', dest='output_rows', default='-', help='batch mode: per-line JSONL results (default: stdout)')
+    ap_cp.add_argument('--workers', type=int, default=1, help='batch mode: worker processes (default: 1, inline)')
+    ap_cp.add_argument('--chunk-size', type=int, default=256, help='batch mode: manifest lines per work unit')
+    ap_cp.set_defaults(func=cmd_create_psbt)
+
+    # registry-import / registry-show: persistent vault registry keyed by spk
+    ap_ri = sub.add_parser('registry-import', help='bulk-load vault records (build-vaults JSONL) into a vault registry')
+    ap_ri.add_argument('--registry', required=True, metavar='DB', help='registry database (created if missing)')
+    ap_ri.add_argument('--in', dest='input', default='-', help='input JSONL: h, pk_b, pk_p, csv_blocks, internal_key[, id, outpoint] (default: stdin)')
+    ap_ri.add_argument('--workers', type=int, default=1, help='worker processes for derivation (default: 1, inline)')
+    ap_ri.add_argument('--chunk-size', type=int, default=1024, help='records per work unit')
+    ap_ri.set_defaults(func=cmd_registry_import)
+
+    ap_rs = sub.add_parser('registry-show', help='look up a vault in the registry by spk or outpoint (JSON)')
+    ap_rs.add_argument('--registry', required=True, metavar='DB', help='registry database')
+    ap_rs.add_argument('--spk', help='P2TR scriptPubKey hex')
+    ap_rs.add_argument('--outpoint', metavar='TXID:VOUT', help='funded vault outpoint')
+    ap_rs.set_defaults(func=cmd_registry_show)
+
+    ap_es = sub.add_parser('estimate', help='project finalized vsize and fee of a vault PSBT for CLOSE and LIQUIDATE (JSON)')
+    ap_es.add_argument('--psbt-in', help='unsigned vault PSBT (binary, hex or base64)')
+    ap_es.add_argument('--index', type=int, default=0, help='vault input index (default: 0)')
+    ap_es.add_argument('--mode', choices=['borrower', 'provider'], help='estimate one branch only (default: both)')
+    ap_es.add_argument('--feerate', help='fee rate in sat/vB (decimal); adds a fee to each branch')
+    ap_es.add_argument('--sig-bytes', type=int, choices=[64, 65], default=64, help='65 when signing with an explicit sighash byte')
+    ap_es.add_argument('--tapscript', help='tapscript hex (default: from the PSBT input or the registry)')
+    ap_es.add_argument('--control', help='control block hex (default: from the PSBT input or the registry)')
+    ap_es.add_argument('--registry', metavar='DB', help='vault registry used when the PSBT lacks the leaf script (default: $SSV_REGISTRY)')
+    ap_es.add_argument('--manifest', help='batch mode: JSONL of estimate option objects (- for stdin)')
+    ap_es.add_argument('--out', dest='output', default='-', help='batch mode: per-line JSONL results (default: stdout)')
+    ap_es.add_argument('--workers', type=int, default=1, help='batch mode: worker processes (default: 1, inline)')
+    ap_es.add_argument('--chunk-size', type=int, default=256, help='batch mode: manifest lines per work unit')
+    ap_es.set_defaults(func=cmd_estimate)
+
+    ap_tt = sub.add_parser('taptree', help='build a weight-optimised (Huffman) TapTree; JSON root, spk and per-leaf control blocks')
+    ap_tt.add_argument('--leaves', required=True, help='JSON list of {tapscript, weight, name?, leaf_version?}')
+    ap_tt.add_argument('--internal-key', required=True, help='32B hex x-only internal key')
+    ap_tt.set_defaults(func=cmd_taptree)
+
+    # scan-blocks: find SSV vault spends (and revealed preimages) in raw blocks
+    ap_sb = sub.add_parser('scan-blocks', help='scan raw blocks for SSV vault spends; JSONL out')
+    ap_sb.add_argument('paths', nargs='+', help='blk*.dat files or blocks directories (or hex block files with --format hex)')
+    ap_sb.add_argument('--format', choices=('blk', 'hex'), default='blk', help='blk: bitcoind block files; hex: one hex block per line')
+    ap_sb.add_argument('--out', dest='output', default='-', help='output JSONL (default: stdout)')
+    ap_sb.add_argument('--workers', type=int, default=1, help='worker processes scanning batches of blocks, output kept in file and block order (default: 1, inline)')
+    ap_sb.set_defaults(func=cmd_scan_blocks)
+
+    # serve: keep a warm process answering JSON-RPC over a Unix socket
+    ap_sv = sub.add_parser('serve', help='run a local JSON-RPC daemon on a Unix socket (use `ssv --connect SOCKET ...` as client)')
+    ap_sv.add_argument('--socket', required=True, help='Unix socket path to listen on')
+    ap_sv.add_argument('--workers', type=int, default=2, help='worker processes for CPU-bound requests')
+    ap_sv.set_defaults(func=cmd_serve)
+
+    return ap
+
+
+def argv_from_params(cmd: str, params: Dict[str, Any]) -> List[str]:
+    """Translate a JSON object of option values into argv for ``cmd``.
+
+    Keys are option names with ``_`` or ``-`` (``psbt_in`` -> ``--psbt-in``);
+    ``True`` becomes a bare flag, ``False``/``None`` are omitted and lists
+    repeat the option.
+    """
+    argv = [cmd]
+    for key, value in params.items():
+        flag = '--' + key.replace('_', '-')
+        if value is None or value is False:
+            continue
+        if value is True:
+            argv.append(flag)
+        elif isinstance(value, (list, tuple)):
+            for item in value:
+                argv += [flag, str(item)]
+        else:
+            argv += [flag, str(value)]
+    return argv
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    argv = sys.argv[1:] if argv is None else list(argv)
+    if argv and (argv[0] == '--connect' or argv[0].startswith('--connect=')):
+        from .server import run_remote
+        if argv[0] == '--connect':
+            if len(argv) < 2:
+                build_parser().error('--connect requires a socket path')
+            sock, rest = argv[1], argv[2:]
+        else:
+            sock, rest = argv[0].split('=', 1)[1], argv[1:]
+        sys.exit(run_remote(sock, rest))
+    args = build_parser().parse_args(argv)
     args.func(args)
 
 if __name__ == '__main__':
@@ -0,0 +1,208 @@
+"""
+Size and fee projection for vault spends, before anything is signed.
+
+The finalized witness of a vault input has a fixed shape
+(:func:`ssv.witness.build_witness`), so its size follows from the tapscript
+length, the control block depth and the signature size alone:
+
+  CLOSE      [sig, s (32), IF_SELECTOR, tapscript, control]
+  LIQUIDATE  [sig, ELSE_SELECTOR, tapscript, control]
+
+A signature is 64 bytes with SIGHASH_DEFAULT, or 65 with an explicit
+sighash byte. Each input's witness serializes as CompactSize(item count)
+followed by CompactSize(len) + item for every item. BIP-141 weight is
+``4 * non_witness_size + 2 + sum(witness sizes)`` (the 2 is the segwit
+marker and flag); ``vsize = ceil(weight / 4)`` and, at a rate in sat/vB,
+``fee = ceil(vsize * rate)``.
+
+The non-witness size is the PSBT's unsigned transaction (P2TR scriptSigs
+stay empty) plus the final scriptSig of any other, already finalized input;
+an input finalized with a scriptSig alone adds a 1-byte empty witness.
+"""
+from __future__ import annotations
+
+import math
+from decimal import Decimal, InvalidOperation
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from .tapscript import compactsize
+from .witness import ELSE_SELECTOR, IF_SELECTOR, Branch
+
+SIG_BYTES = (64, 65)
+PREIMAGE_BYTES = 32
+_MODE_BRANCH = {'borrower': Branch.CLOSE, 'provider': Branch.LIQUIDATE}
+
+
+class SpendEstimate(NamedTuple):
+    branch: str
+    witness_bytes: int
+    weight: int
+    vsize: int
+    fee: Optional[int]
+
+    def as_dict(self) -> Dict[str, Any]:
+        return self._asdict()
+
+
+def witness_item_lengths(branch: Branch, tapscript_len: int, control_len: int, *, sig_len: int = 64) -> List[int]:
+    """Lengths of the witness stack items ``build_witness`` would produce."""
+    if sig_len not in SIG_BYTES:
+        raise ValueError('signature must be 64 bytes (or 65 bytes including sighash byte)')
+    if not 0 < tapscript_len <= 10_000:
+        raise ValueError('tapscript must be 1..10000 bytes')
+    if control_len < 33 or (control_len - 33) % 32:
+        raise ValueError('control block must be 33 + 32*n bytes (Taproot BIP-341 structure)')
+    if branch is Branch.CLOSE:
+        return [sig_len, PREIMAGE_BYTES, len(IF_SELECTOR), tapscript_len, control_len]
+    if branch is Branch.LIQUIDATE:
+        return [sig_len, len(ELSE_SELECTOR), tapscript_len, control_len]
+    raise ValueError('unknown branch')
+
+
+def witness_size(branch: Branch, tapscript_len: int, control_len: int, *, sig_len: int = 64) -> int:
+    """Serialized size (= weight units) of one input's finalized witness."""
+    items = witness_item_lengths(branch, tapscript_len, control_len, sig_len=sig_len)
+    return len(compactsize(len(items))) + sum(len(compactsize(n)) + n for n in items)
+
+
+def tx_weight(non_witness_size: int, witness_sizes: Sequence[int]) -> int:
+    """BIP-141 weight of a segwit tx from its stripped size and per-input witness sizes."""
+    return 4 * non_witness_size + 2 + sum(witness_sizes)
+
+
+def _feerate(rate: Any) -> Decimal:
+    try:
+        d = Decimal(str(rate))
+    except InvalidOperation:
+        raise ValueError(f'feerate must be a number in sat/vB (got {rate!r})') from None
+    if not d.is_finite() or d < 0:
+        raise ValueError(f'feerate must be a number in sat/vB (got {rate!r})')
+    return d
+
+
+def fee_for(vsize: int, feerate: Any) -> int:
+    """Fee in sats for ``vsize`` at ``feerate`` sat/vB, rounded up (exact decimal arithmetic)."""
+    return int((vsize * _feerate(feerate)).to_integral_value(rounding='ROUND_CEILING'))
+
+
+def estimate_spend(
+    non_witness_size: int,
+    branch: Branch,
+    tapscript_len: int,
+    control_len: int,
+    *,
+    sig_len: int = 64,
+    feerate: Any = None,
+    other_witnesses: Sequence[int] = (),
+) -> SpendEstimate:
+    """Project weight, vsize and fee of a tx spending one vault input.
+
+    ``other_witnesses`` holds the witness sizes of the tx's other inputs.
+    """
+    wit = witness_size(branch, tapscript_len, control_len, sig_len=sig_len)
+    weight = tx_weight(non_witness_size, [wit, *other_witnesses])
+    vsize = math.ceil(weight / 4)
+    return SpendEstimate(branch.value, wit, weight, vsize, None if feerate is None else fee_for(vsize, feerate))
+
+
+def _leaf_lengths(input_map: Dict[bytes, bytes], index: int) -> Optional[Tuple[int, int]]:
+    """(tapscript, control) lengths from the input's BIP-371 tap_leaf_script entries."""
+    from .tapscript import match_tapscript
+    leaves = [(v[:-1], k[1:]) for k, v in input_map.items() if k[:1] == b'\x15' and v]
+    if len(leaves) > 1:
+        leaves = [leaf for leaf in leaves if match_tapscript(leaf[0]) is not None]
+    if not leaves:
+        return None
+    if len(leaves) > 1:
+        raise ValueError(f'input {index} has {len(leaves)} vault leaf scripts; pass tapscript and control')
+    script, control = leaves[0]
+    return len(script), len(control)
+
+
+def estimate_psbt(
+    buf: Any,
+    *,
+    index: int = 0,
+    modes: Sequence[str] = ('borrower', 'provider'),
+    sig_len: int = 64,
+    feerate: Any = None,
+    tapscript: Optional[bytes] = None,
+    control: Optional[bytes] = None,
+    registry: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Estimate a vault PSBT's finalized size for each spend mode.
+
+    The leaf script and control block come from ``tapscript``/``control``,
+    else the input's tap_leaf_script entry, else the vault registry (by the
+    input's witness_utxo spk). Other inputs must already be finalized; their
+    final scriptSigs count towards the non-witness size. Returns
+    ``{txid, index, non_witness_size, close?, liquidate?}``.
+    """
+    from .psbtio import TxOutView, _sha256d_id, parse_maps
+    maps = parse_maps(buf)
+    unsigned = maps.globals[b'\x00']
+    if index < 0 or index >= len(maps.inputs):
+        raise IndexError(f'Input index {index} out of range')
+    lengths: Optional[Tuple[int, int]] = None
+    if tapscript is not None and control is not None:
+        lengths = len(tapscript), len(control)
+    else:
+        lengths = _leaf_lengths(maps.inputs[index], index)
+    if lengths is None and registry:
+        from .registry import resolve_spk
+        utxo = maps.inputs[index].get(b'\x01')
+        if utxo is None:
+            raise ValueError(f'input {index} has no witness_utxo')
+        vault = resolve_spk(registry, TxOutView.parse(utxo, 0).scriptPubKey)
+        lengths = len(vault.tapscript), len(vault.control)
+    if lengths is None:
+        raise ValueError(f'input {index} has no leaf script; pass tapscript and control (or a registry)')
+    others: List[int] = []
+    non_witness = len(unsigned)
+    for j, m in enumerate(maps.inputs):
+        if j == index:
+            continue
+        script_sig = m.get(b'\x07')
+        if script_sig is not None:  # replaces the unsigned tx's empty scriptSig (one 0x00 length byte)
+            non_witness += len(compactsize(len(script_sig))) - 1 + len(script_sig)
+        final = m.get(b'\x08')
+        if final is None:
+            if script_sig is None:
+                raise ValueError(f'input {j} is not finalized; only input {index} can be estimated')
+            final = b'\x00'  # scriptSig-only input: empty witness
+        others.append(len(final))
+    out: Dict[str, Any] = {'txid': _sha256d_id(unsigned), 'index': index, 'non_witness_size': non_witness}
+    for mode in modes:
+        if mode not in _MODE_BRANCH:
+            raise ValueError(f'unknown mode {mode!r} (expected borrower or provider)')
+        est = estimate_spend(non_witness, _MODE_BRANCH[mode], *lengths, sig_len=sig_len,
+                             feerate=feerate, other_witnesses=others)
+        out[est.branch] = {k: v for k, v in est.as_dict().items() if k != 'branch'}
+    return out
+
+
+def estimate_from_spec(spec: Dict[str, Any]) -> Dict[str, Any]:
+    """Run :func:`estimate_psbt` from ``ssv estimate`` option names.
+
+    Keys: psbt_in, index, mode (one mode; default both), feerate, sig_bytes,
+    tapscript, control, registry (default ``SSV_REGISTRY``).
+    """
+    from .hexutil import parse_hex
+    from .psbtio import read_psbt_bytes
+    from .registry import registry_path_from_env
+    psbt_in = spec.get('psbt_in')
+    if not psbt_in:
+        raise ValueError('psbt_in is required')
+    tapscript = spec.get('tapscript')
+    control = spec.get('control')
+    mode = spec.get('mode')
+    return estimate_psbt(
+        read_psbt_bytes(psbt_in),
+        index=int(spec.get('index') or 0),
+        modes=(mode,) if mode else ('borrower', 'provider'),
+        sig_len=int(spec.get('sig_bytes') or 64),
+        feerate=spec.get('feerate'),
+        tapscript=None if tapscript is None else parse_hex('tapscript', tapscript),
+        control=None if control is None else parse_hex('control', control),
+        registry=spec.get('registry') or registry_path_from_env(),
+    )
@@ -0,0 +1,277 @@
+"""
+Output guards: assert that a transaction carries the expected anchor outputs.
+
+Guard kinds
+- anchor: output at ``index`` has exactly ``spk`` and ``value`` (TapRet P2TR)
+- opret:  output at ``index`` is ``OP_RETURN <data>`` (optionally with ``value``)
+- value:  output at ``index`` carries exactly ``value`` sats
+
+Anchor and opret guards may leave ``index`` as None to accept the expected
+output at any position (e.g. after an RBF rewrite reordered outputs); those
+are resolved through an :class:`OutputIndex` built once per transaction.
+
+All guards are evaluated together, touching each referenced output once no
+matter how many guards point at it, and every guard gets its own
+structured :class:`GuardResult`.
+
+Guards file format (JSON list; omit ``index`` to match by spk/data):
+  [{"type": "anchor", "index": 0, "spk": "5120...", "value": 546},
+   {"type": "opret", "index": 1, "data": "deadbeef", "value": 0},
+   {"type": "anchor", "spk": "5120...", "value": 546},
+   {"type": "value", "index": 2, "value": 100000}]
+"""
+from __future__ import annotations
+
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Sequence
+
+GUARD_KINDS = ('anchor', 'opret', 'value')
+
+_KIND_LABELS = {'anchor': 'Anchor', 'opret': 'OP_RETURN', 'value': 'Value'}
+
+
+class Guard(NamedTuple):
+    """One output constraint; ``spk_hex`` is canonical lowercase hex (or None for value guards).
+
+    ``index`` None means "any output"; ``data_hex`` is the OP_RETURN payload of opret guards.
+    """
+    kind: str
+    index: Optional[int]
+    spk_hex: Optional[str]
+    value: Optional[int]
+    data_hex: Optional[str] = None
+
+
+class GuardResult(NamedTuple):
+    """Outcome of one guard; ``index`` is the output it was checked against (None if nothing matched)."""
+    kind: str
+    index: Optional[int]
+    ok: bool
+    reason: Optional[str]
+    expected_spk: Optional[str]
+    actual_spk: Optional[str]
+    expected_value: Optional[int]
+    actual_value: Optional[int]
+
+
+def tx_from_psbt(psbt: Any) -> Any:
+    return getattr(psbt, 'tx', None) or getattr(psbt, 'unsigned_tx', None)
+
+
+def tx_outputs(psbt: Any) -> Sequence[Any]:
+    """Return the unsigned tx outputs of a PSBT-like object (no copy)."""
+    tx = tx_from_psbt(psbt)
+    if tx is None:
+        raise RuntimeError('PSBT does not expose unsigned transaction (tx)')
+    vout = getattr(tx, 'vout', None)
+    if vout is None:
+        raise RuntimeError('Transaction has no outputs list (vout)')
+    return vout
+
+
+def output_value(out: Any) -> Optional[int]:
+    v = getattr(out, 'nValue', None)
+    if v is None:
+        v = getattr(out, 'value', None)
+    return None if v is None else int(v)
+
+
+def opret_payload(spk: bytes) -> Optional[bytes]:
+    """Payload of an ``OP_RETURN <push>`` script, or None for any other script."""
+    if len(spk) < 2 or spk[0] != 0x6A:
+        return None
+    op = spk[1]
+    if op <= 75:
+        start, size = 2, op
+    elif op == 0x4C and len(spk) >= 3:
+        start, size = 3, spk[2]
+    elif op == 0x4D and len(spk) >= 4:
+        start, size = 4, int.from_bytes(spk[2:4], 'little')
+    elif op == 0x4E and len(spk) >= 6:
+        start, size = 6, int.from_bytes(spk[2:6], 'little')
+    else:
+        return None
+    if len(spk) != start + size:
+        return None
+    return spk[start:]
+
+
+class OutputIndex:
+    """Hash index from scriptPubKey hex (and OP_RETURN payload hex) to output indices.
+
+    Built with one pass over the outputs; each lookup is a dict probe and
+    returns every matching index in ascending order.
+    """
+
+    __slots__ = ('outputs', '_by_spk', '_by_payload')
+
+    def __init__(self, outputs: Sequence[Any]) -> None:
+        self.outputs = outputs
+        self._by_spk: Dict[str, List[int]] = {}
+        self._by_payload: Dict[str, List[int]] = {}
+        for i, out in enumerate(outputs):
+            spk = out.scriptPubKey.hex().lower()
+            self._by_spk.setdefault(spk, []).append(i)
+            if spk.startswith('6a'):
+                payload = opret_payload(bytes.fromhex(spk))
+                if payload is not None:
+                    self._by_payload.setdefault(payload.hex(), []).append(i)
+
+    def spk_indices(self, spk_hex: str) -> List[int]:
+        return list(self._by_spk.get(spk_hex.lower(), ()))
+
+    def opret_indices(self, data_hex: str) -> List[int]:
+        return list(self._by_payload.get(data_hex.lower(), ()))
+
+
+def _non_negative(name: str, value: Any) -> int:
+    try:
+        ivalue = int(value)
+    except Exception as exc:
+        raise ValueError(f'{name} must be an integer') from exc
+    if ivalue < 0:
+        raise ValueError(f'{name} must be non-negative')
+    return ivalue
+
+
+def opret_spk_hex(data_hex: str) -> str:
+    """scriptPubKey hex for ``OP_RETURN <data>`` with a minimal push."""
+    from .hexutil import parse_hex
+    from .tapscript import pushdata
+    return (b"\x6a" + pushdata(parse_hex('data', data_hex))).hex()
+
+
+def _optional_index(index: Any) -> Optional[int]:
+    return None if index is None else _non_negative('index', index)
+
+
+def anchor_guard(index: Any, spk_hex: str, value: Any) -> Guard:
+    """Anchor guard; ``index`` None matches the spk at any output."""
+    from .hexutil import parse_hex
+    spk = parse_hex('spk', ''.join(str(spk_hex).split())).hex()
+    return Guard('anchor', _optional_index(index), spk, _non_negative('value', value))
+
+
+def opret_guard(index: Any, data_hex: str, value: Any = None) -> Guard:
+    """OP_RETURN guard; ``index`` None matches the payload at any output."""
+    data = ''.join(str(data_hex).split()).lower()
+    spk = opret_spk_hex(data)
+    return Guard('opret', _optional_index(index), spk, None if value is None else _non_negative('value', value), data)
+
+
+def value_guard(index: Any, value: Any) -> Guard:
+    return Guard('value', _non_negative('index', index), None, _non_negative('value', value))
+
+
+def guard_from_dict(obj: Dict[str, Any]) -> Guard:
+    """Build a guard from a guards-file entry (see module docstring)."""
+    kind = obj.get('type')
+    try:
+        if kind == 'anchor':
+            return anchor_guard(obj.get('index'), obj['spk'], obj['value'])
+        if kind == 'opret':
+            return opret_guard(obj.get('index'), obj['data'], obj.get('value'))
+        if kind == 'value':
+            return value_guard(obj['index'], obj['value'])
+    except KeyError as e:
+        raise ValueError(f'{kind} guard missing field {e.args[0]!r}') from e
+    raise ValueError(f'unknown guard type {kind!r} (expected one of: {", ".join(GUARD_KINDS)})')
+
+
+def load_guards_file(path: str) -> List[Guard]:
+    import json
+    with open(path, 'rt') as f:
+        data = json.load(f)
+    if not isinstance(data, list):
+        raise ValueError('guards file must be a JSON list')
+    guards: List[Guard] = []
+    for i, entry in enumerate(data):
+        if not isinstance(entry, dict):
+            raise ValueError(f'guards file entry {i}: must be a JSON object')
+        try:
+            guards.append(guard_from_dict(entry))
+        except ValueError as e:
+            raise ValueError(f'guards file entry {i}: {e}') from e
+    return guards
+
+
+def _check(guard: Guard, actual_spk: str, actual_value: Optional[int]) -> GuardResult:
+    ok_spk = guard.spk_hex is None or actual_spk == guard.spk_hex
+    ok_value = True
+    if guard.value is not None:
+        if actual_value is None:
+            raise RuntimeError('Could not read output value')
+        ok_value = actual_value == guard.value
+    ok = ok_spk and ok_value
+    reason = None if ok else ('spk mismatch' if not ok_spk else 'value mismatch')
+    return GuardResult(guard.kind, guard.index, ok, reason, guard.spk_hex, actual_spk, guard.value, actual_value)
+
+
+def _check_any(guard: Guard, index: OutputIndex) -> GuardResult:
+    if guard.kind == 'opret':
+        candidates = index.opret_indices(guard.data_hex or '')
+        missing = 'no OP_RETURN output with matching data'
+    else:
+        candidates = index.spk_indices(guard.spk_hex or '')
+        missing = 'no output with matching spk'
+    if not candidates:
+        return GuardResult(guard.kind, None, False, missing, guard.spk_hex, None, guard.value, None)
+    first: Optional[GuardResult] = None
+    for i in candidates:
+        out = index.outputs[i]
+        res = _check(guard._replace(index=i), out.scriptPubKey.hex().lower(), output_value(out))
+        if res.ok:
+            return res
+        first = first or res
+    assert first is not None
+    return first
+
+
+def evaluate_guards(outputs: Sequence[Any], guards: Iterable[Guard]) -> List[GuardResult]:
+    """Check every guard against ``outputs``.
+
+    Guards are grouped by output index, so each referenced output is decoded
+    once however many guards point at it and the cost is linear in the
+    number of guards, not outputs x guards. Guards without an index go
+    through an :class:`OutputIndex` built on first use. Results come back in
+    guard order; a guard pointing past the last output fails with an
+    ``out of range`` reason instead of raising.
+    """
+    guards = list(guards)
+    by_index: Dict[int, List[int]] = {}
+    anywhere: List[int] = []
+    for pos, g in enumerate(guards):
+        if g.index is None:
+            anywhere.append(pos)
+        else:
+            by_index.setdefault(g.index, []).append(pos)
+    results: List[Optional[GuardResult]] = [None] * len(guards)
+    n_outputs = len(outputs)
+    for index, positions in by_index.items():
+        if index >= n_outputs:
+            reason = f'output index {index} out of range (num_outputs={n_outputs})'
+            for pos in positions:
+                g = guards[pos]
+                results[pos] = GuardResult(g.kind, g.index, False, reason, g.spk_hex, None, g.value, None)
+            continue
+        out = outputs[index]
+        actual_spk = out.scriptPubKey.hex().lower()
+        actual_value = output_value(out)
+        for pos in positions:
+            results[pos] = _check(guards[pos], actual_spk, actual_value)
+    if anywhere:
+        output_index = OutputIndex(outputs)
+        for pos in anywhere:
+            results[pos] = _check_any(guards[pos], output_index)
+    return [r for r in results if r is not None]
+
+
+def failure_message(results: Iterable[GuardResult]) -> Optional[str]:
+    """Human-readable summary of failed guards (None if all passed)."""
+    failed = [r for r in results if not r.ok]
+    if not failed:
+        return None
+    return '; '.join(
+        f'{_KIND_LABELS[r.kind]} guard failed: {r.reason} '
+        + ('(any index)' if r.index is None else f'(index {r.index})')
+        for r in failed
+    )
@@ -4,27 +4,73 @@ Hex and file input helpers (small, focused)
 Goals
 - Centralize hex parsing and validation with clear error messages.
 - Provide a convenient "file or hex" reader for CLI flags.
+
+Decoding is a single ``binascii.unhexlify`` call over the input (str,
+bytes, bytearray, memoryview or mmap); surrounding whitespace is trimmed
+by index, without copying. The input is only rescanned when decoding
+fails, to report the offset of the first bad character.
 """
 from __future__ import annotations
 
 import binascii
 import re
-from typing import Optional
+from typing import Any, Iterable, List, Optional, Tuple
 
 
 _HEX_RE = re.compile(r"^[0-9a-fA-F]+$")
+_BAD_HEX_RE = re.compile(rb"[^0-9a-fA-F]")
+_WHITESPACE = b' \t\r\n\v\f'
 
 
 def is_hex_str(s: str) -> bool:
     return bool(_HEX_RE.fullmatch(s or ""))
 
 
-def parse_hex(name: str, s: Optional[str], length: Optional[int] = None) -> bytes:
-    """Parse a hex string into bytes with optional fixed-length validation.
+def _hex_error(name: str, data: Any) -> ValueError:
+    """Describe why ``data`` (already trimmed) is not valid hex."""
+    if isinstance(data, str):
+        for i, ch in enumerate(data):
+            if ch not in '0123456789abcdefABCDEF':
+                return ValueError(f"Invalid hex for {name}: unexpected {ch!r} at offset {i}")
+    else:
+        m = _BAD_HEX_RE.search(data)
+        if m is not None:
+            return ValueError(f"Invalid hex for {name}: unexpected {m.group()!r} at offset {m.start()}")
+    return ValueError(f"Invalid hex for {name}: odd number of digits ({len(data)})")
+
+
+def _decode(name: str, data: Any) -> bytes:
+    if isinstance(data, str):
+        s = data.strip()  # returns ``data`` itself when there is nothing to trim
+        if not s:
+            raise ValueError(f"Invalid hex for {name}: empty")
+        try:
+            return binascii.unhexlify(s)
+        except ValueError:  # binascii.Error, or non-ASCII str
+            raise _hex_error(name, s) from None
+    with memoryview(data) as view:
+        start, end = 0, len(view)
+        while start < end and view[start] in _WHITESPACE:
+            start += 1
+        while end > start and view[end - 1] in _WHITESPACE:
+            end -= 1
+        if start == end:
+            raise ValueError(f"Invalid hex for {name}: empty")
+        # release the slice explicitly so an mmap behind ``data`` can be closed
+        with view[start:end] as body:
+            try:
+                return binascii.unhexlify(body)
+            except binascii.Error:
+                raise _hex_error(name, body) from None
+
+
+def parse_hex(name: str, s: Any, length: Optional[int] = None) -> bytes:
+    """Parse hex into bytes with optional fixed-length validation.
 
     Args:
         name: human-readable name for error messages.
-        s: hex string (case-insensitive, even length required).
+        s: hex as str or a bytes-like buffer (bytes, memoryview, mmap);
+            case-insensitive, even length required, surrounding whitespace ignored.
         length: expected length in bytes (optional). If set, enforce exact length.
 
     Returns:
@@ -32,27 +78,34 @@ def parse_hex(name: str, s: Optional[str], length: Optional[int] = None) -> byte
     """
     if s is None:
         raise ValueError(f"{name} is required")
-    s = s.strip()
-    if not is_hex_str(s) or len(s) % 2 != 0:
-        raise ValueError(f"Invalid hex for {name}")
     try:
-        b = binascii.unhexlify(s)
-    except Exception:
-        raise ValueError(f"Invalid hex for {name}")
+        b = _decode(name, s)
+    except TypeError:
+        raise ValueError(f"Invalid hex for {name}: expected str or bytes, got {type(s).__name__}") from None
     if length is not None and len(b) != length:
         raise ValueError(f"{name} must be {length} bytes (got {len(b)})")
     return b
 
 
+def parse_hex_many(fields: Iterable[Tuple[str, Any, Optional[int]]]) -> List[bytes]:
+    """Decode several ``(name, hex, length)`` fields, failing on the first bad one.
+
+    Convenient for records (JSONL lines, policy parameters) that carry a
+    fixed set of hex fields.
+    """
+    return [parse_hex(name, value, length) for name, value, length in fields]
+
+
 def file_or_hex(name: str, hex_value: Optional[str], file_path: Optional[str], *, length: Optional[int] = None) -> bytes:
     """Read bytes from a hex string or a file containing hex.
 
-    Precedence: hex_value if provided; otherwise file_path is used.
+    Precedence: hex_value if provided; otherwise file_path is used. Files are
+    read as bytes and decoded without a text round trip.
     Raises if neither is provided.
     """
     if hex_value:
         return parse_hex(name, hex_value, length)
     if file_path:
-        with open(file_path, 'rt') as f:
-            return parse_hex(name, f.read().strip(), length)
+        with open(file_path, 'rb') as f:
+            return parse_hex(name, f.read(), length)
     raise ValueError(f"{name} required")
@@ -0,0 +1,313 @@
+"""
+Bounded memoization for vault derivation (tapscript, leaf hash, output key).
+
+Two levels, each an LRU map with hit/miss counters:
+  policy:  (hash_h, borrower_pk, csv_blocks, provider_pk) -> (tapscript, leaf_hash)
+  output:  (internal_key, merkle_root) -> (output_key, parity)
+
+:func:`default_cache` is the per-process instance used by ``derive_vault``
+(``build-vaults``, ``registry-import``) and by path verification
+(``verify-path``, the daemon). ``SSV_MEMO_SIZE`` bounds each level (default
+4096 entries, ``0`` disables caching); ``SSV_MEMO_FILE`` names a persistence
+file that is loaded on first use and merged back at process exit (pool
+workers included, when they shut down cleanly). Caches
+are safe to share between threads; a value computed twice by racing
+threads is simply stored twice.
+
+The file is not trusted: policy entries are rebuilt and checked on load,
+and output keys read from it are recomputed (once per process) before
+derivation or path verification relies on them.
+
+Persistence format (little-endian, keys and values as raw bytes):
+  b'SSVM' 0x01
+  | n_policy u32 | per entry: hash_h 32 | borrower_pk 32 | csv_blocks u32
+  |     | provider_pk 32 | script_len u8 | tapscript | leaf_hash 32
+  | n_output u32 | per entry: internal_key 32 | merkle_root 32 | output_key 32 | parity u8
+"""
+from __future__ import annotations
+
+import os
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Dict, Hashable, Iterator, List, NamedTuple, Optional, Tuple
+
+MEMO_MAGIC = b'SSVM\x01'
+DEFAULT_MAX_ENTRIES = 4096
+_MISSING = object()
+
+PolicyKey = Tuple[bytes, bytes, int, bytes]
+OutputKey = Tuple[bytes, bytes]
+
+
+class CacheStats(NamedTuple):
+    hits: int
+    misses: int
+    evictions: int
+    size: int
+    maxsize: int
+
+    def as_dict(self) -> Dict[str, int]:
+        return self._asdict()
+
+
+class LRUCache:
+    """Thread-safe mapping bounded to ``maxsize`` entries (least recently used evicted first)."""
+
+    def __init__(self, maxsize: int = DEFAULT_MAX_ENTRIES) -> None:
+        if maxsize < 0:
+            raise ValueError(f'maxsize must be >= 0 (got {maxsize})')
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._data: 'OrderedDict[Hashable, Any]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the cached value (refreshing it) or ``default``, counting a hit or miss."""
+        with self._lock:
+            value = self._data.get(key, _MISSING)
+            if value is _MISSING:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        if not self.maxsize:
+            return
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def items(self) -> List[Tuple[Hashable, Any]]:
+        """Snapshot of the entries, least recently used first."""
+        with self._lock:
+            return list(self._data.items())
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(self.hits, self.misses, self.evictions, len(self._data), self.maxsize)
+
+
+def _policy_value(key: PolicyKey) -> Tuple[bytes, bytes]:
+    from .tapscript import build_tapscript_bytes, tapleaf_hash_tagged
+    script = build_tapscript_bytes(*key)
+    return script, tapleaf_hash_tagged(script)
+
+
+def _policy_matches(key: PolicyKey, value: Tuple[bytes, bytes]) -> bool:
+    try:
+        return _policy_value(key) == value
+    except ValueError:
+        return False
+
+
+class DerivationCache:
+    """The policy and output-key levels, with optional file persistence."""
+
+    def __init__(self, maxsize: int = DEFAULT_MAX_ENTRIES, path: Optional[str] = None) -> None:
+        self.policy = LRUCache(maxsize)
+        self.output = LRUCache(maxsize)
+        self.path = path
+
+    def tapscript(self, hash_h: bytes, borrower_pk: bytes, csv_blocks: int, provider_pk: bytes) -> Tuple[bytes, bytes]:
+        """(tapscript, leaf_hash) for a policy, built on a miss."""
+        key = (bytes(hash_h), bytes(borrower_pk), csv_blocks, bytes(provider_pk))
+        hit = self.policy.get(key)
+        if hit is not None:
+            return hit
+        value = _policy_value(key)
+        self.policy.put(key, value)
+        return value
+
+    def output_key(self, internal_key: bytes, merkle_root: bytes, *, verified: bool = False) -> Tuple[bytes, int]:
+        """(x-only output key, parity) for an internal key and merkle root, tweaked on a miss.
+
+        Entries loaded from a persistence file are unchecked; with ``verified``
+        such an entry is recomputed (and replaced) before it is returned, so
+        derivation and verification never rest on file contents. Every caller
+        in this package passes it.
+        """
+        key = (bytes(internal_key), bytes(merkle_root))
+        hit = self.output.get(key)
+        if hit is not None and (hit[2] or not verified):
+            return hit[0], hit[1]
+        from .taproot import _check_path_lengths, _tweak_from_root, get_ec_backend
+        _check_path_lengths(key[0], key[1], ())
+        backend = get_ec_backend()
+        qx, parity = backend.tweak_xonly(backend.load_xonly(key[0]), _tweak_from_root(*key))
+        self.output.put(key, (qx, parity, True))
+        return qx, parity
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        return {'policy': self.policy.stats().as_dict(), 'output': self.output.stats().as_dict()}
+
+    def clear(self) -> None:
+        self.policy.clear()
+        self.output.clear()
+
+    def dumps(self) -> bytes:
+        """Serialize both levels (least recently used first, so reloading keeps the order)."""
+        policy = self.policy.items()
+        output = self.output.items()
+        parts = [MEMO_MAGIC, len(policy).to_bytes(4, 'little')]
+        for (h, pb, csv, pp), (script, leaf) in policy:
+            parts += [h, pb, csv.to_bytes(4, 'little'), pp, bytes([len(script)]), script, leaf]
+        parts.append(len(output).to_bytes(4, 'little'))
+        for (internal, root), (qx, parity, _checked) in output:
+            parts += [internal, root, qx, bytes([parity])]
+        return b''.join(parts)
+
+    def loads(self, blob: bytes) -> int:
+        """Merge entries from :meth:`dumps` output; returns the number loaded.
+
+        Policy entries are rebuilt (cheap) and dropped unless they match;
+        output-key entries are kept but marked unchecked (see :meth:`output_key`).
+        """
+        mv = memoryview(blob)
+        if bytes(mv[:5]) != MEMO_MAGIC:
+            raise ValueError('not an ssv memo file')
+        off = 5
+
+        def take(n: int) -> bytes:
+            nonlocal off
+            if off + n > len(mv):
+                raise ValueError('truncated memo file')
+            off += n
+            return bytes(mv[off - n:off])
+
+        policy = []
+        for _ in range(int.from_bytes(take(4), 'little')):
+            h, pb, csv, pp = take(32), take(32), int.from_bytes(take(4), 'little'), take(32)
+            script = take(take(1)[0])
+            policy.append(((h, pb, csv, pp), (script, take(32))))
+        policy = [(key, value) for key, value in policy if _policy_matches(key, value)]
+        output = []
+        for _ in range(int.from_bytes(take(4), 'little')):
+            internal, root, qx, parity = take(32), take(32), take(32), take(1)[0]
+            if parity > 1:
+                raise ValueError('bad parity in memo file')
+            output.append(((internal, root), (qx, parity, False)))
+        if off != len(mv):
+            raise ValueError('trailing data in memo file')
+        for key, value in policy:
+            self.policy.put(key, value)
+        for key, value in output:
+            self.output.put(key, value)
+        return len(policy) + len(output)
+
+    def load(self, path: Optional[str] = None) -> int:
+        with open(path or self.path, 'rb') as f:
+            return self.loads(f.read())
+
+    def save(self, path: Optional[str] = None) -> None:
+        """Merge this cache into the file at ``path`` and rewrite it atomically.
+
+        Writers are serialized with an advisory lock on ``<path>.lock`` and
+        merge with what is on disk, so pool workers saving side by side each
+        add their entries instead of overwriting one another.
+        """
+        path = path or self.path
+        if not path:
+            raise ValueError('no memo file path set')
+        with _file_lock(path + '.lock'):
+            merged = DerivationCache(max(self.policy.maxsize, 1))
+            try:
+                merged.load(path)
+            except (OSError, ValueError):
+                pass  # no file yet, or a damaged one that is simply rewritten
+            for key, value in self.policy.items():
+                merged.policy.put(key, value)
+            for key, value in self.output.items():
+                merged.output.put(key, value)
+            tmp = f'{path}.{os.getpid()}.tmp'
+            with open(tmp, 'wb') as f:
+                f.write(merged.dumps())
+            os.replace(tmp, path)
+
+
+@contextmanager
+def _file_lock(path: str) -> Iterator[None]:
+    try:
+        import fcntl
+    except ImportError:  # no advisory locks: fall back to last writer wins
+        yield
+        return
+    with open(path, 'ab') as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+_DEFAULT: Optional[DerivationCache] = None
+_DEFAULT_PID: Optional[int] = None
+_DEFAULT_LOCK = threading.Lock()
+
+
+def _max_entries_from_env() -> int:
+    raw = os.environ.get('SSV_MEMO_SIZE')
+    if not raw:
+        return DEFAULT_MAX_ENTRIES
+    try:
+        return int(raw)
+    except ValueError:
+        raise ValueError(f'SSV_MEMO_SIZE must be an integer (got {raw!r})') from None
+
+
+def _save_at_exit(cache: DerivationCache) -> None:
+    try:
+        cache.save()
+    except OSError:
+        pass  # best effort: the cache is only an accelerator
+
+
+def default_cache() -> DerivationCache:
+    """The per-process cache, configured from ``SSV_MEMO_SIZE`` / ``SSV_MEMO_FILE`` on first use.
+
+    A missing or damaged persistence file starts an empty cache. The save
+    is a multiprocessing finalizer, so it also runs when a pool worker
+    (``--workers``, ``ssv serve``) shuts down cleanly, not only at
+    interpreter exit; a forked worker registers its own on first use.
+    """
+    global _DEFAULT, _DEFAULT_PID
+    cache = _DEFAULT
+    if cache is not None and _DEFAULT_PID == os.getpid():
+        return cache
+    with _DEFAULT_LOCK:
+        if _DEFAULT is None:
+            _DEFAULT = DerivationCache(_max_entries_from_env(), os.environ.get('SSV_MEMO_FILE') or None)
+            if _DEFAULT.path and _DEFAULT.policy.maxsize:
+                try:
+                    _DEFAULT.load()
+                except (OSError, ValueError):
+                    pass
+        if _DEFAULT_PID != os.getpid():
+            _DEFAULT_PID = os.getpid()
+            if _DEFAULT.path and _DEFAULT.policy.maxsize:
+                from multiprocessing.util import Finalize
+                Finalize(None, _save_at_exit, args=(_DEFAULT,), exitpriority=0)
+        return _DEFAULT
+
+
+def reset_default_cache() -> None:
+    """Forget the per-process cache (the next :func:`default_cache` re-reads the environment)."""
+    global _DEFAULT, _DEFAULT_PID
+    with _DEFAULT_LOCK:
+        _DEFAULT = None
+        _DEFAULT_PID = None
@@ -9,6 +9,8 @@ from __future__ import annotations
 from dataclasses import dataclass
 from typing import Any
 
+from .hexutil import parse_hex
+
 MAX_CSV_BLOCKS = 0xFFFF  # BIP-68 block-based CSV uses low 16 bits only
 
 
@@ -25,6 +27,16 @@ def normalize_csv_blocks(value: Any) -> int:
     return n
 
 
+def _is_hex32(name: str, value: Any) -> bool:
+    if not isinstance(value, str) or len(value) != 64:
+        return False
+    try:
+        parse_hex(name, value, length=32)
+    except ValueError:
+        return False
+    return True
+
+
 @dataclass
 class PolicyParams:
     """Parameters defining the tapscript policy.
@@ -41,11 +53,9 @@ class PolicyParams:
     csv_blocks: int
 
     def validate(self) -> None:
-        from .hexutil import is_hex_str
-        if not is_hex_str(self.hash_h) or len(self.hash_h) != 64:
-            raise ValueError("hash_h must be 32-byte hex (64 chars)")
-        if not is_hex_str(self.borrower_xonly) or len(self.borrower_xonly) != 64:
-            raise ValueError("borrower_xonly must be 32-byte hex (x-only)")
-        if not is_hex_str(self.provider_xonly) or len(self.provider_xonly) != 64:
-            raise ValueError("provider_xonly must be 32-byte hex (x-only)")
+        for name, message in (("hash_h", "hash_h must be 32-byte hex (64 chars)"),
+                              ("borrower_xonly", "borrower_xonly must be 32-byte hex (x-only)"),
+                              ("provider_xonly", "provider_xonly must be 32-byte hex (x-only)")):
+            if not _is_hex32(name, getattr(self, name)):
+                raise ValueError(message)
         self.csv_blocks = normalize_csv_blocks(self.csv_blocks)
@@ -0,0 +1,223 @@
+"""
+Content-addressed parse cache for read-only PSBT commands.
+
+Entries are keyed by the SHA-256 of the PSBT file bytes and hold a compact
+binary summary: tx version and locktime, every input's outpoint, nSequence
+and witness_utxo (amount + spk), and every output's value and spk. A hit
+skips decoding and walking the PSBT entirely; the summary exposes the same
+duck-typed surface as :class:`ssv.psbtio.PSBTView` (``.tx.vout[i]``,
+``.tx.vin[i]``, ``.inputs[i].witness_utxo``).
+
+The cache is opt-in: set ``SSV_PSBT_CACHE_DIR`` to a directory. The
+directory is kept under ``SSV_PSBT_CACHE_MAX_BYTES`` (default 64 MiB) by
+evicting least recently used entries (hits refresh an entry's mtime).
+
+Summary format (little-endian):
+  b'SSVC' 0x01 | nVersion u32 | nLockTime u32
+  | n_in CompactSize | per input: txid 32 | vout u32 | nSequence u32
+  |     has_witness_utxo u8 [| value u64 | spk_len CompactSize | spk]
+  | n_out CompactSize | per output: value u64 | spk_len CompactSize | spk
+"""
+from __future__ import annotations
+
+import hashlib
+import os
+from typing import Any, List, Optional, Tuple
+
+from .psbtio import STDIO, PSBTView, TxInView, TxOutView, _read_compact, decode_psbt_bytes
+from .tapscript import compactsize
+
+SUMMARY_MAGIC = b'SSVC\x01'
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+_SUFFIX = '.ssvc'
+
+
+class _SummaryTx:
+    __slots__ = ('nVersion', 'nLockTime', 'vin', 'vout')
+
+    def __init__(self, version: int, locktime: int, vin: List[TxInView], vout: List[TxOutView]) -> None:
+        self.nVersion = version
+        self.nLockTime = locktime
+        self.vin = vin
+        self.vout = vout
+
+
+class _SummaryInput:
+    __slots__ = ('witness_utxo',)
+
+    def __init__(self, witness_utxo: Optional[TxOutView]) -> None:
+        self.witness_utxo = witness_utxo
+
+
+class PSBTSummary:
+    """Decoded cache entry; read-only stand-in for :class:`ssv.psbtio.PSBTView`."""
+
+    __slots__ = ('tx', 'inputs')
+
+    def __init__(self, tx: _SummaryTx, inputs: List[_SummaryInput]) -> None:
+        self.tx = tx
+        self.inputs = inputs
+
+    @property
+    def unsigned_tx(self) -> _SummaryTx:
+        return self.tx
+
+    def close(self) -> None:
+        pass
+
+    def __enter__(self) -> 'PSBTSummary':
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        pass
+
+
+def _txout_bytes(out: TxOutView) -> bytes:
+    return out.nValue.to_bytes(8, 'little') + compactsize(len(out.scriptPubKey)) + out.scriptPubKey
+
+
+def summarize(view: Any) -> bytes:
+    """Serialize the fields read-only commands use from a PSBTView-like object."""
+    tx = view.tx
+    parts = [SUMMARY_MAGIC, tx.nVersion.to_bytes(4, 'little'), tx.nLockTime.to_bytes(4, 'little'),
+             compactsize(len(tx.vin))]
+    for txin, pin in zip(tx.vin, view.inputs):
+        parts.append(txin.prevout_hash + txin.prevout_n.to_bytes(4, 'little') + txin.nSequence.to_bytes(4, 'little'))
+        wu = pin.witness_utxo
+        parts.append(b'\x00' if wu is None else b'\x01' + _txout_bytes(wu))
+    parts.append(compactsize(len(tx.vout)))
+    parts.extend(_txout_bytes(out) for out in tx.vout)
+    return b''.join(parts)
+
+
+def _parse_txout(buf: bytes, off: int) -> Tuple[TxOutView, int]:
+    value = int.from_bytes(buf[off:off + 8], 'little')
+    slen, soff = _read_compact(buf, off + 8)
+    end = soff + slen
+    if end > len(buf):
+        raise ValueError('truncated PSBT summary')
+    return TxOutView(value, buf[soff:end]), end
+
+
+def parse_summary(buf: bytes) -> PSBTSummary:
+    if not buf.startswith(SUMMARY_MAGIC):
+        raise ValueError('not a PSBT summary')
+    off = len(SUMMARY_MAGIC)
+    version = int.from_bytes(buf[off:off + 4], 'little')
+    locktime = int.from_bytes(buf[off + 4:off + 8], 'little')
+    n_in, off = _read_compact(buf, off + 8)
+    vin: List[TxInView] = []
+    inputs: List[_SummaryInput] = []
+    for _ in range(n_in):
+        if off + 41 > len(buf):
+            raise ValueError('truncated PSBT summary')
+        vin.append(TxInView(buf[off:off + 32], int.from_bytes(buf[off + 32:off + 36], 'little'),
+                            int.from_bytes(buf[off + 36:off + 40], 'little')))
+        has_wu = buf[off + 40]
+        off += 41
+        wu: Optional[TxOutView] = None
+        if has_wu:
+            wu, off = _parse_txout(buf, off)
+        inputs.append(_SummaryInput(wu))
+    n_out, off = _read_compact(buf, off)
+    vout: List[TxOutView] = []
+    for _ in range(n_out):
+        out, off = _parse_txout(buf, off)
+        vout.append(out)
+    if off != len(buf):
+        raise ValueError('trailing bytes in PSBT summary')
+    return PSBTSummary(_SummaryTx(version, locktime, vin, vout), inputs)
+
+
+def cache_dir_from_env() -> Optional[str]:
+    return os.environ.get('SSV_PSBT_CACHE_DIR') or None
+
+
+def _max_bytes_from_env() -> int:
+    raw = os.environ.get('SSV_PSBT_CACHE_MAX_BYTES')
+    if not raw:
+        return DEFAULT_MAX_BYTES
+    try:
+        return int(raw)
+    except ValueError:
+        raise ValueError(f'SSV_PSBT_CACHE_MAX_BYTES must be an integer (got {raw!r})') from None
+
+
+def evict(cache_dir: str, max_bytes: int) -> int:
+    """Delete least recently used entries until the cache fits ``max_bytes``.
+
+    Returns the number of entries removed.
+    """
+    entries = []
+    total = 0
+    with os.scandir(cache_dir) as it:
+        for e in it:
+            if e.name.endswith(_SUFFIX) and e.is_file():
+                try:
+                    st = e.stat()
+                except FileNotFoundError:
+                    continue  # removed by a concurrent eviction
+                entries.append((st.st_mtime_ns, st.st_size, e.path))
+                total += st.st_size
+    if total <= max_bytes:
+        return 0
+    removed = 0
+    for _mtime, size, path in sorted(entries):
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass  # another process evicted it first
+        removed += 1
+        total -= size
+        if total <= max_bytes:
+            break
+    return removed
+
+
+def _read_file(path: str) -> bytes:
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+def load_cached(path: str, cache_dir: str, *, max_bytes: int = DEFAULT_MAX_BYTES) -> Any:
+    """Return a summary for the PSBT at ``path``, parsing and caching on a miss.
+
+    The cache is only an accelerator: an unreadable or unwritable cache
+    directory (read-only, full disk) never fails the load.
+    """
+    data = _read_file(path)
+    entry = os.path.join(cache_dir, hashlib.sha256(data).hexdigest() + _SUFFIX)
+    try:
+        summary = parse_summary(_read_file(entry))
+    except (OSError, ValueError):
+        pass  # miss (or a damaged or unreadable entry, which is simply rewritten)
+    else:
+        try:
+            os.utime(entry)  # LRU: mark as recently used
+        except OSError:
+            pass
+        return summary
+    view = PSBTView(decode_psbt_bytes(data))
+    blob = summarize(view)
+    tmp = f'{entry}.{os.getpid()}.tmp'
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        with open(tmp, 'wb') as f:
+            f.write(blob)
+        os.replace(tmp, entry)
+        evict(cache_dir, max_bytes)
+    except OSError:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+    return view
+
+
+def load_readonly_psbt(path: str) -> Any:
+    """Open a PSBT for read-only inspection, through the cache when enabled."""
+    from .psbtio import load_psbt_view
+    cache_dir = cache_dir_from_env()
+    if cache_dir is None or path == STDIO:
+        return load_psbt_view(path)
+    return load_cached(path, cache_dir, max_bytes=_max_bytes_from_env())
@@ -0,0 +1,181 @@
+"""
+Native construction of unsigned CLOSE/LIQUIDATE PSBTs for a vault UTXO.
+
+The PSBT spends one vault output (outpoint + amount) through the SSV leaf
+and carries everything a signer needs, with no wallet or node involved:
+
+- global unsigned tx: version 2, one input, the requested outputs
+- input: ``witness_utxo`` (amount + P2TR spk of the vault), BIP-371
+  ``tap_leaf_script`` (control block -> tapscript || leaf version),
+  ``tap_internal_key`` and ``tap_merkle_root``
+- nSequence: ``csv_blocks`` for the provider (LIQUIDATE) branch so the CSV
+  check passes; 0xFFFFFFFD (RBF, no relative lock) for the borrower branch
+
+Outputs are written in the order: destinations (``--output``), then TapRet
+anchors (``--anchor``), then OP_RETURN anchors (``--opret``).
+"""
+from __future__ import annotations
+
+from typing import Any, Dict, List, NamedTuple, Sequence, Tuple
+
+from .psbtio import PSBTMaps, _sha256d_id, serialize_maps
+from .tapscript import LEAF_VERSION, compactsize
+
+TX_VERSION = 2
+BORROWER_SEQUENCE = 0xFFFFFFFD
+
+# BIP-174 / BIP-371 key types
+PSBT_GLOBAL_UNSIGNED_TX = b'\x00'
+PSBT_IN_WITNESS_UTXO = b'\x01'
+PSBT_IN_TAP_LEAF_SCRIPT = 0x15
+PSBT_IN_TAP_INTERNAL_KEY = b'\x17'
+PSBT_IN_TAP_MERKLE_ROOT = b'\x18'
+
+
+class CreatedPSBT(NamedTuple):
+    psbt: bytes
+    txid: str
+    vault_spk: str
+    n_sequence: int
+
+
+def parse_outpoint(outpoint: str) -> Tuple[bytes, int]:
+    """``TXID:VOUT`` (display-order txid) -> (internal-order hash, vout)."""
+    from .hexutil import parse_hex
+    txid, sep, vout = str(outpoint).partition(':')
+    if not sep:
+        raise ValueError(f'outpoint must be TXID:VOUT (got {outpoint!r})')
+    try:
+        n = int(vout)
+    except ValueError:
+        raise ValueError(f'outpoint vout must be an integer (got {vout!r})') from None
+    if not 0 <= n <= 0xFFFFFFFF:
+        raise ValueError('outpoint vout out of range')
+    return parse_hex('outpoint txid', txid, length=32)[::-1], n
+
+
+def _amount(name: str, value: Any) -> int:
+    try:
+        n = int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f'{name} must be an integer number of sats') from None
+    if n < 0:
+        raise ValueError(f'{name} must be non-negative')
+    return n
+
+
+def parse_output_spec(flag: str, spec: str) -> Tuple[bytes, int]:
+    """``SPK_HEX:SAT`` -> (scriptPubKey, value)."""
+    from .hexutil import parse_hex
+    spk, sep, value = str(spec).rpartition(':')
+    if not sep:
+        raise ValueError(f'{flag} expects SPK:SAT (got {spec!r})')
+    return parse_hex(flag, spk), _amount(f'{flag} value', value)
+
+
+def parse_opret_spec(spec: str) -> Tuple[bytes, int]:
+    """``DATA_HEX[:SAT]`` -> (OP_RETURN scriptPubKey, value)."""
+    from .guards import opret_spk_hex
+    data, sep, value = str(spec).partition(':')
+    return bytes.fromhex(opret_spk_hex(data)), _amount('--opret value', value) if sep else 0
+
+
+def _txout(value: int, spk: bytes) -> bytes:
+    return value.to_bytes(8, 'little') + compactsize(len(spk)) + spk
+
+
+def create_vault_psbt(
+    *,
+    outpoint: str,
+    amount: Any,
+    mode: str,
+    tapscript: bytes,
+    csv_blocks: int,
+    control: bytes,
+    outputs: Sequence[Tuple[bytes, int]],
+    locktime: int = 0,
+) -> CreatedPSBT:
+    """Build the unsigned PSBT spending a vault UTXO through the SSV leaf.
+
+    ``control`` is the leaf's control block; the vault spk (witness_utxo) is
+    derived from it, so a control block that does not commit to
+    ``tapscript`` yields a PSBT nobody can sign for.
+    """
+    from .taproot import output_key_from_control, parse_control_block, scriptpubkey_from_xonly
+    from .tapscript import tapleaf_hash_tagged
+    if mode not in ('borrower', 'provider'):
+        raise ValueError("mode must be 'borrower' or 'provider'")
+    prev_hash, prev_n = parse_outpoint(outpoint)
+    value_in = _amount('amount', amount)
+    if not outputs:
+        raise ValueError('at least one output is required')
+    total_out = sum(v for _spk, v in outputs)
+    if total_out > value_in:
+        raise ValueError(f'outputs ({total_out} sat) exceed the vault amount ({value_in} sat)')
+    if not 0 <= locktime <= 0xFFFFFFFF:
+        raise ValueError('locktime out of range')
+
+    cb = parse_control_block(control)
+    if cb.leaf_version != LEAF_VERSION:
+        raise ValueError(f'unsupported leaf version 0x{cb.leaf_version:02x} (expected 0x{LEAF_VERSION:02x})')
+    leaf = tapleaf_hash_tagged(tapscript)
+    output_key, parity = output_key_from_control(cb, leaf)
+    if parity != cb.parity:
+        raise ValueError('control block parity does not match the derived output key')
+    vault_spk = scriptpubkey_from_xonly(output_key)
+
+    n_sequence = csv_blocks if mode == 'provider' else BORROWER_SEQUENCE
+    unsigned = b''.join([
+        TX_VERSION.to_bytes(4, 'little'),
+        b'\x01', prev_hash, prev_n.to_bytes(4, 'little'), b'\x00', n_sequence.to_bytes(4, 'little'),
+        compactsize(len(outputs)), *(_txout(v, spk) for spk, v in outputs),
+        locktime.to_bytes(4, 'little'),
+    ])
+    tap_leaf_key = bytes([PSBT_IN_TAP_LEAF_SCRIPT]) + control
+    input_map: Dict[bytes, bytes] = {
+        PSBT_IN_WITNESS_UTXO: _txout(value_in, vault_spk),
+        tap_leaf_key: tapscript + bytes([cb.leaf_version]),
+        PSBT_IN_TAP_INTERNAL_KEY: cb.internal_key,
+        PSBT_IN_TAP_MERKLE_ROOT: cb.merkle_root(leaf),
+    }
+    maps = PSBTMaps({PSBT_GLOBAL_UNSIGNED_TX: unsigned}, [input_map], [{} for _ in outputs])
+    return CreatedPSBT(serialize_maps(maps), _sha256d_id(unsigned), vault_spk.hex(), n_sequence)
+
+
+def create_from_spec(spec: Dict[str, Any]) -> CreatedPSBT:
+    """Build a PSBT from ``ssv create-psbt`` option names (CLI flags or batch record).
+
+    Policy comes from ``hash_h``/``borrower_pk``/``csv_blocks``/``provider_pk``;
+    the control block from ``control`` (hex) or, for a single-leaf tree,
+    ``internal_key``. ``output``/``anchor`` are lists of ``SPK:SAT`` and
+    ``opret`` a list of ``DATA[:SAT]``.
+    """
+    from .hexutil import parse_hex
+    from .policy import PolicyParams
+    from .taproot import compute_output_key
+    from .tapscript import build_tapscript, tapleaf_hash_tagged
+    params = PolicyParams(spec.get('hash_h'), spec.get('borrower_pk'), spec.get('provider_pk'), spec.get('csv_blocks'))
+    params.validate()
+    tapscript = build_tapscript(params.hash_h, params.borrower_xonly, params.csv_blocks, params.provider_xonly)
+    if spec.get('control'):
+        control = parse_hex('control', spec['control'])
+    elif spec.get('internal_key'):
+        internal = parse_hex('internal_key', spec['internal_key'], length=32)
+        _q, parity = compute_output_key(internal, tapleaf_hash_tagged(tapscript), [])
+        control = bytes([LEAF_VERSION | parity]) + internal
+    else:
+        raise ValueError('either --control or --internal-key must be supplied')
+    outputs: List[Tuple[bytes, int]] = []
+    outputs += [parse_output_spec('--output', s) for s in spec.get('output') or []]
+    outputs += [parse_output_spec('--anchor', s) for s in spec.get('anchor') or []]
+    outputs += [parse_opret_spec(s) for s in spec.get('opret') or []]
+    return create_vault_psbt(
+        outpoint=spec.get('outpoint') or '',
+        amount=spec.get('amount'),
+        mode=spec.get('mode') or '',
+        tapscript=tapscript,
+        csv_blocks=params.csv_blocks,
+        control=control,
+        outputs=outputs,
+        locktime=int(spec.get('locktime') or 0),
+    )
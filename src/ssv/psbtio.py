@@ -1,19 +1,36 @@
 """
 PSBT IO helpers (thin wrappers around python-bitcointx via dynamic import).
 
-Provides functions to load PSBTs from files (auto-detect hex vs base64),
-write PSBTs back to files, extract witness_utxo scriptPubKey, and convert
-to raw transaction hex.
+Provides functions to load PSBTs from files (auto-detect binary, hex or
+base64), write PSBTs back to files, extract witness_utxo scriptPubKey, and
+convert to raw transaction hex.
+
+Read-only commands use :class:`PSBTView` instead: a native BIP-174 reader
+that records where each key-value map lives and decodes only the fields
+that are asked for (unsigned tx outputs, per-input witness_utxo). It does
+not need python-bitcointx.
 """
 from __future__ import annotations
 
 import base64
 import binascii
-from typing import Any
+from array import array
+from collections.abc import Sequence
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Sequence as SequenceT, Tuple
+
+PSBT_MAGIC = b'psbt\xff'
+_HEX_MAGIC = PSBT_MAGIC.hex().encode()     # b'70736274ff'
+_B64_MAGIC = b'cHNidP'                     # base64 of b'psbt\xff' (first 6 chars)
+_WHITESPACE = b' \t\r\n\x0b\x0c'
 
-from .hexutil import is_hex_str
+PSBT_FORMATS = ('base64', 'hex', 'binary')
+STDIO = '-'   # path meaning stdin (inputs) or stdout (outputs)
 
 
+# The python-bitcointx shims below resolve on first use and are cached, so
+# importing this module stays cheap and repeated calls skip importlib.
+@lru_cache(maxsize=None)
 def _imp_psbt():
     import importlib
     mod = importlib.import_module('bitcointx.core.psbt')
@@ -28,52 +45,688 @@ def _imp_psbt():
     return cls
 
 
+@lru_cache(maxsize=None)
 def _imp_core_script_witness():
     import importlib
     return importlib.import_module('bitcointx.core.script').CScriptWitness
 
 
-def _imp_b2x():
-    import importlib
-    return importlib.import_module('bitcointx.core').b2x
+def sniff_psbt_format(head: bytes) -> str:
+    """Classify PSBT data as 'binary', 'hex' or 'base64' from its first bytes."""
+    if head.startswith(PSBT_MAGIC):
+        return 'binary'
+    head = head.lstrip(_WHITESPACE)
+    if head[:10].lower() == _HEX_MAGIC:
+        return 'hex'
+    if head.startswith(_B64_MAGIC):
+        return 'base64'
+    raise ValueError('not a PSBT (expected BIP-174 binary, hex or base64 data starting with the psbt magic)')
+
+
+def decode_psbt_bytes(buf: Any) -> bytes:
+    """Return the serialized PSBT held in ``buf`` (bytes, memoryview or mmap).
+
+    Binary input is returned as-is; hex and base64 are decoded straight from
+    the buffer without building an intermediate str.
+    """
+    with memoryview(buf) as view:
+        if len(view) == 0:
+            raise ValueError('empty PSBT data')
+        fmt = sniff_psbt_format(bytes(view[:64]))
+        if fmt == 'binary':
+            return bytes(view)
+        start, end = 0, len(view)
+        while start < end and view[start] in _WHITESPACE:
+            start += 1
+        while end > start and view[end - 1] in _WHITESPACE:
+            end -= 1
+        # release the slice explicitly so an mmap behind ``buf`` can be closed
+        with view[start:end] as body:
+            if fmt == 'base64':
+                # wrapped base64 is fine, but any other non-alphabet byte is corruption
+                try:
+                    return base64.b64decode(bytes(body).translate(None, _WHITESPACE), validate=True)
+                except binascii.Error as e:
+                    raise ValueError(f'invalid base64 PSBT data: {e}') from None
+            try:
+                return binascii.unhexlify(body)
+            except binascii.Error:
+                pass
+            # wrapped hex: drop whitespace and retry once
+            from .hexutil import parse_hex
+            return parse_hex('PSBT', bytes(body).translate(None, _WHITESPACE))
+
+
+def _read_stdin_bytes() -> bytes:
+    import sys
+    stream = getattr(sys.stdin, 'buffer', None)
+    if stream is not None:
+        return stream.read()
+    return sys.stdin.read().encode()  # text-only stdin (e.g. redirected in-process)
+
+
+def write_output_bytes(path: str, data: bytes) -> None:
+    """Write ``data`` to ``path``; ``-`` writes to stdout (binary-safe)."""
+    import sys
+    if path != STDIO:
+        with open(path, 'wb') as f:
+            f.write(data)
+        return
+    stream = getattr(sys.stdout, 'buffer', None)
+    if stream is not None:
+        sys.stdout.flush()
+        stream.write(data)
+        stream.flush()
+        return
+    # text-only stdout (e.g. captured in-process): only text formats fit
+    try:
+        sys.stdout.write(data.decode('ascii'))
+    except UnicodeDecodeError:
+        raise ValueError('binary output needs a byte stream on stdout; use --format base64 or hex') from None
+
+
+def read_psbt_bytes(path: str) -> bytes:
+    """Memory-map ``path`` (or read stdin for ``-``) and return the serialized PSBT."""
+    import mmap
+    if path == STDIO:
+        return decode_psbt_bytes(_read_stdin_bytes())
+    with open(path, 'rb') as f:
+        try:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (ValueError, OSError):  # empty file, pipe or other unmappable input
+            return decode_psbt_bytes(f.read())
+        with mm:
+            return decode_psbt_bytes(mm)
+
+
+def load_psbt_from_bytes(buf: Any) -> Any:
+    """Deserialize a PSBT from binary, hex or base64 data."""
+    PSBT = _imp_psbt()
+    return PSBT.deserialize(decode_psbt_bytes(buf))
 
 
 def load_psbt_from_file(path: str) -> Any:
-    """Load a PSBT from file contents which may be hex or base64.
+    """Load a PSBT from a file holding BIP-174 binary, hex or base64.
+
+    The file is memory-mapped and its encoding sniffed from the first bytes;
+    the decoded bytes go straight to the deserializer (no base64 round trip).
 
     Returns:
         A bitcointx.core.psbt.PSBT object.
     Raises:
         ImportError if python-bitcointx is not installed.
+        ValueError if the file does not hold a PSBT.
     """
     PSBT = _imp_psbt()
-    with open(path, 'rt') as f:
-        s = f.read().strip()
-    if is_hex_str(s):
-        raw = binascii.unhexlify(s)
-        s = base64.b64encode(raw).decode()
-    return PSBT.from_base64(s)
+    return PSBT.deserialize(read_psbt_bytes(path))
+
+
+def _read_compact(buf: Any, off: int) -> Tuple[int, int]:
+    """Decode a CompactSize at ``off``; return (value, next offset)."""
+    if off >= len(buf):
+        raise ValueError('truncated PSBT')
+    n = buf[off]
+    if n < 0xFD:
+        return n, off + 1
+    end = off + 1 + (2 if n == 0xFD else 4 if n == 0xFE else 8)
+    if end > len(buf):
+        raise ValueError('truncated PSBT')
+    return int.from_bytes(buf[off + 1:end], 'little'), end
+
+
+def _walk_map(buf: Any, off: int) -> Tuple[Dict[int, Tuple[int, int]], int]:
+    """Walk one BIP-174 map starting at ``off``.
+
+    Returns ({key_type: (value_start, value_end)} for keys without key data,
+    offset just past the map separator). Values are skipped, not copied.
+    """
+    fields: Dict[int, Tuple[int, int]] = {}
+    size = len(buf)
+    while True:
+        klen, off = _read_compact(buf, off)
+        if klen == 0:
+            return fields, off
+        kend = off + klen
+        ktype, kdata = _read_compact(buf, off)
+        vlen, voff = _read_compact(buf, kend)
+        vend = voff + vlen
+        if kend > size or vend > size:
+            raise ValueError('truncated PSBT')
+        if kdata == kend:
+            fields[ktype] = (voff, vend)
+        off = vend
+
+
+class TxOutView:
+    """One transaction output (``scriptPubKey`` as bytes, ``nValue`` in sats)."""
+
+    __slots__ = ('nValue', 'scriptPubKey')
+
+    def __init__(self, value: int, script_pubkey: bytes) -> None:
+        self.nValue = value
+        self.scriptPubKey = script_pubkey
+
+    @classmethod
+    def parse(cls, buf: Any, off: int) -> 'TxOutView':
+        value = int.from_bytes(buf[off:off + 8], 'little')
+        slen, soff = _read_compact(buf, off + 8)
+        if soff + slen > len(buf):
+            raise ValueError('truncated PSBT')
+        return cls(value, bytes(buf[soff:soff + slen]))
+
+
+class TxInView:
+    """One unsigned-tx input (outpoint and nSequence)."""
+
+    __slots__ = ('prevout_hash', 'prevout_n', 'nSequence')
+
+    def __init__(self, prevout_hash: bytes, prevout_n: int, n_sequence: int) -> None:
+        self.prevout_hash = prevout_hash
+        self.prevout_n = prevout_n
+        self.nSequence = n_sequence
+
+
+class _LazyRecords(Sequence):
+    """Sequence decoding record ``i`` from ``buf`` at a stored offset on access."""
+
+    __slots__ = ('_buf', '_offsets', '_parse')
+
+    def __init__(self, buf: Any, offsets: 'array[int]', parse: Any) -> None:
+        self._buf = buf
+        self._offsets = offsets
+        self._parse = parse
+
+    def __len__(self) -> int:
+        return len(self._offsets)
+
+    def __getitem__(self, i: Any) -> Any:
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        return self._parse(self._buf, self._offsets[i])
+
+
+def _parse_txin(buf: Any, off: int) -> TxInView:
+    slen, soff = _read_compact(buf, off + 36)
+    seq_off = soff + slen
+    return TxInView(bytes(buf[off:off + 32]), int.from_bytes(buf[off + 32:off + 36], 'little'),
+                    int.from_bytes(buf[seq_off:seq_off + 4], 'little'))
+
+
+class TxView:
+    """Unsigned transaction of a PSBT; inputs/outputs decoded on access."""
+
+    __slots__ = ('nVersion', 'nLockTime', 'vin', 'vout')
+
+    def __init__(self, buf: Any, start: int, end: int) -> None:
+        self.nVersion = int.from_bytes(buf[start:start + 4], 'little')
+        off = start + 4
+        n_in, off = _read_compact(buf, off)
+        vin_offsets = array('Q')
+        for _ in range(n_in):
+            vin_offsets.append(off)
+            slen, off = _read_compact(buf, off + 36)
+            off += slen + 4
+        n_out, off = _read_compact(buf, off)
+        vout_offsets = array('Q')
+        for _ in range(n_out):
+            vout_offsets.append(off)
+            slen, off = _read_compact(buf, off + 8)
+            off += slen
+        if off + 4 != end:
+            raise ValueError('malformed unsigned transaction in PSBT')
+        self.nLockTime = int.from_bytes(buf[off:end], 'little')
+        self.vin = _LazyRecords(buf, vin_offsets, _parse_txin)
+        self.vout = _LazyRecords(buf, vout_offsets, TxOutView.parse)
+
+
+class InputView:
+    """Per-input PSBT map; only fields read by callers are decoded."""
+
+    __slots__ = ('_buf', '_fields')
+
+    def __init__(self, buf: Any, fields: Dict[int, Tuple[int, int]]) -> None:
+        self._buf = buf
+        self._fields = fields
+
+    @property
+    def witness_utxo(self) -> Optional[TxOutView]:
+        loc = self._fields.get(0x01)
+        return None if loc is None else TxOutView.parse(self._buf, loc[0])
+
+
+class PSBTView:
+    """Read-only lazy view over a serialized (binary) PSBT.
+
+    Only the global map is walked up front; input maps are located the first
+    time :attr:`inputs` is used. ``buf`` may be bytes or an mmap (pass it as
+    ``mm`` too and the view closes it).
+    """
+
+    __slots__ = ('_buf', '_mm', '_maps_start', '_inputs', 'tx')
+
+    def __init__(self, buf: Any, *, mm: Any = None) -> None:
+        if bytes(buf[:5]) != PSBT_MAGIC:
+            raise ValueError('not a binary PSBT (missing psbt magic)')
+        self._buf = buf
+        self._mm = mm
+        fields, self._maps_start = _walk_map(buf, 5)
+        if 0xFB in fields:
+            voff, vend = fields[0xFB]
+            if int.from_bytes(buf[voff:vend], 'little') != 0:
+                raise ValueError('only PSBT version 0 is supported')
+        if 0x00 not in fields:
+            raise ValueError('PSBT is missing the global unsigned transaction')
+        self.tx = TxView(buf, *fields[0x00])
+        self._inputs: Optional[List[InputView]] = None
+
+    @property
+    def unsigned_tx(self) -> TxView:
+        return self.tx
+
+    @property
+    def inputs(self) -> List[InputView]:
+        if self._inputs is None:
+            off = self._maps_start
+            inputs: List[InputView] = []
+            for _ in range(len(self.tx.vin)):
+                fields, off = _walk_map(self._buf, off)
+                inputs.append(InputView(self._buf, fields))
+            self._inputs = inputs
+        return self._inputs
+
+    def close(self) -> None:
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+
+    def __enter__(self) -> 'PSBTView':
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+
+def load_psbt_view(path: str) -> PSBTView:
+    """Open ``path`` as a :class:`PSBTView` (no python-bitcointx needed).
+
+    Binary files are read in place through mmap; hex/base64 files (and
+    stdin, for ``-``) are decoded once into memory.
+    """
+    import mmap
+    if path == STDIO:
+        return PSBTView(read_psbt_bytes(path))
+    with open(path, 'rb') as f:
+        try:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (ValueError, OSError):  # empty file, pipe or other unmappable input
+            return PSBTView(decode_psbt_bytes(f.read()))
+    try:
+        if sniff_psbt_format(mm[:64]) == 'binary':
+            return PSBTView(mm, mm=mm)
+        data = decode_psbt_bytes(mm)
+    except Exception:
+        mm.close()
+        raise
+    mm.close()
+    return PSBTView(data)
 
 
-def write_psbt(psbt: Any, path: str) -> None:
-    """Write PSBT to file as base64."""
-    with open(path, 'wt') as f:
-        f.write(psbt.to_base64())
+def encode_psbt(raw: bytes, fmt: str = 'base64') -> bytes:
+    """Encode a serialized PSBT as base64, hex or binary (one of PSBT_FORMATS)."""
+    if fmt == 'base64':
+        return binascii.b2a_base64(raw, newline=False)
+    if fmt == 'hex':
+        return binascii.hexlify(raw)
+    if fmt == 'binary':
+        return raw
+    raise ValueError(f'unknown PSBT format {fmt!r} (expected one of: {", ".join(PSBT_FORMATS)})')
+
+
+def write_psbt(psbt: Any, path: str, fmt: str = 'base64') -> None:
+    """Write PSBT to ``path`` (``-`` for stdout) as base64, hex or binary."""
+    write_output_bytes(path, encode_psbt(psbt.serialize(), fmt))
+
+
+class ExtractedTx(NamedTuple):
+    raw: bytes
+    txid: str
+    wtxid: str
+
+    @property
+    def hex(self) -> str:
+        return self.raw.hex()
+
+
+def _sha256d_id(data: Any) -> str:
+    import hashlib
+    return hashlib.sha256(hashlib.sha256(data).digest()).digest()[::-1].hex()
+
+
+def _tx_body_end(tx: bytes) -> Tuple[int, int]:
+    """Return (input count, offset of nLockTime) for a non-witness serialized tx."""
+    n_in, off = _read_compact(tx, 4)
+    if n_in == 0:
+        raise ValueError('transaction has no inputs')
+    for _ in range(n_in):
+        slen, off = _read_compact(tx, off + 36)
+        off += slen + 4
+    n_out, off = _read_compact(tx, off)
+    for _ in range(n_out):
+        slen, off = _read_compact(tx, off + 8)
+        off += slen
+    if off + 4 != len(tx):
+        raise ValueError('malformed unsigned transaction')
+    return n_in, off
+
+
+def _with_script_sigs(tx: bytes, script_sigs: SequenceT[Optional[bytes]]) -> bytes:
+    """Rewrite the scriptSig of every input whose ``script_sigs`` entry is not None."""
+    from .tapscript import compactsize
+    n_in, off = _read_compact(tx, 4)
+    parts = [tx[:off]]
+    for i in range(n_in):
+        slen, soff = _read_compact(tx, off + 36)
+        end = soff + slen + 4
+        sig = script_sigs[i]
+        if sig is None:
+            parts.append(tx[off:end])
+        else:
+            parts += [tx[off:off + 36], compactsize(len(sig)), bytes(sig), tx[end - 4:end]]
+        off = end
+    parts.append(tx[off:])
+    return b''.join(parts)
+
+
+def extract_tx(
+    unsigned_tx: bytes,
+    witnesses: SequenceT[Optional[SequenceT[bytes]]],
+    script_sigs: Optional[SequenceT[Optional[bytes]]] = None,
+) -> ExtractedTx:
+    """Splice per-input scriptSigs and witness stacks into a non-witness serialized tx.
+
+    ``witnesses[i]`` is the final stack of input ``i`` (e.g. from
+    ``ssv.witness.build_witness``); None or [] means an empty witness.
+    ``script_sigs[i]``, when not None, replaces input ``i``'s scriptSig. The
+    BIP-144 serialization is written into one preallocated buffer; the txid
+    is hashed from the rewritten non-witness serialization.
+    """
+    from .tapscript import compactsize
+    n_in, _ = _tx_body_end(unsigned_tx)
+    if len(witnesses) != n_in:
+        raise ValueError(f'expected {n_in} witness stacks (got {len(witnesses)})')
+    if script_sigs is not None:
+        if len(script_sigs) != n_in:
+            raise ValueError(f'expected {n_in} scriptSigs (got {len(script_sigs)})')
+        if any(sig is not None for sig in script_sigs):
+            unsigned_tx = _with_script_sigs(unsigned_tx, script_sigs)
+    _, body_end = _tx_body_end(unsigned_tx)
+    txid = _sha256d_id(unsigned_tx)
+    if not any(witnesses):
+        return ExtractedTx(bytes(unsigned_tx), txid, txid)
+
+    encoded: List[bytes] = []
+    for stack in witnesses:
+        items = stack or ()
+        parts = [compactsize(len(items))]
+        for item in items:
+            parts.append(compactsize(len(item)))
+            parts.append(bytes(item))
+        encoded.append(b''.join(parts))
+    size = len(unsigned_tx) + 2 + sum(len(e) for e in encoded)
+    out = bytearray(size)
+    out[0:4] = unsigned_tx[0:4]
+    out[4:6] = b'\x00\x01'                      # segwit marker + flag
+    pos = 6 + body_end - 4
+    out[6:pos] = unsigned_tx[4:body_end]         # inputs and outputs as-is
+    for e in encoded:
+        out[pos:pos + len(e)] = e
+        pos += len(e)
+    out[pos:pos + 4] = unsigned_tx[body_end:body_end + 4]
+    raw = bytes(out)
+    return ExtractedTx(raw, txid, _sha256d_id(raw))
+
+
+def _final_witness_stack(pi: Any) -> Optional[List[bytes]]:
+    w = getattr(pi, 'final_script_witness', None)
+    if w is None:
+        w = getattr(pi, 'final_scriptwitness', None)
+    if w is None:
+        return None
+    return [bytes(item) for item in w.stack]
+
+
+def _final_script_sig(pi: Any) -> Optional[bytes]:
+    sig = getattr(pi, 'final_script_sig', None)
+    return bytes(sig) if sig else None
+
+
+def extract_psbt_tx(psbt: Any, stacks: Optional[Dict[int, List[bytes]]] = None) -> ExtractedTx:
+    """Extract the signed tx of a finalized PSBT.
+
+    ``stacks`` supplies witnesses by input index (e.g. those just built by
+    finalize); other inputs use their PSBT final_script_witness. Every input's
+    final_script_sig replaces its scriptSig, and an input finalized by
+    scriptSig alone gets an empty witness. Every input must end up with a
+    final scriptSig or a non-empty witness.
+    """
+    stacks = stacks or {}
+    witnesses: List[Optional[List[bytes]]] = []
+    script_sigs: List[Optional[bytes]] = []
+    for i, pi in enumerate(psbt.inputs):
+        stack = stacks.get(i)
+        if stack is None:
+            stack = _final_witness_stack(pi)
+        script_sig = _final_script_sig(pi)
+        if not stack and script_sig is None:
+            raise ValueError(f'input {i} is not finalized (no final scriptSig or script witness)')
+        witnesses.append(stack or None)
+        script_sigs.append(script_sig)
+    return extract_tx(psbt.unsigned_tx.serialize(), witnesses, script_sigs)
 
 
 def to_raw_tx_hex(psbt: Any) -> str:
-    """Convert PSBT to raw transaction hex (or raise on failure)."""
-    b2x = _imp_b2x()
-    tx = psbt.to_tx()
-    return b2x(tx.serialize())
+    """Convert a finalized PSBT to raw transaction hex (or raise on failure)."""
+    return extract_psbt_tx(psbt).hex
 
 
-def get_input_witness_spk_hex(psbt: Any, index: int = 0) -> str:
-    """Return the witness_utxo scriptPubKey hex for the given input index."""
+Map = Dict[bytes, bytes]
+
+
+class PSBTMaps(NamedTuple):
+    """All BIP-174 key-value maps of a PSBT (keys include their type byte)."""
+    globals: Map
+    inputs: List[Map]
+    outputs: List[Map]
+
+
+def _read_map(buf: Any, off: int, where: str) -> Tuple[Map, int]:
+    entries: Map = {}
+    while True:
+        klen, off = _read_compact(buf, off)
+        if klen == 0:
+            return entries, off
+        key = bytes(buf[off:off + klen])
+        vlen, voff = _read_compact(buf, off + klen)
+        if len(key) != klen or voff + vlen > len(buf):
+            raise ValueError('truncated PSBT')
+        if key in entries:
+            raise ValueError(f'duplicate key {key.hex()} in {where} map')
+        entries[key] = bytes(buf[voff:voff + vlen])
+        off = voff + vlen
+
+
+def parse_maps(buf: Any) -> PSBTMaps:
+    """Split a binary PSBT into its global, per-input and per-output maps."""
+    if bytes(buf[:5]) != PSBT_MAGIC:
+        raise ValueError('not a binary PSBT (missing psbt magic)')
+    globals_, off = _read_map(buf, 5, 'global')
+    unsigned = globals_.get(b'\x00')
+    if unsigned is None:
+        raise ValueError('PSBT is missing the global unsigned transaction')
+    tx = TxView(unsigned, 0, len(unsigned))
+    inputs: List[Map] = []
+    for i in range(len(tx.vin)):
+        m, off = _read_map(buf, off, f'input {i}')
+        inputs.append(m)
+    outputs: List[Map] = []
+    for i in range(len(tx.vout)):
+        m, off = _read_map(buf, off, f'output {i}')
+        outputs.append(m)
+    return PSBTMaps(globals_, inputs, outputs)
+
+
+def _write_map(parts: List[bytes], m: Map) -> None:
+    from .tapscript import compactsize
+    for key, value in m.items():
+        parts.append(compactsize(len(key)) + key + compactsize(len(value)) + value)
+    parts.append(b'\x00')
+
+
+def serialize_maps(maps: PSBTMaps) -> bytes:
+    parts = [PSBT_MAGIC]
+    _write_map(parts, maps.globals)
+    for m in maps.inputs:
+        _write_map(parts, m)
+    for m in maps.outputs:
+        _write_map(parts, m)
+    return b''.join(parts)
+
+
+def unsigned_txid(buf: Any) -> str:
+    """txid of the unsigned transaction inside a binary PSBT."""
+    fields, _off = _walk_map(buf, 5) if bytes(buf[:5]) == PSBT_MAGIC else ({}, 0)
+    if 0x00 not in fields:
+        raise ValueError('not a binary PSBT with a global unsigned transaction')
+    start, end = fields[0x00]
+    return _sha256d_id(bytes(buf[start:end]))
+
+
+def _merge_map(into: Map, other: Map, where: str) -> None:
+    for key, value in other.items():
+        have = into.get(key)
+        if have is None:
+            into[key] = value
+        elif have != value:
+            raise ValueError(f'conflicting values for {where} key {key.hex()}')
+
+
+def merge_maps(into: PSBTMaps, other: PSBTMaps) -> None:
+    """Merge ``other`` into ``into`` in place (BIP-174 combiner)."""
+    if into.globals[b'\x00'] != other.globals[b'\x00']:
+        raise ValueError('cannot combine PSBTs for different unsigned transactions')
+    _merge_map(into.globals, other.globals, 'global')
+    for i, (a, b) in enumerate(zip(into.inputs, other.inputs)):
+        _merge_map(a, b, f'input {i}')
+    for i, (a, b) in enumerate(zip(into.outputs, other.outputs)):
+        _merge_map(a, b, f'output {i}')
+
+
+def _binary(data: Any) -> Any:
+    return data if bytes(data[:5]) == PSBT_MAGIC else decode_psbt_bytes(data)
+
+
+def combine(psbts: Iterable[Any]) -> bytes:
+    """Combine PSBTs for the same unsigned tx into one (binary) PSBT.
+
+    ``psbts`` yields serialized PSBTs (binary, hex or base64) and is consumed
+    one item at a time, so only the merged result is held in memory. Keys
+    present in several copies must carry identical values; any conflict
+    raises ValueError naming the map and key.
+    """
+    merged: Optional[PSBTMaps] = None
+    for n, data in enumerate(psbts):
+        try:
+            maps = parse_maps(_binary(data))
+            if merged is None:
+                merged = maps
+            else:
+                merge_maps(merged, maps)
+        except ValueError as e:
+            raise ValueError(f'PSBT {n}: {e}') from e
+    if merged is None:
+        raise ValueError('nothing to combine')
+    return serialize_maps(merged)
+
+
+def combine_files(paths: Iterable[str]) -> bytes:
+    """:func:`combine` over PSBT files (read one at a time; ``-`` is stdin)."""
+    return combine(read_psbt_bytes(p) for p in paths)
+
+
+class CombinedGroup(NamedTuple):
+    """One batch-combine result: all PSBTs sharing an unsigned txid."""
+    txid: Optional[str]
+    count: int
+    psbt: Optional[bytes]
+    error: Optional[str]
+
+
+def combine_by_txid(psbts: Iterable[Any]) -> List[CombinedGroup]:
+    """Group PSBTs by unsigned txid and combine each group.
+
+    Items are consumed one at a time; only one merged PSBT per txid is kept.
+    A conflict fails just its own group, and an unparseable item yields a
+    group with ``txid`` None. Groups are returned in first-seen order.
+    """
+    merged: Dict[str, PSBTMaps] = {}
+    counts: Dict[str, int] = {}
+    errors: Dict[str, str] = {}
+    bad: List[CombinedGroup] = []
+    for n, data in enumerate(psbts):
+        try:
+            buf = _binary(data)
+            txid = unsigned_txid(buf)
+            maps = parse_maps(buf)
+        except ValueError as e:
+            bad.append(CombinedGroup(None, 1, None, f'PSBT {n}: {e}'))
+            continue
+        counts[txid] = counts.get(txid, 0) + 1
+        if txid in errors:
+            continue
+        if txid not in merged:
+            merged[txid] = maps
+            continue
+        try:
+            merge_maps(merged[txid], maps)
+        except ValueError as e:
+            errors[txid] = f'PSBT {n}: {e}'
+            del merged[txid]
+    out = [
+        CombinedGroup(txid, counts[txid], None if txid in errors else serialize_maps(merged[txid]), errors.get(txid))
+        for txid in counts
+    ]
+    return out + bad
+
+
+def get_input_witness_spk(psbt: Any, index: int = 0) -> bytes:
+    """Return the witness_utxo scriptPubKey for the given input index."""
     iu = psbt.inputs[index].witness_utxo
     if not iu:
         raise ValueError(f'PSBT input {index} missing witness_utxo')
-    return iu.scriptPubKey.hex()
+    return bytes(iu.scriptPubKey)
+
+
+def get_input_witness_spk_hex(psbt: Any, index: int = 0) -> str:
+    """Return the witness_utxo scriptPubKey hex for the given input index."""
+    return get_input_witness_spk(psbt, index).hex()
+
+
+def set_final_witness(psbt: Any, index: int, stack_items: List[bytes]) -> None:
+    """Set an input's final script witness and drop now-redundant signing data."""
+    CScriptWitness = _imp_core_script_witness()
+    pi = psbt.inputs[index]
+    witness = CScriptWitness([bytes(item) for item in stack_items])
+    if hasattr(pi, 'final_script_witness'):
+        pi.final_script_witness = witness
+    else:  # older python-bitcointx attribute name
+        pi.final_scriptwitness = witness
+    pi.partial_sigs = {}
+    if hasattr(pi, 'taproot_leaf_script'):
+        pi.taproot_leaf_script = []
+    if hasattr(pi, 'taproot_bip32_derivations'):
+        pi.taproot_bip32_derivations = {}
+    if hasattr(pi, 'taproot_internal_key'):
+        pi.taproot_internal_key = None
 
 
 def cscript_witness():
@@ -0,0 +1,268 @@
+"""
+Persistent vault registry (SQLite, stdlib only).
+
+Remembers every vault by its P2TR scriptPubKey, so ``verify-path`` and
+``finalize`` can resolve the tapscript and control block from a PSBT input's
+``witness_utxo`` alone. Optional outpoints (``TXID:VOUT``) map funded UTXOs
+to their vault.
+
+Schema (both tables are clustered B-trees, lookups are O(log n)):
+  vaults(spk PRIMARY KEY, hash_h, borrower_pk, provider_pk, csv_blocks,
+         internal_key, tapscript, leaf_hash, control, ref)
+  outpoints(txid, vout, spk)  PRIMARY KEY (txid, vout)
+
+Keys and scripts are stored as BLOBs; txids in internal byte order.
+Commands take the database path from ``--registry`` or ``SSV_REGISTRY``.
+Import records use the ``ssv build-vaults`` fields (h, pk_b, pk_p,
+csv_blocks, internal_key, id) plus an optional ``outpoint``.
+"""
+from __future__ import annotations
+
+import atexit
+import json
+import os
+import sqlite3
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from .policy import PolicyParams
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS vaults (
+    spk BLOB PRIMARY KEY,
+    hash_h BLOB NOT NULL,
+    borrower_pk BLOB NOT NULL,
+    provider_pk BLOB NOT NULL,
+    csv_blocks INTEGER NOT NULL,
+    internal_key BLOB NOT NULL,
+    tapscript BLOB NOT NULL,
+    leaf_hash BLOB NOT NULL,
+    control BLOB NOT NULL,
+    ref TEXT
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS outpoints (
+    txid BLOB NOT NULL,
+    vout INTEGER NOT NULL,
+    spk BLOB NOT NULL,
+    PRIMARY KEY (txid, vout)
+) WITHOUT ROWID;
+'''
+_VAULT_COLUMNS = 'spk, hash_h, borrower_pk, provider_pk, csv_blocks, internal_key, tapscript, leaf_hash, control, ref'
+_INSERT_VAULT = f'INSERT OR REPLACE INTO vaults ({_VAULT_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)'
+_INSERT_OUTPOINT = 'INSERT OR REPLACE INTO outpoints (txid, vout, spk) VALUES (?, ?, ?)'
+DEFAULT_BATCH = 10_000
+
+
+class VaultRecord(NamedTuple):
+    spk: bytes
+    params: PolicyParams
+    internal_key: bytes
+    tapscript: bytes
+    leaf_hash: bytes
+    control: bytes
+    ref: Optional[str] = None
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            'spk': self.spk.hex(),
+            'hash_h': self.params.hash_h,
+            'borrower_pk': self.params.borrower_xonly,
+            'provider_pk': self.params.provider_xonly,
+            'csv_blocks': self.params.csv_blocks,
+            'internal_key': self.internal_key.hex(),
+            'tapscript': self.tapscript.hex(),
+            'leaf_hash': self.leaf_hash.hex(),
+            'control': self.control.hex(),
+            'id': self.ref,
+        }
+
+
+def derive_vault(params: PolicyParams, internal_key: bytes, ref: Optional[str] = None) -> VaultRecord:
+    """Derive tapscript, leaf hash, control block and P2TR spk (single-leaf tree)."""
+    from .memo import default_cache
+    from .taproot import scriptpubkey_from_xonly
+    from .tapscript import LEAF_VERSION
+    params.validate()
+    if len(internal_key) != 32:
+        raise ValueError(f'internal_key must be 32 bytes (got {len(internal_key)})')
+    cache = default_cache()
+    script, leaf = cache.tapscript(bytes.fromhex(params.hash_h), bytes.fromhex(params.borrower_xonly),
+                                   params.csv_blocks, bytes.fromhex(params.provider_xonly))
+    qx, parity = cache.output_key(internal_key, leaf, verified=True)  # single leaf: merkle root == leaf hash
+    control = bytes([LEAF_VERSION | parity]) + internal_key
+    return VaultRecord(scriptpubkey_from_xonly(qx), params, internal_key, script, leaf, control, ref)
+
+
+def _row_to_record(row: Tuple[Any, ...]) -> VaultRecord:
+    spk, h, pb, pp, csv, internal, script, leaf, control, ref = row
+    return VaultRecord(spk, PolicyParams(h.hex(), pb.hex(), pp.hex(), csv), internal, script, leaf, control, ref)
+
+
+def _vault_row(rec: VaultRecord) -> Tuple[Any, ...]:
+    p = rec.params
+    return (rec.spk, bytes.fromhex(p.hash_h), bytes.fromhex(p.borrower_xonly), bytes.fromhex(p.provider_xonly),
+            p.csv_blocks, rec.internal_key, rec.tapscript, rec.leaf_hash, rec.control, rec.ref)
+
+
+class Registry:
+    """A vault registry database; use :func:`open_registry`."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def __enter__(self) -> 'Registry':
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def add(self, rec: VaultRecord, outpoints: Iterable[str] = ()) -> None:
+        self.add_many([(rec, list(outpoints))])
+
+    def add_many(self, items: Iterable[Tuple[VaultRecord, List[str]]]) -> int:
+        """Insert vaults (and their outpoints) in one transaction; returns the vault count."""
+        from .psbtcreate import parse_outpoint
+        vaults: List[Tuple[Any, ...]] = []
+        outs: List[Tuple[bytes, int, bytes]] = []
+        for rec, outpoints in items:
+            vaults.append(_vault_row(rec))
+            for op in outpoints:
+                txid, vout = parse_outpoint(op)
+                outs.append((txid, vout, rec.spk))
+        with self.conn:
+            self.conn.executemany(_INSERT_VAULT, vaults)
+            if outs:
+                self.conn.executemany(_INSERT_OUTPOINT, outs)
+        return len(vaults)
+
+    def lookup_spk(self, spk: bytes) -> Optional[VaultRecord]:
+        row = self.conn.execute(f'SELECT {_VAULT_COLUMNS} FROM vaults WHERE spk = ?', (bytes(spk),)).fetchone()
+        return None if row is None else _row_to_record(row)
+
+    def lookup_outpoint(self, outpoint: str) -> Optional[VaultRecord]:
+        from .psbtcreate import parse_outpoint
+        txid, vout = parse_outpoint(outpoint)
+        row = self.conn.execute(
+            f'SELECT {_VAULT_COLUMNS} FROM vaults WHERE spk = (SELECT spk FROM outpoints WHERE txid = ? AND vout = ?)',
+            (txid, vout),
+        ).fetchone()
+        return None if row is None else _row_to_record(row)
+
+    def count(self) -> int:
+        return self.conn.execute('SELECT COUNT(*) FROM vaults').fetchone()[0]
+
+
+_OPEN: Dict[str, Registry] = {}
+
+
+def registry_path_from_env() -> Optional[str]:
+    return os.environ.get('SSV_REGISTRY') or None
+
+
+def open_registry(path: str, *, create: bool = False, cached: bool = True) -> Registry:
+    """Open the registry at ``path``.
+
+    Lookups never create a database: a missing file is an error unless
+    ``create`` is set. By default the connection is cached per process and
+    closed by :func:`close_registries` (run at exit); with ``cached=False``
+    the caller owns a fresh connection (``with open_registry(...) as reg``).
+    """
+    reg = _OPEN.get(path) if cached else None
+    if reg is None:
+        if not create and not os.path.exists(path):
+            raise ValueError(f'vault registry {path} does not exist')
+        reg = Registry(path)
+        if cached:
+            _OPEN[path] = reg
+    return reg
+
+
+def close_registries() -> None:
+    """Close and forget the registries cached by :func:`open_registry`."""
+    while _OPEN:
+        _, reg = _OPEN.popitem()
+        try:
+            reg.close()
+        except sqlite3.ProgrammingError:
+            pass  # opened by another thread; released with the process
+
+
+atexit.register(close_registries)
+
+
+def resolve_spk(path: str, spk: bytes) -> VaultRecord:
+    """Look up a vault by spk, failing with a clear error when it is unknown."""
+    rec = open_registry(path).lookup_spk(spk)
+    if rec is None:
+        raise ValueError(f'no vault registered for spk {bytes(spk).hex()} in {path}')
+    return rec
+
+
+def _import_record(record: Dict[str, Any]) -> Tuple[VaultRecord, List[str]]:
+    from .hexutil import parse_hex
+    params = PolicyParams(record.get('h'), record.get('pk_b'), record.get('pk_p'), record.get('csv_blocks'))
+    internal = parse_hex('internal_key', record.get('internal_key'), length=32)
+    ref = record.get('id')
+    rec = derive_vault(params, internal, None if ref is None else str(ref))
+    outpoint = record.get('outpoint')
+    if not outpoint:
+        return rec, []
+    from .psbtcreate import parse_outpoint
+    parse_outpoint(outpoint)  # reject bad outpoints here, not mid-transaction
+    return rec, [outpoint]
+
+
+def _import_chunk(chunk: List[Tuple[int, str]]) -> List[Dict[str, Any]]:
+    out: List[Dict[str, Any]] = []
+    for n, line in chunk:
+        try:
+            record = json.loads(line)
+            if not isinstance(record, dict):
+                raise ValueError('record must be a JSON object')
+            rec, outpoints = _import_record(record)
+            out.append({'line': n, 'ok': True, 'vault': rec, 'outpoints': outpoints})
+        except Exception as e:
+            out.append({'line': n, 'ok': False, 'error': str(e)})
+    return out
+
+
+def import_vaults(
+    reg: Registry,
+    lines: Iterable[str],
+    *,
+    workers: int = 1,
+    chunk_size: int = 1024,
+    batch: int = DEFAULT_BATCH,
+) -> Iterator[Dict[str, Any]]:
+    """Bulk-load vault records (JSONL lines), yielding ``{line, ok[, error]}`` per line.
+
+    Derivation (tapscript, TapTweak) runs over the batch process pool; the
+    parent writes ``batch`` vaults per transaction with journaling relaxed
+    for the duration of the import. Rows are held back until the
+    transaction holding their vaults commits, so an ``ok`` row is only
+    reported for a stored vault.
+    """
+    from .batch import ordered_chunk_map
+    reg.conn.execute('PRAGMA journal_mode=WAL')
+    reg.conn.execute('PRAGMA synchronous=OFF')
+    pending: List[Tuple[VaultRecord, List[str]]] = []
+    held: List[Dict[str, Any]] = []
+    try:
+        for row in ordered_chunk_map(_import_chunk, lines, workers=workers, chunk_size=chunk_size):
+            if row['ok']:
+                pending.append((row.pop('vault'), row.pop('outpoints')))
+            held.append(row)
+            if len(pending) >= batch:
+                reg.add_many(pending)
+                pending = []
+                yield from held
+                held = []
+        if pending:
+            reg.add_many(pending)
+        yield from held
+    finally:
+        reg.conn.execute('PRAGMA synchronous=FULL')
@@ -0,0 +1,169 @@
+"""
+Minimal pure-Python secp256k1 (fallback EC backend for Taproot tweaks).
+
+Only what BIP-341 output-key derivation needs: x-only lift, tweak·G and point
+addition. Points are kept in Jacobian coordinates internally; tweak·G uses a
+precomputed fixed-base table (one row of affine multiples per 8-bit window of
+the scalar), so a multiplication costs at most 32 mixed additions and no
+doublings. The table is built lazily on first use.
+
+Not constant time: use only with public data (keys, tweaks), never secrets.
+"""
+from __future__ import annotations
+
+from typing import List, Optional, Tuple
+
+P = 0xFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFEFFFFFC2F
+N = 0xFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFEBAAEDCE6AF48A03BBFD25E8CD0364141
+GX = 0x79BE667EF9DCBBAC55A06295CE870B07029BFCDB2DCE28D959F2815B16F81798
+GY = 0x483ADA7726A3C4655DA4FBFC0E1108A8FD17B448A68554199C47D08FFB10D4B8
+
+WINDOW_BITS = 8
+_WINDOWS = 256 // WINDOW_BITS
+_WINDOW_MASK = (1 << WINDOW_BITS) - 1
+
+Affine = Tuple[int, int]
+Jacobian = Tuple[int, int, int]  # (X, Y, Z); Z == 0 is the point at infinity
+
+INFINITY: Jacobian = (1, 1, 0)
+
+
+def _jac_double(p: Jacobian) -> Jacobian:
+    x, y, z = p
+    if z == 0 or y == 0:
+        return INFINITY
+    ysq = y * y % P
+    s = 4 * x * ysq % P
+    m = 3 * x * x % P  # a == 0 on secp256k1
+    nx = (m * m - 2 * s) % P
+    ny = (m * (s - nx) - 8 * ysq * ysq) % P
+    nz = 2 * y * z % P
+    return (nx, ny, nz)
+
+
+def _jac_add_affine(p: Jacobian, q: Affine) -> Jacobian:
+    """Mixed addition: Jacobian ``p`` plus affine ``q`` (implicit Z=1)."""
+    x1, y1, z1 = p
+    if z1 == 0:
+        return (q[0], q[1], 1)
+    x2, y2 = q
+    z1z1 = z1 * z1 % P
+    u2 = x2 * z1z1 % P
+    s2 = y2 * z1 * z1z1 % P
+    h = (u2 - x1) % P
+    r = (s2 - y1) % P
+    if h == 0:
+        return _jac_double(p) if r == 0 else INFINITY
+    hh = h * h % P
+    hhh = h * hh % P
+    v = x1 * hh % P
+    nx = (r * r - hhh - 2 * v) % P
+    ny = (r * (v - nx) - y1 * hhh) % P
+    nz = z1 * h % P
+    return (nx, ny, nz)
+
+
+def to_affine(p: Jacobian) -> Optional[Affine]:
+    """Convert to affine coordinates; None for the point at infinity."""
+    x, y, z = p
+    if z == 0:
+        return None
+    zinv = pow(z, P - 2, P)
+    zinv2 = zinv * zinv % P
+    return (x * zinv2 % P, y * zinv2 * zinv % P)
+
+
+def _batch_to_affine(points: List[Jacobian]) -> List[Affine]:
+    """Montgomery batch inversion: one modular inverse for the whole list."""
+    acc = 1
+    prefix: List[int] = []
+    for _x, _y, z in points:
+        prefix.append(acc)
+        acc = acc * z % P
+    inv = pow(acc, P - 2, P)
+    out: List[Affine] = [(0, 0)] * len(points)
+    for i in range(len(points) - 1, -1, -1):
+        x, y, z = points[i]
+        zinv = inv * prefix[i] % P
+        inv = inv * z % P
+        zinv2 = zinv * zinv % P
+        out[i] = (x * zinv2 % P, y * zinv2 * zinv % P)
+    return out
+
+
+_G_TABLE: Optional[List[List[Affine]]] = None
+
+
+def _g_table() -> List[List[Affine]]:
+    """Rows ``w`` hold ``j * 2^(8w) * G`` for ``j`` in 1..255 (affine)."""
+    global _G_TABLE
+    if _G_TABLE is None:
+        rows: List[List[Affine]] = []
+        base: Affine = (GX, GY)
+        for _w in range(_WINDOWS):
+            row: List[Jacobian] = []
+            acc: Jacobian = (base[0], base[1], 1)
+            for _j in range(_WINDOW_MASK):
+                row.append(acc)
+                acc = _jac_add_affine(acc, base)
+            affine_row = _batch_to_affine(row)
+            rows.append(affine_row)
+            # next window base = 2^8 * base = 256 * base = (255 * base) + base
+            nxt = to_affine(_jac_add_affine(row[-1], base))
+            assert nxt is not None
+            base = nxt
+        _G_TABLE = rows
+    return _G_TABLE
+
+
+def point_mul_g(k: int) -> Jacobian:
+    """Return ``k * G`` using the fixed-base window table."""
+    k %= N
+    table = _g_table()
+    acc: Jacobian = INFINITY
+    w = 0
+    while k:
+        d = k & _WINDOW_MASK
+        if d:
+            acc = _jac_add_affine(acc, table[w][d - 1])
+        k >>= WINDOW_BITS
+        w += 1
+    return acc
+
+
+def lift_x(x: int) -> Affine:
+    """BIP-340 lift_x: the curve point with x-coordinate ``x`` and even y."""
+    if not 0 <= x < P:
+        raise ValueError('x-coordinate out of range')
+    ysq = (pow(x, 3, P) + 7) % P
+    y = pow(ysq, (P + 1) // 4, P)
+    if y * y % P != ysq:
+        raise ValueError('x-coordinate is not on the curve')
+    return (x, y if y & 1 == 0 else P - y)
+
+
+def point_add_tweak(point: Affine, tweak: int) -> Tuple[bytes, int]:
+    """Compute ``point + tweak·G`` for an affine (already lifted) point.
+
+    Returns:
+        (x_only, parity) of the resulting point.
+    Raises:
+        ValueError if the result is the point at infinity.
+    """
+    q = to_affine(_jac_add_affine(point_mul_g(tweak), point))
+    if q is None:
+        raise ValueError('tweaked key is the point at infinity')
+    return q[0].to_bytes(32, 'big'), q[1] & 1
+
+
+def xonly_tweak_add(xonly: bytes, tweak: int) -> Tuple[bytes, int]:
+    """Compute ``lift_x(xonly) + tweak·G``.
+
+    Returns:
+        (x_only, parity) of the resulting point.
+    Raises:
+        ValueError if the key is not on the curve or the result is infinity.
+    """
+    if len(xonly) != 32:
+        raise ValueError('x-only key must be 32 bytes')
+    return point_add_tweak(lift_x(int.from_bytes(xonly, 'big')), tweak)
@@ -0,0 +1,364 @@
+"""
+Long-lived local daemon (``ssv serve``) and its thin client.
+
+Protocol: newline-delimited JSON-RPC 2.0 over a Unix domain socket. Each
+request line gets exactly one response line; a connection may pipeline
+several requests. Clients are served concurrently by asyncio while the
+actual work runs in a pool of warm worker processes (modules imported and
+the EC backend resolved once per worker, not once per call).
+
+Methods
+- build_tapscript: {hash_h, borrower_pk, csv_blocks, provider_pk, disasm?}
+- verify_taproot_path: {tapscript_hex, control_block_hex, witness_spk_hex}
+- verify_anchor_output: {psbt_in, index?, spk, value}
+- verify_opret_output: {psbt_in, index?, data, value?}
+  (without ``index`` the result is the list of every matching output)
+- finalize_witness: same option names as ``ssv finalize`` (psbt_in, mode, ...)
+- cli: {argv, cwd?, stdin_b64?} runs any subcommand and returns
+  {stdout_b64, stderr, exit_code}; stdin and stdout travel base64-encoded
+  so ``-`` paths (text or binary) work through the daemon
+- ping / shutdown
+
+Relative paths are resolved against ``cwd`` when given (the thin client
+always sends its own working directory).
+"""
+from __future__ import annotations
+
+import json
+import os
+import socket
+import sys
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional
+
+if TYPE_CHECKING:
+    import asyncio
+    from concurrent.futures import Executor
+
+# asyncio and the process pool are imported lazily by Server so that the thin
+# client path (`ssv --connect ...`) stays close to bare interpreter startup.
+
+JSONRPC_PARSE_ERROR = -32700
+JSONRPC_INVALID_REQUEST = -32600
+JSONRPC_METHOD_NOT_FOUND = -32601
+JSONRPC_INVALID_PARAMS = -32602
+JSONRPC_SERVER_ERROR = -32000
+
+_PATH_PARAMS = ('psbt_in', 'psbt_out', 'tx_out', 'tapscript_file', 'control_file')
+
+
+class RemoteError(RuntimeError):
+    """Error response returned by the daemon."""
+
+    def __init__(self, code: int, message: str) -> None:
+        super().__init__(message)
+        self.code = code
+
+
+class _MissingParam(Exception):
+    """A required method parameter is absent (reported as invalid params)."""
+
+
+def _param(params: Dict[str, Any], name: str) -> Any:
+    try:
+        return params[name]
+    except KeyError:
+        raise _MissingParam(name) from None
+
+
+def _abspaths(params: Dict[str, Any], cwd: Optional[str]) -> Dict[str, Any]:
+    if not cwd:
+        return params
+    out = dict(params)
+    for key in _PATH_PARAMS:
+        val = out.get(key)
+        if isinstance(val, str) and val != '-' and not os.path.isabs(val):
+            out[key] = os.path.join(cwd, val)
+    return out
+
+
+def _m_build_tapscript(params: Dict[str, Any]) -> Any:
+    from .cli import build_tapscript_info
+    return build_tapscript_info(
+        *(_param(params, name) for name in ('hash_h', 'borrower_pk', 'csv_blocks', 'provider_pk')),
+        with_disasm=bool(params.get('disasm')),
+    )
+
+
+def _m_verify_taproot_path(params: Dict[str, Any]) -> Any:
+    from .verify import verify_taproot_path
+    return verify_taproot_path(*(_param(params, name) for name in ('tapscript_hex', 'control_block_hex', 'witness_spk_hex')))
+
+
+def _m_verify_anchor_output(params: Dict[str, Any]) -> Any:
+    from .cli import find_anchor_outputs, verify_anchor_output
+    from .psbtcache import load_readonly_psbt
+    psbt = load_readonly_psbt(_param(params, 'psbt_in'))
+    spk, value = _param(params, 'spk'), int(_param(params, 'value'))
+    if params.get('index') is None:
+        return [m._asdict() for m in find_anchor_outputs(psbt, spk, value)]
+    return verify_anchor_output(psbt, int(params['index']), spk, value)._asdict()
+
+
+def _m_verify_opret_output(params: Dict[str, Any]) -> Any:
+    from .cli import find_opret_outputs, verify_opret_output
+    from .psbtcache import load_readonly_psbt
+    psbt = load_readonly_psbt(_param(params, 'psbt_in'))
+    data = _param(params, 'data')
+    value = params.get('value')
+    value = None if value is None else int(value)
+    if params.get('index') is None:
+        return [m._asdict() for m in find_opret_outputs(psbt, data, value)]
+    return verify_opret_output(psbt, int(params['index']), data, value)._asdict()
+
+
+def _m_finalize_witness(params: Dict[str, Any]) -> Any:
+    from .cli import argv_from_params, build_parser
+    args = build_parser().parse_args(argv_from_params('finalize', params))
+    args.func(args)
+    return {'psbt_out': args.psbt_out, 'tx_out': args.tx_out}
+
+
+def _m_cli(params: Dict[str, Any]) -> Any:
+    import base64
+    import contextlib
+    import io
+    from .cli import main as cli_main
+    argv = params.get('argv')
+    if not isinstance(argv, list) or not all(isinstance(a, str) for a in argv):
+        raise TypeError('argv must be a list of strings')
+    if argv and (argv[0] in ('serve', '--connect') or argv[0].startswith('--connect=')):
+        raise ValueError(f'{argv[0]} cannot be run through the daemon')
+    cwd = params.get('cwd')
+    prev = os.getcwd()
+    prev_stdin = sys.stdin
+    # stdin belongs to the daemon, not the remote caller: serve what the client sent
+    stdin = io.TextIOWrapper(io.BytesIO(base64.b64decode(params.get('stdin_b64') or '')), encoding='utf-8')
+    raw_out = io.BytesIO()
+    out = io.TextIOWrapper(raw_out, encoding='utf-8', write_through=True)
+    err = io.StringIO()
+    code = 0
+    try:
+        if cwd:
+            os.chdir(cwd)
+        sys.stdin = stdin
+        with contextlib.redirect_stdout(out), contextlib.redirect_stderr(err):
+            try:
+                cli_main(argv)
+            except SystemExit as e:
+                code = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+                if isinstance(e.code, str):
+                    print(e.code, file=sys.stderr)
+            except Exception as e:
+                code = 1
+                print(f'{type(e).__name__}: {e}', file=sys.stderr)
+        out.flush()
+    finally:
+        sys.stdin = prev_stdin
+        os.chdir(prev)
+    stdout = base64.b64encode(raw_out.getvalue()).decode('ascii')
+    return {'stdout_b64': stdout, 'stderr': err.getvalue(), 'exit_code': code}
+
+
+METHODS: Dict[str, Callable[[Dict[str, Any]], Any]] = {
+    'build_tapscript': _m_build_tapscript,
+    'verify_taproot_path': _m_verify_taproot_path,
+    'verify_anchor_output': _m_verify_anchor_output,
+    'verify_opret_output': _m_verify_opret_output,
+    'finalize_witness': _m_finalize_witness,
+    'cli': _m_cli,
+}
+
+
+def dispatch(method: str, params: Dict[str, Any]) -> Any:
+    """Run one method in the current process (called inside pool workers)."""
+    if method != 'cli':
+        params = _abspaths(params, params.pop('cwd', None))
+    return METHODS[method](params)
+
+
+def _warm_worker() -> None:
+    # Pay imports and backend resolution once per worker process.
+    from . import cli, hexutil, policy, tapscript, verify, witness  # noqa: F401
+    from .taproot import get_ec_backend
+    try:
+        get_ec_backend()
+    except Exception:
+        pass
+    try:
+        from .psbtio import _imp_psbt, cscript_witness
+        _imp_psbt()
+        cscript_witness()
+        import bitcointx
+        # bitcointx keeps chain params per thread; a worker forked from a
+        # non-main thread (a Server embedded in another program) starts unset
+        bitcointx.select_chain_params(bitcointx.get_current_chain_params())
+    except Exception:
+        pass
+
+
+def _error(req_id: Any, code: int, message: str) -> Dict[str, Any]:
+    return {'jsonrpc': '2.0', 'id': req_id, 'error': {'code': code, 'message': message}}
+
+
+class Server:
+    """asyncio Unix-socket server dispatching requests to a worker pool."""
+
+    def __init__(self, socket_path: str, *, workers: int = 2, executor: Optional[Executor] = None) -> None:
+        from concurrent.futures import ProcessPoolExecutor
+        self.socket_path = socket_path
+        self.executor = executor or ProcessPoolExecutor(max_workers=max(1, workers), initializer=_warm_worker)
+        self._stopped: Optional[asyncio.Event] = None
+
+    async def _handle_line(self, line: bytes) -> Dict[str, Any]:
+        import asyncio
+        try:
+            req = json.loads(line)
+        except ValueError as e:
+            return _error(None, JSONRPC_PARSE_ERROR, f'parse error: {e}')
+        if not isinstance(req, dict) or not isinstance(req.get('method'), str):
+            return _error(None, JSONRPC_INVALID_REQUEST, 'invalid request')
+        req_id = req.get('id')
+        method = req['method']
+        params = req.get('params') or {}
+        if method == 'ping':
+            return {'jsonrpc': '2.0', 'id': req_id, 'result': 'pong'}
+        if method == 'shutdown':
+            assert self._stopped is not None
+            self._stopped.set()
+            return {'jsonrpc': '2.0', 'id': req_id, 'result': True}
+        if method not in METHODS:
+            return _error(req_id, JSONRPC_METHOD_NOT_FOUND, f'method not found: {method}')
+        if not isinstance(params, dict):
+            return _error(req_id, JSONRPC_INVALID_PARAMS, 'params must be an object')
+        loop = asyncio.get_running_loop()
+        try:
+            result = await loop.run_in_executor(self.executor, dispatch, method, params)
+        except _MissingParam as e:
+            return _error(req_id, JSONRPC_INVALID_PARAMS, f'missing param: {e.args[0]}')
+        except SystemExit:
+            return _error(req_id, JSONRPC_INVALID_PARAMS, 'invalid arguments')
+        except Exception as e:
+            return _error(req_id, JSONRPC_SERVER_ERROR, f'{type(e).__name__}: {e}')
+        return {'jsonrpc': '2.0', 'id': req_id, 'result': result}
+
+    async def _client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        import asyncio
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                resp = await self._handle_line(line)
+                writer.write(json.dumps(resp).encode() + b'\n')
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, ready: Optional[Callable[[], None]] = None) -> None:
+        import asyncio
+        import signal
+        self._stopped = asyncio.Event()
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        old_umask = os.umask(0o177)  # the socket is created 0600: no window where others can connect
+        try:
+            sock.bind(self.socket_path)
+        except BaseException:
+            sock.close()
+            raise
+        finally:
+            os.umask(old_umask)
+        server = await asyncio.start_unix_server(self._client, sock=sock, limit=64 * 1024 * 1024)
+        try:
+            asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, self._stopped.set)
+        except (NotImplementedError, RuntimeError, ValueError):
+            pass  # not the main thread (e.g. embedded in tests) or unsupported platform
+        try:
+            if ready is not None:
+                ready()
+            await self._stopped.wait()
+        finally:
+            server.close()
+            await server.wait_closed()
+            self.executor.shutdown(wait=True)
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+
+
+class Client:
+    """Blocking client; keeps one connection open for many calls."""
+
+    def __init__(self, socket_path: str, *, timeout: Optional[float] = None) -> None:
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._sock.settimeout(timeout)
+        self._sock.connect(socket_path)
+        self._file = self._sock.makefile('rb')
+        self._next_id = 0
+
+    def call(self, method: str, params: Optional[Dict[str, Any]] = None) -> Any:
+        self._next_id += 1
+        req = {'jsonrpc': '2.0', 'id': self._next_id, 'method': method, 'params': params or {}}
+        self._sock.sendall(json.dumps(req).encode() + b'\n')
+        line = self._file.readline()
+        if not line:
+            raise ConnectionError('daemon closed the connection')
+        resp = json.loads(line)
+        if 'error' in resp:
+            raise RemoteError(resp['error']['code'], resp['error']['message'])
+        return resp['result']
+
+    def close(self) -> None:
+        self._file.close()
+        self._sock.close()
+
+    def __enter__(self) -> 'Client':
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+
+def call(socket_path: str, method: str, params: Optional[Dict[str, Any]] = None, *, timeout: Optional[float] = None) -> Any:
+    """One-shot convenience wrapper around :class:`Client`."""
+    with Client(socket_path, timeout=timeout) as c:
+        return c.call(method, params)
+
+
+def run_remote(socket_path: str, argv: List[str]) -> int:
+    """Forward a CLI invocation to the daemon; echo its output; return exit code.
+
+    When ``-`` appears in ``argv`` and stdin is not a terminal, stdin is
+    read here and sent along for the remote command to consume.
+    """
+    import base64
+    params: Dict[str, Any] = {'argv': argv, 'cwd': os.getcwd()}
+    if '-' in argv and not sys.stdin.isatty():
+        stream = getattr(sys.stdin, 'buffer', None)
+        data = stream.read() if stream is not None else sys.stdin.read().encode()
+        params['stdin_b64'] = base64.b64encode(data).decode('ascii')
+    res = call(socket_path, 'cli', params)
+    out = base64.b64decode(res['stdout_b64'])
+    stream = getattr(sys.stdout, 'buffer', None)
+    if stream is not None:
+        sys.stdout.flush()
+        stream.write(out)
+        stream.flush()
+    else:
+        sys.stdout.write(out.decode('utf-8', 'replace'))
+    sys.stderr.write(res['stderr'])
+    return int(res['exit_code'])
+
+
+def serve_forever(socket_path: str, *, workers: int = 2) -> None:
+    import asyncio
+    server = Server(socket_path, workers=workers)
+    print(f'ssv serve: listening on {socket_path} ({workers} workers)', file=sys.stderr)
+    try:
+        asyncio.run(server.serve())
+    except KeyboardInterrupt:
+        pass
@@ -1,8 +1,7 @@
 from __future__ import annotations
 
-import binascii
-from dataclasses import dataclass
-from typing import Any, List, Tuple, Optional
+import os
+from typing import Any, Callable, Dict, Iterable, List, Sequence, Tuple, Optional
 
 from .tapscript import tagged_sha256
 
@@ -11,21 +10,111 @@ SECP256K1_ORDER = int(
 )
 
 
-@dataclass(frozen=True)
 class ControlBlock:
-    """Parsed Taproot control block details.
+    """Parsed Taproot control block: a zero-copy view over the original buffer.
 
     Attributes:
         leaf_version: Tapscript leaf version (low bit cleared).
         parity: Parity bit of the Taproot output key (0=even, 1=odd).
         internal_key: 32-byte x-only internal key.
         merkle_nodes: Tuple of 32-byte Merkle proof nodes (may be empty).
+        raw: the control block buffer itself (bytes or memoryview).
+
+    Fields are read from ``raw`` on access; ``merkle_root`` walks the proof
+    in place, so verification never materializes the node list.
+
+    The field constructor of the former frozen dataclass still works
+    (``ControlBlock(leaf_version, parity, internal_key, merkle_nodes)``, also
+    by keyword) and builds ``raw`` from the fields. ``ControlBlock`` is no
+    longer a dataclass: use :meth:`replace` and :meth:`as_dict` instead of
+    ``dataclasses.replace`` and ``dataclasses.asdict``.
     """
 
-    leaf_version: int
-    parity: int
-    internal_key: bytes
-    merkle_nodes: Tuple[bytes, ...]
+    __slots__ = ('raw',)
+
+    _FIELDS = ('leaf_version', 'parity', 'internal_key', 'merkle_nodes')
+
+    def __init__(self, *args: Any, **fields: Any) -> None:
+        if len(args) == 1 and not fields:
+            raw = args[0]
+        else:
+            raw = self._raw_from_fields(*args, **fields)
+        n = len(raw)
+        if n < 33:
+            raise ValueError('control block too short')
+        if (n - 33) % 32 != 0:
+            raise ValueError('control block length must be 33 + 32*n bytes')
+        self.raw = raw
+
+    @classmethod
+    def _raw_from_fields(cls, leaf_version: int, parity: int, internal_key: bytes,
+                         merkle_nodes: Iterable[bytes] = ()) -> bytes:
+        if leaf_version & 1 or not 0 <= leaf_version <= 0xFE:
+            raise ValueError('leaf_version must be an even byte')
+        if parity not in (0, 1):
+            raise ValueError('parity must be 0 or 1')
+        if len(internal_key) != 32:
+            raise ValueError('internal pubkey in control block must be 32 bytes')
+        nodes = [bytes(n) for n in merkle_nodes]
+        if any(len(n) != 32 for n in nodes):
+            raise ValueError('merkle node in control block must be 32 bytes')
+        return bytes([leaf_version | parity]) + bytes(internal_key) + b''.join(nodes)
+
+    def replace(self, **changes: Any) -> 'ControlBlock':
+        """Copy with some fields changed (what ``dataclasses.replace`` used to do)."""
+        unknown = set(changes) - set(self._FIELDS)
+        if unknown:
+            raise TypeError(f'unknown ControlBlock field(s): {", ".join(sorted(unknown))}')
+        return ControlBlock(**dict(self.as_dict(), **changes))
+
+    def as_dict(self) -> Dict[str, Any]:
+        """The four fields, as ``dataclasses.asdict`` returned them."""
+        return {name: getattr(self, name) for name in self._FIELDS}
+
+    @property
+    def leaf_version(self) -> int:
+        return self.raw[0] & 0xFE  # low bit cleared, per BIP-341 control block layout
+
+    @property
+    def parity(self) -> int:
+        return self.raw[0] & 0x01
+
+    @property
+    def internal_key(self) -> bytes:
+        return bytes(self.raw[1:33])
+
+    @property
+    def num_nodes(self) -> int:
+        return (len(self.raw) - 33) // 32
+
+    @property
+    def merkle_nodes(self) -> Tuple[bytes, ...]:
+        raw = self.raw
+        return tuple(bytes(raw[i:i + 32]) for i in range(33, len(raw), 32))
+
+    def merkle_root(self, leaf_hash: bytes) -> bytes:
+        """Ascend from ``leaf_hash`` through the proof (BIP-341 TapBranch)."""
+        raw = self.raw
+        h = leaf_hash
+        for i in range(33, len(raw), 32):
+            n = bytes(raw[i:i + 32])
+            h = tagged_sha256('TapBranch', h + n if h < n else n + h)
+        return h
+
+    def __bytes__(self) -> bytes:
+        return bytes(self.raw)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, ControlBlock):
+            return NotImplemented
+        return bytes(self.raw) == bytes(other.raw)
+
+    def __hash__(self) -> int:
+        return hash(bytes(self.raw))
+
+    def __repr__(self) -> str:
+        return (f'ControlBlock(leaf_version=0x{self.leaf_version:02x}, parity={self.parity}, '
+                f'internal_key={self.internal_key.hex()}, num_nodes={self.num_nodes})')
 
     def __iter__(self):
         """Allow tuple-unpacking for backward compatibility."""
@@ -34,41 +123,21 @@ class ControlBlock:
         yield list(self.merkle_nodes)
 
 
-def parse_control_block_hex(cb_hex: str) -> ControlBlock:
-    """Parse a Taproot control block and surface structure constraints."""
-
-    try:
-        b = binascii.unhexlify(cb_hex)
-    except (binascii.Error, TypeError) as exc:  # pragma: no cover - defensive
-        raise ValueError("control block must be hex") from exc
-
-    if len(b) < 33:
-        raise ValueError('control block too short')
-    if (len(b) - 33) % 32 != 0:
-        raise ValueError('control block length must be 33 + 32*n bytes')
+def parse_control_block(data: Any) -> ControlBlock:
+    """Parse a Taproot control block from bytes, bytearray or memoryview.
 
-    hdr = b[0]
-    parity = hdr & 0x01
-    leaf_ver = hdr & 0xFE  # low bit cleared, per BIP-341 control block layout
-
-    internal = b[1:33]
-    if len(internal) != 32:
-        raise ValueError('internal pubkey in control block must be 32 bytes')
+    The result references ``data`` without copying it.
+    """
+    return ControlBlock(data)
 
-    nodes = [b[i:i + 32] for i in range(33, len(b), 32)]
-    for node in nodes:
-        if len(node) != 32:
-            raise ValueError('merkle node in control block must be 32 bytes')
 
-    return ControlBlock(
-        leaf_version=leaf_ver,
-        parity=parity,
-        internal_key=internal,
-        merkle_nodes=tuple(nodes),
-    )
+def parse_control_block_hex(cb_hex: str) -> ControlBlock:
+    """Parse a hex Taproot control block and surface structure constraints."""
+    from .hexutil import parse_hex
+    return ControlBlock(parse_hex('control block', cb_hex))
 
 
-def _merkle_ascend(leaf_hash: bytes, nodes: List[bytes]) -> bytes:
+def _merkle_ascend(leaf_hash: bytes, nodes: Sequence[bytes]) -> bytes:
     h = leaf_hash
     for n in nodes:
         a, b = (h, n)
@@ -78,13 +147,7 @@ def _merkle_ascend(leaf_hash: bytes, nodes: List[bytes]) -> bytes:
     return h
 
 
-def compute_output_key(internal_xonly: bytes, leaf_hash: bytes, nodes: List[bytes]) -> Tuple[bytes, int]:
-    """Compute the Taproot output x-only pubkey from internal key and path.
-
-    Returns:
-        (x_only, parity) where x_only is the 32-byte Taproot output key and
-        parity is the secp256k1 y-parity bit (0=even, 1=odd).
-    """
+def _check_path_lengths(internal_xonly: bytes, leaf_hash: bytes, nodes: Sequence[bytes]) -> None:
     if len(internal_xonly) != 32:
         raise ValueError('internal key must be 32 bytes')
     if len(leaf_hash) != 32:
@@ -92,50 +155,212 @@ def compute_output_key(internal_xonly: bytes, leaf_hash: bytes, nodes: List[byte
     for node in nodes:
         if len(node) != 32:
             raise ValueError('each merkle node must be 32 bytes')
-    try:
-        import importlib
-        _cc = importlib.import_module('coincurve')
-        PublicKey = getattr(_cc, 'PublicKey')
-        PrivateKey = getattr(_cc, 'PrivateKey')
-    except Exception as e:
-        raise ImportError(f'coincurve not available: {e}')
-
-    merkle = _merkle_ascend(leaf_hash, nodes)
+
+
+def _tap_tweak_int(internal_xonly: bytes, leaf_hash: bytes, nodes: Sequence[bytes]) -> int:
+    return _tweak_from_root(internal_xonly, _merkle_ascend(leaf_hash, nodes))
+
+
+def _tweak_from_root(internal_xonly: bytes, merkle: bytes) -> int:
     tweak = tagged_sha256('TapTweak', internal_xonly + merkle)
     t_int = int.from_bytes(tweak, 'big')
     if t_int >= SECP256K1_ORDER:
         raise ValueError('tap tweak exceeds curve order')
+    return t_int
+
 
-    base_pk: Optional[Any] = None
-    from_xonly = getattr(PublicKey, 'from_xonly', None)
-    if callable(from_xonly):
+def compute_output_key(internal_xonly: bytes, leaf_hash: bytes, nodes: List[bytes]) -> Tuple[bytes, int]:
+    """Compute the Taproot output x-only pubkey from internal key and path.
+
+    Returns:
+        (x_only, parity) where x_only is the 32-byte Taproot output key and
+        parity is the secp256k1 y-parity bit (0=even, 1=odd).
+    """
+    _check_path_lengths(internal_xonly, leaf_hash, nodes)
+    t_int = _tap_tweak_int(internal_xonly, leaf_hash, nodes)
+    backend = get_ec_backend()
+    return backend.tweak_xonly(backend.load_xonly(internal_xonly), t_int)
+
+
+def output_key_from_control(cb: ControlBlock, leaf_hash: bytes) -> Tuple[bytes, int]:
+    """:func:`compute_output_key` for a parsed control block, without node lists."""
+    if len(leaf_hash) != 32:
+        raise ValueError('leaf hash must be 32 bytes')
+    internal = cb.internal_key
+    t_int = _tweak_from_root(internal, cb.merkle_root(leaf_hash))
+    backend = get_ec_backend()
+    return backend.tweak_xonly(backend.load_xonly(internal), t_int)
+
+
+class _CoincurveBackend:
+    """TapTweak via libsecp256k1 (coincurve); classes are looked up once."""
+
+    name = 'coincurve'
+
+    def __init__(self) -> None:
         try:
-            base_pk = from_xonly(internal_xonly)
-        except Exception:
-            base_pk = None
-    if base_pk is None:
+            import importlib
+            _cc = importlib.import_module('coincurve')
+            self._PublicKey = getattr(_cc, 'PublicKey')
+            self._PrivateKey = getattr(_cc, 'PrivateKey')
+        except Exception as e:
+            raise ImportError(f'coincurve not available: {e}')
+        self._from_xonly = getattr(self._PublicKey, 'from_xonly', None)
+
+    def load_xonly(self, internal_xonly: bytes) -> Any:
+        base_pk: Optional[Any] = None
+        if callable(self._from_xonly):
+            try:
+                base_pk = self._from_xonly(internal_xonly)
+            except Exception:
+                base_pk = None
+        if base_pk is None:
+            try:
+                base_pk = self._PublicKey(b'\x02' + internal_xonly)
+            except Exception as exc:
+                raise ValueError(f'invalid internal key: {exc}')
+        return base_pk
+
+    def tweak_xonly(self, base_pk: Any, t_int: int) -> Tuple[bytes, int]:
+        if t_int == 0:
+            tweaked = base_pk
+        else:
+            try:
+                tweak_pub = self._PrivateKey.from_int(t_int).public_key
+            except Exception as exc:
+                raise ValueError(f'failed to derive tweak public key: {exc}')
+            try:
+                tweaked = self._PublicKey.combine_keys([base_pk, tweak_pub])
+            except Exception as exc:
+                raise ValueError(f'failed to apply tap tweak: {exc}')
+            if tweaked is None:
+                raise ValueError('failed to compute tweaked output key (infinity)')
+
+        compressed = tweaked.format(compressed=True)
+        parity = compressed[0] & 1
+        return compressed[1:33], parity
+
+
+class _PythonBackend:
+    """TapTweak via the pure-Python ``ssv.secp256k1`` fallback."""
+
+    name = 'python'
+
+    def __init__(self) -> None:
+        from . import secp256k1
+        self._ec = secp256k1
+
+    def load_xonly(self, internal_xonly: bytes) -> Any:
         try:
-            base_pk = PublicKey(b'\x02' + internal_xonly)
-        except Exception as exc:
+            return self._ec.lift_x(int.from_bytes(internal_xonly, 'big'))
+        except ValueError as exc:
             raise ValueError(f'invalid internal key: {exc}')
 
-    if t_int == 0:
-        tweaked = base_pk
-    else:
+    def tweak_xonly(self, point: Any, t_int: int) -> Tuple[bytes, int]:
+        return self._ec.point_add_tweak(point, t_int)
+
+
+EC_BACKENDS: Dict[str, Callable[[], Any]] = {
+    'coincurve': _CoincurveBackend,
+    'python': _PythonBackend,
+}
+
+_BACKEND_CACHE: Dict[str, Any] = {}
+_COINCURVE_AVAILABLE: Optional[bool] = None
+
+
+def ec_backend_name() -> str:
+    """Name of the EC backend used for TapTweak.
+
+    ``SSV_EC_BACKEND`` (``coincurve`` or ``python``) forces a backend;
+    otherwise coincurve is preferred and the pure-Python fallback is used when
+    it is not installed.
+    """
+    global _COINCURVE_AVAILABLE
+    forced = os.environ.get('SSV_EC_BACKEND')
+    if forced:
+        if forced not in EC_BACKENDS:
+            raise ValueError(f'unknown SSV_EC_BACKEND {forced!r} (expected one of: {", ".join(EC_BACKENDS)})')
+        return forced
+    if _COINCURVE_AVAILABLE is None:
         try:
-            tweak_pub = PrivateKey.from_int(t_int).public_key
-        except Exception as exc:
-            raise ValueError(f'failed to derive tweak public key: {exc}')
+            import importlib
+            importlib.import_module('coincurve')
+            _COINCURVE_AVAILABLE = True
+        except ImportError:
+            _COINCURVE_AVAILABLE = False
+    return 'coincurve' if _COINCURVE_AVAILABLE else 'python'
+
+
+def get_ec_backend(name: Optional[str] = None) -> Any:
+    """Return the (cached) EC backend instance, resolving the name if omitted."""
+    if name is None:
+        name = ec_backend_name()
+    backend = _BACKEND_CACHE.get(name)
+    if backend is None:
+        if name not in EC_BACKENDS:
+            raise ValueError(f'unknown EC backend {name!r}')
+        backend = EC_BACKENDS[name]()
+        _BACKEND_CACHE[name] = backend
+    return backend
+
+
+OutputKeyItem = Tuple[bytes, bytes, Sequence[bytes]]
+
+
+def _output_keys_chunk(chunk: Sequence[OutputKeyItem], offset: int, backend_name: str) -> List[Tuple[bytes, int]]:
+    backend = get_ec_backend(backend_name)
+    points: Dict[bytes, Any] = {}
+    out: List[Tuple[bytes, int]] = []
+    for i, (internal_xonly, leaf_hash, nodes) in enumerate(chunk):
         try:
-            tweaked = PublicKey.combine_keys([base_pk, tweak_pub])
-        except Exception as exc:
-            raise ValueError(f'failed to apply tap tweak: {exc}')
-        if tweaked is None:
-            raise ValueError('failed to compute tweaked output key (infinity)')
-
-    compressed = tweaked.format(compressed=True)
-    parity = compressed[0] & 1
-    return compressed[1:33], parity
+            internal_xonly = bytes(internal_xonly)
+            _check_path_lengths(internal_xonly, leaf_hash, nodes)
+            point = points.get(internal_xonly)
+            if point is None:
+                point = points[internal_xonly] = backend.load_xonly(internal_xonly)
+            out.append(backend.tweak_xonly(point, _tap_tweak_int(internal_xonly, leaf_hash, nodes)))
+        except ValueError as exc:
+            raise ValueError(f'item {offset + i}: {exc}') from exc
+    return out
+
+
+def compute_output_keys(
+    items: Iterable[OutputKeyItem],
+    *,
+    workers: int = 1,
+    executor: str = 'thread',
+    chunk_size: int = 1024,
+) -> List[Tuple[bytes, int]]:
+    """Batch form of :func:`compute_output_key`.
+
+    Args:
+        items: iterable of (internal_xonly, leaf_hash, merkle_nodes).
+        workers: pool size; 1 runs inline.
+        executor: ``thread`` or ``process`` pool when workers > 1.
+        chunk_size: items per pool task.
+
+    Returns:
+        (x_only, parity) tuples in input order. The backend is resolved once
+        and decoded internal-key points are reused within each chunk.
+    Raises:
+        ValueError naming the first offending item index.
+    """
+    backend_name = ec_backend_name()
+    seq = list(items)
+    if workers <= 1 or len(seq) <= chunk_size:
+        return _output_keys_chunk(seq, 0, backend_name)
+    if executor not in ('thread', 'process'):
+        raise ValueError("executor must be 'thread' or 'process'")
+    from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+    pool_cls = ThreadPoolExecutor if executor == 'thread' else ProcessPoolExecutor
+    offsets = range(0, len(seq), chunk_size)
+    out: List[Tuple[bytes, int]] = []
+    with pool_cls(max_workers=workers) as pool:
+        futures = [pool.submit(_output_keys_chunk, seq[o:o + chunk_size], o, backend_name) for o in offsets]
+        for fut in futures:
+            out.extend(fut.result())
+    return out
 
 
 def compute_output_key_xonly(internal_xonly: bytes, leaf_hash: bytes, nodes: List[bytes]) -> bytes:
@@ -14,16 +14,16 @@ Witness (script-path)
 - Borrower: [sig_b, s, 0x01, tapscript, control]
 - Provider: [sig_p, 0x00, tapscript, control]
 
-This module provides helpers to build the tapscript for the policy, compute
-TapLeaf hashes, and produce a simple disassembly for debugging.
+This module provides helpers to build the tapscript for the policy (from a
+compiled template), recognize a policy tapscript and recover its parameters,
+compute TapLeaf hashes, and produce a simple disassembly for debugging.
 """
 from __future__ import annotations
 
-import binascii
 import hashlib
-from typing import Dict
+from typing import Any, Dict, Iterable, List, Optional
 
-from .policy import MAX_CSV_BLOCKS
+from .policy import MAX_CSV_BLOCKS, PolicyParams
 
 # Opcodes
 OP_IF = 0x63
@@ -79,29 +79,85 @@ def build_tapscript(hash_h_hex: str, borrower_pk_hex: str, csv_blocks: int, prov
         csv_blocks: positive integer CSV timelock (blocks).
         provider_pk_hex: 32-byte x-only provider pubkey hex.
     """
-    h = binascii.unhexlify(hash_h_hex)
-    if len(h) != 32:
+    from .hexutil import parse_hex_many
+    h, pb, pp = parse_hex_many((('hash_h', hash_h_hex, None), ('borrower_pk', borrower_pk_hex, None),
+                                ('provider_pk', provider_pk_hex, None)))
+    return build_tapscript_bytes(h, pb, csv_blocks, pp)
+
+
+# Compiled policy template. The script is a constant skeleton with four
+# fixed-width holes; only the CSV push varies in length (1, 2 or 3 bytes
+# for 1..65535), so there is one skeleton per CSV width:
+#
+#   0   OP_IF OP_SHA256 PUSH32        3  <h>
+#   35  OP_EQUALVERIFY PUSH32         37 <pk_b>
+#   69  OP_CHECKSIG OP_ELSE           71 <csv len> 72 <csv>
+#   72+L  OP_CSV OP_DROP PUSH32       75+L <pk_p>
+#   107+L OP_CHECKSIG OP_ENDIF        (total 109+L bytes)
+_T_HEAD = bytes([OP_IF, OP_SHA256, 0x20])
+_T_MID1 = bytes([OP_EQUALVERIFY, 0x20])
+_T_MID2 = bytes([OP_CHECKSIG, OP_ELSE])
+_T_MID3 = bytes([OP_CHECKSEQUENCEVERIFY, OP_DROP, 0x20])
+_T_TAIL = bytes([OP_CHECKSIG, OP_ENDIF])
+_T_H, _T_PKB, _T_CSV = 3, 37, 72
+_T_BASE_LEN = 109
+
+
+def _compile_template(csv_len: int) -> bytes:
+    return b''.join([_T_HEAD, bytes(32), _T_MID1, bytes(32), _T_MID2, bytes([csv_len]), bytes(csv_len),
+                     _T_MID3, bytes(32), _T_TAIL])
+
+
+_TEMPLATES: Dict[int, bytes] = {n: _compile_template(n) for n in (1, 2, 3)}
+
+
+def build_tapscript_bytes(hash_h: bytes, borrower_pk: bytes, csv_blocks: int, provider_pk: bytes) -> bytes:
+    """Bytes form of :func:`build_tapscript`: fill the compiled template in place."""
+    if len(hash_h) != 32:
         raise ValueError("hash_h must be 32 bytes hex")
-    pb = binascii.unhexlify(borrower_pk_hex)
-    pp = binascii.unhexlify(provider_pk_hex)
-    if len(pb) != 32 or len(pp) != 32:
+    if len(borrower_pk) != 32 or len(provider_pk) != 32:
         raise ValueError("borrower_pk and provider_pk must be 32-byte x-only pubkeys (hex)")
     if csv_blocks <= 0:
         raise ValueError("csv_blocks must be positive")
     if csv_blocks > MAX_CSV_BLOCKS:
         raise ValueError(f"csv_blocks must be <= {MAX_CSV_BLOCKS} (BIP-68 block-based CSV limit)")
-
-    script = bytearray()
-    script += bytes([OP_IF])
-    script += bytes([OP_SHA256]) + pushdata(h) + bytes([OP_EQUALVERIFY])
-    script += pushdata(pb) + bytes([OP_CHECKSIG])
-    script += bytes([OP_ELSE])
-    script += push_scriptnum(csv_blocks) + bytes([OP_CHECKSEQUENCEVERIFY, OP_DROP])
-    script += pushdata(pp) + bytes([OP_CHECKSIG])
-    script += bytes([OP_ENDIF])
+    csv = encode_scriptnum(csv_blocks)
+    n = len(csv)
+    script = bytearray(_TEMPLATES[n])
+    script[_T_H:_T_H + 32] = hash_h
+    script[_T_PKB:_T_PKB + 32] = borrower_pk
+    script[_T_CSV:_T_CSV + n] = csv
+    script[_T_CSV + n + 3:_T_CSV + n + 35] = provider_pk
     return bytes(script)
 
 
+def match_tapscript(script: Any) -> Optional[PolicyParams]:
+    """Recognize an SSV policy tapscript and recover its parameters.
+
+    A constant number of slice comparisons against the compiled template;
+    returns None for any script :func:`build_tapscript` would not produce
+    (including non-minimal or out-of-range CSV pushes).
+    """
+    n = len(script) - _T_BASE_LEN
+    if n not in _TEMPLATES or script[_T_CSV - 1] != n:
+        return None
+    p = _T_CSV + n
+    if (script[:_T_H] != _T_HEAD or script[_T_H + 32:_T_PKB] != _T_MID1
+            or script[_T_PKB + 32:_T_CSV - 1] != _T_MID2 or script[p:p + 3] != _T_MID3
+            or script[p + 35:] != _T_TAIL):
+        return None
+    csv = bytes(script[_T_CSV:p])
+    csv_blocks = int.from_bytes(csv, 'little')
+    if not 0 < csv_blocks <= MAX_CSV_BLOCKS or encode_scriptnum(csv_blocks) != csv:
+        return None
+    return PolicyParams(
+        bytes(script[_T_H:_T_H + 32]).hex(),
+        bytes(script[_T_PKB:_T_PKB + 32]).hex(),
+        bytes(script[p + 3:p + 35]).hex(),
+        csv_blocks,
+    )
+
+
 def compactsize(n: int) -> bytes:
     if n < 0xfd:
         return bytes([n])
@@ -154,9 +210,42 @@ def disasm(script: bytes) -> str:
     return ' '.join(out)
 
 
+# BIP-340 tagged hashes: sha256(sha256(tag) || sha256(tag) || msg). The 64-byte
+# prefix is exactly one SHA-256 block, so we keep a hashlib object that has
+# already absorbed it and clone that midstate per message.
+_TAG_MIDSTATES: Dict[str, Any] = {}
+
+
+def _tag_midstate(tag: str) -> Any:
+    h = _TAG_MIDSTATES.get(tag)
+    if h is None:
+        t = hashlib.sha256(tag.encode()).digest()
+        h = hashlib.sha256(t + t)
+        _TAG_MIDSTATES[tag] = h
+    return h
+
+
+for _tag in ('TapLeaf', 'TapBranch', 'TapTweak', 'TapSighash', 'BIP0340/challenge'):
+    _tag_midstate(_tag)
+del _tag
+
+
 def tagged_sha256(tag: str, msg: bytes) -> bytes:
-    t = hashlib.sha256(tag.encode()).digest()
-    return hashlib.sha256(t + t + msg).digest()
+    h = _tag_midstate(tag).copy()
+    h.update(msg)
+    return h.digest()
+
+
+def tagged_sha256_many(tag: str, messages: Iterable[bytes]) -> List[bytes]:
+    """Tagged-hash every message with one tag, reusing a single midstate."""
+    clone = _tag_midstate(tag).copy
+    out: List[bytes] = []
+    append = out.append
+    for msg in messages:
+        h = clone()
+        h.update(msg)
+        append(h.digest())
+    return out
 
 
 def tapleaf_hash_tagged(script: bytes, leaf_version: int = LEAF_VERSION) -> bytes:
@@ -0,0 +1,219 @@
+"""
+Weighted TapTree construction (BIP-341 script trees with several leaves).
+
+Leaves carry a spend weight (a probability or any relative frequency). The
+tree is Huffman-shaped: the two lightest subtrees are merged first, so the
+expected control block size ``sum(w * (33 + 32 * depth)) / sum(w)`` is
+minimal and likely paths get the shortest witnesses.
+
+Each merge hashes one TapBranch and appends the sibling subtree's hash to
+the proof of every leaf below it, so the merkle root and every control block
+come out of a single pass (n log n heap operations; every subtree hash is
+computed once and shared by the proofs that need it). Ties are broken by
+input order, so the same leaves always give the same tree.
+
+Skewed weights can make a Huffman tree deeper than the BIP-341 limit of
+128; the merge loop notices as soon as a subtree gets too deep and the tree
+is instead built from package-merge depths (the cheapest tree whose leaves
+are all at depth <= 128).
+
+Control block layout (per leaf):
+  (leaf_version | parity) 1 | internal_key 32 | sibling hashes 32 * depth
+"""
+from __future__ import annotations
+
+import heapq
+import math
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+from .tapscript import LEAF_VERSION, tagged_sha256, tapleaf_hash_tagged
+
+TAPROOT_CONTROL_MAX_NODE_COUNT = 128  # BIP-341 consensus limit on merkle depth
+
+
+class TapLeaf(NamedTuple):
+    script: bytes
+    weight: float = 1
+    name: Optional[str] = None
+    leaf_version: int = LEAF_VERSION
+
+
+class LeafPath(NamedTuple):
+    name: Optional[str]
+    script: bytes
+    leaf_version: int
+    weight: float
+    leaf_hash: bytes
+    control: bytes
+
+    @property
+    def depth(self) -> int:
+        return (len(self.control) - 33) // 32
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            'name': self.name,
+            'weight': self.weight,
+            'depth': self.depth,
+            'leaf_hash': self.leaf_hash.hex(),
+            'tapscript': self.script.hex(),
+            'control': self.control.hex(),
+        }
+
+
+class TapTree(NamedTuple):
+    internal_key: bytes
+    output_key: bytes
+    parity: int
+    merkle_root: bytes
+    leaves: List[LeafPath]
+
+    @property
+    def spk(self) -> bytes:
+        return b'\x51\x20' + self.output_key
+
+    def leaf(self, name: str) -> LeafPath:
+        for leaf in self.leaves:
+            if leaf.name == name:
+                return leaf
+        raise ValueError(f'no leaf named {name!r}')
+
+    def expected_control_size(self) -> float:
+        """Weight-averaged control block size in bytes."""
+        total = sum(leaf.weight for leaf in self.leaves)
+        if not total:
+            return float(sum(len(leaf.control) for leaf in self.leaves)) / len(self.leaves)
+        return sum(leaf.weight * len(leaf.control) for leaf in self.leaves) / total
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            'internal_key': self.internal_key.hex(),
+            'output_key': self.output_key.hex(),
+            'parity': self.parity,
+            'merkle_root': self.merkle_root.hex(),
+            'spk': self.spk.hex(),
+            'expected_control_bytes': round(self.expected_control_size(), 3),
+            'leaves': [leaf.as_dict() for leaf in self.leaves],
+        }
+
+
+def _check_leaf(i: int, leaf: TapLeaf) -> None:
+    w = leaf.weight
+    if isinstance(w, bool) or not isinstance(w, (int, float)) or math.isnan(w) or w < 0 or math.isinf(w):
+        raise ValueError(f'leaf {i}: weight must be a finite number >= 0 (got {w!r})')
+    v = leaf.leaf_version
+    if isinstance(v, bool) or not isinstance(v, int) or v & 1 or not 0 <= v <= 0xFE:
+        raise ValueError(f'leaf {i}: leaf_version must be an even byte (got {v!r})')
+
+
+def _limited_depths(weights: Sequence[float], limit: int) -> List[int]:
+    """Optimal leaf depths with none deeper than ``limit`` (package-merge).
+
+    Packages are pairs of nodes; a leaf's depth is the number of times it
+    occurs in the ``2n - 2`` cheapest items of the last level.
+    """
+    n = len(weights)
+    leaves = [(weights[i], i) for i in sorted(range(n), key=lambda i: (weights[i], i))]
+    items: List[Tuple[float, Any]] = []
+    for _ in range(limit):
+        packages = [(items[k][0] + items[k + 1][0], (items[k][1], items[k + 1][1])) for k in range(0, len(items) - 1, 2)]
+        items = list(heapq.merge(leaves, packages, key=lambda item: item[0]))
+    depths = [0] * n
+    stack = [node for _w, node in items[:2 * n - 2]]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, int):
+            depths[node] += 1
+        else:
+            stack.extend(node)
+    return depths
+
+
+def _paths_from_depths(leaf_hashes: Sequence[bytes], depths: Sequence[int]) -> Tuple[bytes, List[List[bytes]]]:
+    """Build the tree with the given leaf depths, pairing nodes level by level from the bottom."""
+    paths: List[List[bytes]] = [[] for _ in leaf_hashes]
+    by_depth: Dict[int, List[int]] = {}
+    for i, d in enumerate(depths):
+        by_depth.setdefault(d, []).append(i)
+    carried: List[Tuple[bytes, List[int]]] = []
+    for d in range(max(depths), 0, -1):
+        nodes = [(leaf_hashes[i], [i]) for i in by_depth.get(d, ())] + carried
+        carried = []
+        for k in range(0, len(nodes), 2):
+            (ha, below_a), (hb, below_b) = nodes[k], nodes[k + 1]
+            for i in below_a:
+                paths[i].append(hb)
+            for i in below_b:
+                paths[i].append(ha)
+            carried.append((tagged_sha256('TapBranch', ha + hb if ha < hb else hb + ha), below_a + below_b))
+    return carried[0][0], paths
+
+
+def huffman_paths(leaf_hashes: Sequence[bytes], weights: Sequence[float]) -> Tuple[bytes, List[List[bytes]]]:
+    """Merkle root and per-leaf proof (sibling hashes, leaf to root) of the Huffman tree.
+
+    When the Huffman tree would be deeper than the BIP-341 limit (very
+    skewed weights), the optimal tree of bounded depth is built instead.
+    """
+    n = len(leaf_hashes)
+    if n == 0:
+        raise ValueError('a TapTree needs at least one leaf')
+    paths: List[List[bytes]] = [[] for _ in range(n)]
+    # heap entries: (weight, tiebreak, hash, leaf indices below, depth)
+    heap = [(weights[i], i, leaf_hashes[i], [i], 0) for i in range(n)]
+    heapq.heapify(heap)
+    seq = n
+    while len(heap) > 1:
+        wa, _, ha, below_a, da = heapq.heappop(heap)
+        wb, _, hb, below_b, db = heapq.heappop(heap)
+        depth = max(da, db) + 1
+        if depth > TAPROOT_CONTROL_MAX_NODE_COUNT:
+            return _paths_from_depths(leaf_hashes, _limited_depths(weights, TAPROOT_CONTROL_MAX_NODE_COUNT))
+        for i in below_a:
+            paths[i].append(hb)
+        for i in below_b:
+            paths[i].append(ha)
+        branch = tagged_sha256('TapBranch', ha + hb if ha < hb else hb + ha)
+        below_a.extend(below_b)
+        heapq.heappush(heap, (wa + wb, seq, branch, below_a, depth))
+        seq += 1
+    return heap[0][2], paths
+
+
+def build_taptree(leaves: Iterable[TapLeaf], internal_key: bytes) -> TapTree:
+    """Build the weighted tree, its output key and every leaf's control block."""
+    from .memo import default_cache
+    items = [leaf if isinstance(leaf, TapLeaf) else TapLeaf(*leaf) for leaf in leaves]
+    internal_key = bytes(internal_key)
+    if len(internal_key) != 32:
+        raise ValueError(f'internal_key must be 32 bytes (got {len(internal_key)})')
+    for i, leaf in enumerate(items):
+        _check_leaf(i, leaf)
+    hashes = [tapleaf_hash_tagged(bytes(leaf.script), leaf.leaf_version) for leaf in items]
+    root, paths = huffman_paths(hashes, [leaf.weight for leaf in items])
+    qx, parity = default_cache().output_key(internal_key, root, verified=True)
+    out = [
+        LeafPath(leaf.name, bytes(leaf.script), leaf.leaf_version, leaf.weight, h,
+                 bytes([leaf.leaf_version | parity]) + internal_key + b''.join(path))
+        for leaf, h, path in zip(items, hashes, paths)
+    ]
+    return TapTree(internal_key, qx, parity, root, out)
+
+
+def leaves_from_json(records: Any) -> List[TapLeaf]:
+    """Parse ``[{"tapscript": hex, "weight": w, "name": str, "leaf_version": n}, ...]``."""
+    from .hexutil import parse_hex
+    if not isinstance(records, list):
+        raise ValueError('leaves must be a JSON array')
+    out: List[TapLeaf] = []
+    for i, rec in enumerate(records):
+        if not isinstance(rec, dict):
+            raise ValueError(f'leaf {i}: must be a JSON object')
+        name = rec.get('name')
+        out.append(TapLeaf(
+            parse_hex(f'leaf {i} tapscript', rec.get('tapscript')),
+            rec.get('weight', 1),
+            None if name is None else str(name),
+            rec.get('leaf_version', LEAF_VERSION),
+        ))
+    return out
@@ -1,19 +1,22 @@
 """
 Taproot path verification utilities.
 
-Given a tapscript hex and a control block, recompute the expected Taproot
+Given a tapscript and a control block, recompute the expected Taproot
 output scriptPubKey and compare with an actual witness_utxo spk.
+
+:func:`check_taproot_path` works on bytes (or memoryviews) end to end;
+:func:`verify_taproot_path` is the hex/JSON edge used by the CLI and server.
 """
 from __future__ import annotations
 
-import binascii
-from typing import Optional, TypedDict
+from typing import Any, NamedTuple, Optional, TypedDict
 
+from .hexutil import parse_hex
+from .memo import default_cache
 from .tapscript import tapleaf_hash_tagged
 from .taproot import (
     ControlBlock,
-    compute_output_key,
-    parse_control_block_hex,
+    parse_control_block,
     scriptpubkey_from_xonly,
 )
 
@@ -25,34 +28,41 @@ class VerifyResult(TypedDict):
     reason: Optional[str]
 
 
-def verify_taproot_path(tapscript_hex: str, control_block_hex: str, witness_spk_hex: str) -> VerifyResult:
-    script = binascii.unhexlify(tapscript_hex)
-    cb: ControlBlock = parse_control_block_hex(control_block_hex)
-    leaf = tapleaf_hash_tagged(script, cb.leaf_version)
-    try:
-        qx, parity = compute_output_key(cb.internal_key, leaf, cb.merkle_nodes)
-        expected_spk = scriptpubkey_from_xonly(qx).hex()
-    except Exception as e:
+class PathCheck(NamedTuple):
+    ok: Optional[bool]
+    expected_spk: Optional[bytes]
+    actual_spk: bytes
+    reason: Optional[str]
+
+    def as_dict(self) -> VerifyResult:
         return {
-            'ok': None,
-            'expected_spk': None,
-            'actual_spk': witness_spk_hex.lower(),
-            'reason': str(e),
+            'ok': self.ok,
+            'expected_spk': None if self.expected_spk is None else self.expected_spk.hex(),
+            'actual_spk': self.actual_spk.hex(),
+            'reason': self.reason,
         }
 
+
+def check_taproot_path(tapscript: Any, control: Any, witness_spk: Any) -> PathCheck:
+    """Bytes-native path check; ``control`` may be raw bytes or a :class:`ControlBlock`."""
+    cb: ControlBlock = control if isinstance(control, ControlBlock) else parse_control_block(control)
+    actual = bytes(witness_spk)
+    leaf = tapleaf_hash_tagged(tapscript, cb.leaf_version)
+    try:
+        qx, parity = default_cache().output_key(cb.internal_key, cb.merkle_root(leaf), verified=True)
+        expected = scriptpubkey_from_xonly(qx)
+    except Exception as e:
+        return PathCheck(None, None, actual, str(e))
     if parity != cb.parity:
-        return {
-            'ok': False,
-            'expected_spk': expected_spk,
-            'actual_spk': witness_spk_hex.lower(),
-            'reason': 'control block parity mismatch',
-        }
+        return PathCheck(False, expected, actual, 'control block parity mismatch')
+    ok = expected == actual
+    return PathCheck(ok, expected, actual, None if ok else 'scriptPubKey mismatch')
+
 
-    actual_spk = witness_spk_hex.lower()
-    ok = (expected_spk == actual_spk)
-    return {
-        'ok': ok,
-        'expected_spk': expected_spk,
-        'actual_spk': actual_spk,
-        'reason': None if ok else 'scriptPubKey mismatch',
-    }
+def verify_taproot_path(tapscript_hex: str, control_block_hex: str, witness_spk_hex: str) -> VerifyResult:
+    """Hex wrapper around :func:`check_taproot_path` returning a JSON-ready dict."""
+    return check_taproot_path(
+        parse_hex('tapscript', tapscript_hex),
+        parse_hex('control block', control_block_hex),
+        parse_hex('witness spk', witness_spk_hex),
+    ).as_dict()
@@ -1,7 +1,9 @@
 from __future__ import annotations
 
 from enum import Enum
-from typing import List, Optional
+from typing import Any, List, Optional
+
+from .taproot import ControlBlock
 
 
 IF_SELECTOR = b"\x01"     # selects the IF branch (CLOSE)
@@ -30,12 +32,18 @@ def _validate_tapscript(tapscript: bytes) -> None:
         raise ValueError("tapscript exceeds 10k byte BIP-342 limit")
 
 
-def build_witness(branch: Branch, sig: bytes, tapscript: bytes, control: bytes, *, preimage: Optional[bytes] = None) -> List[bytes]:
+def build_witness(branch: Branch, sig: Any, tapscript: Any, control: Any, *, preimage: Optional[Any] = None) -> List[bytes]:
     """Build Taproot script-path witness stack for the given branch.
 
     CLOSE (borrower):   [sig_b, s, 0x01, tapscript, control]
     LIQUIDATE (provider): [sig_p, 0x00, tapscript, control]
+
+    Items may be passed as bytes or any buffer (memoryview, bytearray) and
+    ``control`` also as a parsed ``taproot.ControlBlock``; the stack always
+    holds ``bytes``, which is what ``CScriptWitness`` accepts.
     """
+    if isinstance(control, ControlBlock):
+        control = control.raw
     _validate_signature(sig)
     _validate_tapscript(tapscript)
     _validate_control(control)
@@ -45,8 +53,8 @@ def build_witness(branch: Branch, sig: bytes, tapscript: bytes, control: bytes,
             raise ValueError("preimage is required for CLOSE branch")
         if len(preimage) != 32:
             raise ValueError("preimage must be 32 bytes")
-        return [sig, preimage, IF_SELECTOR, tapscript, control]
+        return [bytes(sig), bytes(preimage), IF_SELECTOR, bytes(tapscript), bytes(control)]
     elif branch is Branch.LIQUIDATE:
-        return [sig, ELSE_SELECTOR, tapscript, control]
+        return [bytes(sig), ELSE_SELECTOR, bytes(tapscript), bytes(control)]
     else:
         raise ValueError("unknown branch")
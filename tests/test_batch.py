@@ -0,0 +1,158 @@
+import json
+import os
+import sys
+import tempfile
+
+import pytest
+
+from typing import Sequence
+from ssv.batch import build_vault, build_vaults
+from ssv.cli import main as ssv_main
+
+
+def run_cli(argv: Sequence[str]) -> str:
+    old = sys.argv[:]
+    try:
+        sys.argv = ['ssv'] + list(argv)
+        from io import StringIO
+        import contextlib
+        buf = StringIO()
+        with contextlib.redirect_stdout(buf):
+            ssv_main()
+        return buf.getvalue()
+    finally:
+        sys.argv = old
+
+
+def _record(csv: int = 10, **extra):
+    rec = {'h': '00' * 32, 'pk_b': '11' * 32, 'pk_p': '22' * 32, 'csv_blocks': csv, 'internal_key': '33' * 32}
+    rec.update(extra)
+    return rec
+
+
+def test_build_vault_matches_single_shot_helpers():
+    pytest.importorskip('coincurve', reason='coincurve not installed')
+    from ssv.tapscript import build_tapscript, tapleaf_hash_tagged
+    from ssv.taproot import compute_output_key, scriptpubkey_from_xonly
+
+    out = build_vault(_record())
+    script = build_tapscript('00' * 32, '11' * 32, 10, '22' * 32)
+    leaf = tapleaf_hash_tagged(script)
+    qx, parity = compute_output_key(bytes.fromhex('33' * 32), leaf, [])
+    assert out['tapscript_hex'] == script.hex()
+    assert out['tapleaf_hash_tagged'] == leaf.hex()
+    assert out['output_key'] == qx.hex()
+    assert out['parity'] == parity
+    assert out['spk_hex'] == scriptpubkey_from_xonly(qx).hex()
+    assert out['control_block_hex'] == bytes([0xC0 | parity]).hex() + '33' * 32
+
+
+def test_build_vaults_keeps_order_and_isolates_errors():
+    pytest.importorskip('coincurve', reason='coincurve not installed')
+    lines = [
+        json.dumps(_record(5, id='a')),
+        '',
+        json.dumps(_record(70000, id='b')),
+        'not json',
+        json.dumps(_record(7, id='c')),
+    ]
+    rows = list(build_vaults(lines, chunk_size=2))
+    assert [r['line'] for r in rows] == [1, 3, 4, 5]
+    assert [r['ok'] for r in rows] == [True, False, False, True]
+    assert rows[0]['id'] == 'a' and rows[3]['id'] == 'c'
+    assert 'csv_blocks' in rows[1]['error']
+
+
+def test_build_vaults_process_pool_matches_inline():
+    pytest.importorskip('coincurve', reason='coincurve not installed')
+    lines = [json.dumps(_record(n)) for n in range(1, 41)]
+    inline = list(build_vaults(lines))
+    pooled = list(build_vaults(lines, workers=2, chunk_size=7))
+    assert pooled == inline
+
+
+def test_cli_build_vaults_files():
+    pytest.importorskip('coincurve', reason='coincurve not installed')
+    with tempfile.TemporaryDirectory() as td:
+        src = os.path.join(td, 'in.jsonl')
+        dst = os.path.join(td, 'out.jsonl')
+        with open(src, 'wt') as f:
+            f.write(json.dumps(_record(3)) + '\n' + json.dumps(_record(4)) + '\n')
+        run_cli(['build-vaults', '--in', src, '--out', dst])
+        with open(dst) as f:
+            rows = [json.loads(line) for line in f]
+    assert len(rows) == 2 and all(r['ok'] for r in rows)
+    assert rows[0]['spk_hex'].startswith('5120')
+
+
+def _psbt_available() -> bool:
+    import importlib
+    try:
+        m = importlib.import_module('bitcointx.core.psbt')
+        return any(hasattr(m, attr) for attr in ('PSBT', 'PartiallySignedTransaction'))
+    except Exception:
+        return False
+
+
+def _write_psbt(path: str) -> None:
+    import importlib
+    psbt_mod = importlib.import_module('bitcointx.core.psbt')
+    PSBT = getattr(psbt_mod, 'PSBT', getattr(psbt_mod, 'PartiallySignedTransaction'))
+    core = importlib.import_module('bitcointx.core')
+    spk = core.script.CScript(bytes.fromhex('5120' + '11' * 32))
+    tx = core.CTransaction([core.CTxIn(core.COutPoint(core.lx('00' * 32), 0))], [core.CTxOut(5000, spk)], 2)
+    psbt = PSBT(unsigned_tx=tx)
+    psbt.set_utxo(core.CTxOut(10000, spk), 0)
+    with open(path, 'wt') as f:
+        f.write(psbt.to_base64())
+
+
+@pytest.mark.skipif(not _psbt_available(), reason='python-bitcointx PSBT API not available')
+@pytest.mark.parametrize('workers', [1, 2])
+def test_finalize_many_isolates_failures(workers):
+    from ssv.batch import finalize_many
+    with tempfile.TemporaryDirectory() as td:
+        src = os.path.join(td, 'in.psbt')
+        _write_psbt(src)
+        base = {'psbt_in': src, 'mode': 'provider', 'sig': 'aa' * 64, 'control': 'c0' + '33' * 32, 'tapscript': '51'}
+        manifest = [
+            dict(base, id='ok1', psbt_out=os.path.join(td, 'o1.psbt')),
+            dict(base, id='missing', psbt_in=os.path.join(td, 'nope.psbt'), psbt_out=os.path.join(td, 'o2.psbt')),
+            dict(base, id='badflag', mode='sideways', psbt_out=os.path.join(td, 'o3.psbt')),
+            dict(base, id='ok2', psbt_out=os.path.join(td, 'o4.psbt'), require_anchor_index=0,
+                 require_anchor_spk='5120' + '11' * 32, require_anchor_value=5000),
+        ]
+        rows = list(finalize_many([json.dumps(m) for m in manifest], workers=workers, chunk_size=1))
+        assert [r['id'] for r in rows] == ['ok1', 'missing', 'badflag', 'ok2']
+        assert [r['ok'] for r in rows] == [True, False, False, True]
+        assert 'FileNotFoundError' in rows[1]['error']
+        assert 'mode' in rows[2]['error']
+        assert all(r['elapsed_ms'] >= 0 for r in rows)
+        assert os.path.exists(os.path.join(td, 'o1.psbt')) and os.path.exists(os.path.join(td, 'o4.psbt'))
+
+
+@pytest.mark.skipif(not _psbt_available(), reason='python-bitcointx PSBT API not available')
+def test_cli_finalize_batch_reports_summary(capsys):
+    with tempfile.TemporaryDirectory() as td:
+        src = os.path.join(td, 'in.psbt')
+        _write_psbt(src)
+        manifest = os.path.join(td, 'm.jsonl')
+        with open(manifest, 'wt') as f:
+            f.write(json.dumps({'psbt_in': src, 'psbt_out': os.path.join(td, 'o.psbt'), 'mode': 'provider',
+                                'sig': 'aa' * 64, 'control': 'c0' + '33' * 32, 'tapscript': '51'}) + '\n')
+        out = run_cli(['finalize-batch', '--manifest', manifest])
+    assert json.loads(out)['ok'] is True
+    assert 'finalize-batch: 1 items (0 errors)' in capsys.readouterr().err
+
+
+def test_manifest_lines_may_not_use_stdio_paths():
+    from ssv.batch import create_many, finalize_many
+    base = {'psbt_in': 'in.psbt', 'mode': 'provider', 'sig': 'aa' * 64, 'control': 'c0' + '33' * 32, 'tapscript': '51'}
+    lines = [json.dumps(dict(base, psbt_out='-')), json.dumps(dict(base, psbt_in='-', psbt_out='o.psbt')),
+             json.dumps(dict(base, psbt_out='o.psbt', tx_out='-'))]
+    rows = list(finalize_many(lines))
+    assert [r['ok'] for r in rows] == [False] * 3
+    assert "psbt_out may not be '-'" in rows[0]['error'] and "psbt_in may not be '-'" in rows[1]['error']
+    assert "tx_out may not be '-'" in rows[2]['error']
+    created = list(create_many([json.dumps({'outpoint': 'ab' * 32 + ':0', 'psbt_out': '-'})]))
+    assert created[0]['ok'] is False and "psbt_out may not be '-'" in created[0]['error']
@@ -0,0 +1,126 @@
+import hashlib
+import json
+import os
+import sys
+import tempfile
+
+from typing import List, Sequence
+from ssv.blockscan import _unxor, iter_blk_file, match_witness, scan_block, scan_file, scan_files
+from ssv.cli import main as ssv_main
+from ssv.tapscript import build_tapscript, compactsize
+
+
+def run_cli(argv: Sequence[str]) -> str:
+    old = sys.argv[:]
+    try:
+        sys.argv = ['ssv'] + list(argv)
+        from io import StringIO
+        import contextlib
+        buf = StringIO()
+        with contextlib.redirect_stdout(buf):
+            ssv_main()
+        return buf.getvalue()
+    finally:
+        sys.argv = old
+
+
+S = b'\x42' * 32
+H = hashlib.sha256(S).hexdigest()
+TAPSCRIPT = build_tapscript(H, '11' * 32, 144, '22' * 32)
+CONTROL = b'\xc1' + b'\x33' * 32 + b'\x44' * 32
+P2TR = bytes.fromhex('5120' + '55' * 32)
+
+
+def _tx(prevouts: List[bytes], witnesses: List[List[bytes]]) -> bytes:
+    """Serialize a version-2 tx with one P2TR output (segwit when any witness is set)."""
+    vin = b''.join(p + b'\x00' + b'\xfd\xff\xff\xff' for p in prevouts)
+    body = compactsize(len(prevouts)) + vin + b'\x01' + (1000).to_bytes(8, 'little') + compactsize(len(P2TR)) + P2TR
+    if not any(witnesses):
+        return b'\x02\x00\x00\x00' + body + bytes(4)
+    wit = b''.join(compactsize(len(w)) + b''.join(compactsize(len(x)) + x for x in w) for w in witnesses)
+    return b'\x02\x00\x00\x00\x00\x01' + body + wit + bytes(4)
+
+
+def _txid(prevouts: List[bytes]) -> str:
+    raw = _tx(prevouts, [[] for _ in prevouts])
+    return hashlib.sha256(hashlib.sha256(raw).digest()).digest()[::-1].hex()
+
+
+def _outpoint(i: int) -> bytes:
+    return bytes([i]) * 32 + i.to_bytes(4, 'little')
+
+
+def _block(seed: int) -> bytes:
+    close = [b'\xaa' * 64, S, b'\x01', TAPSCRIPT, CONTROL]
+    liquidate = [b'\xbb' * 64, b'', TAPSCRIPT, CONTROL, b'\x50annex']
+    p2wpkh = [b'\xcc' * 71, b'\x02' + b'\x66' * 32]
+    txs = [
+        _tx([_outpoint(seed)], [[]]),
+        _tx([_outpoint(seed + 1), _outpoint(seed + 2)], [p2wpkh, close]),
+        _tx([_outpoint(seed + 3)], [liquidate]),
+    ]
+    return bytes([seed]) * 80 + compactsize(len(txs)) + b''.join(txs)
+
+
+def test_scan_block_finds_close_and_liquidate():
+    n_tx, rows = scan_block(_block(1))
+    assert n_tx == 3
+    assert [(r['txid'], r['vin'], r['branch']) for r in rows] == [
+        (_txid([_outpoint(2), _outpoint(3)]), 1, 'close'),
+        (_txid([_outpoint(4)]), 0, 'liquidate'),
+    ]
+    close, liq = rows
+    assert close['preimage'] == S.hex() and close['preimage_ok'] is True
+    assert close['prevout'] == f"{'03' * 32}:3"
+    assert (close['hash_h'], close['csv_blocks'], close['provider_pk']) == (H, 144, '22' * 32)
+    assert close['internal_key'] == '33' * 32
+    assert liq['preimage'] is None and liq['preimage_ok'] is None
+    assert close['block'] == hashlib.sha256(hashlib.sha256(b'\x01' * 80).digest()).digest()[::-1].hex()
+
+
+def test_match_witness_rejects_other_scripts():
+    assert match_witness([b'\xaa' * 64, b'\x51', CONTROL]) is None
+    assert match_witness([b'\xaa' * 64, b'\x01', TAPSCRIPT, b'\xc2' + CONTROL[1:]]) is None
+    odd = match_witness([b'\xaa' * 64, TAPSCRIPT, CONTROL])
+    assert odd is not None and odd['branch'] is None
+
+
+def test_blk_files_with_xor_and_cli_sharding():
+    magic = bytes.fromhex('fabfb5da')
+    with tempfile.TemporaryDirectory() as td:
+        plain_dir = os.path.join(td, 'plain')
+        xor_dir = os.path.join(td, 'xor')
+        os.makedirs(plain_dir)
+        os.makedirs(xor_dir)
+        key = bytes(range(1, 9))
+        with open(os.path.join(xor_dir, 'xor.dat'), 'wb') as f:
+            f.write(key)
+        for n in range(2):
+            data = b''.join(magic + len(b).to_bytes(4, 'little') + b for b in (_block(10 * n + 1), _block(10 * n + 5)))
+            with open(os.path.join(plain_dir, f'blk0000{n}.dat'), 'wb') as f:
+                f.write(data + bytes(64))  # preallocated zero padding
+            with open(os.path.join(xor_dir, f'blk0000{n}.dat'), 'wb') as f:
+                f.write(_unxor(data, key, 0))
+        assert list(iter_blk_file(os.path.join(xor_dir, 'blk00001.dat'))) == [_block(11), _block(15)]
+        per_block = list(scan_file(os.path.join(plain_dir, 'blk00000.dat')))
+        assert [(r.blocks, r.txs, len(r.rows), r.error) for r in per_block] == [(1, 3, 2, None)] * 2
+        xor_paths = [os.path.join(xor_dir, f'blk0000{n}.dat') for n in range(2)]
+        batched = list(scan_files(xor_paths, workers=2, batch_blocks=1))
+        assert [r.rows for r in batched] == [r.rows for p in xor_paths for r in scan_file(p)]
+
+        out = os.path.join(td, 'rows.jsonl')
+        run_cli(['scan-blocks', plain_dir, '--out', out])
+        rows = [json.loads(line) for line in open(out)]
+        run_cli(['scan-blocks', xor_dir, '--out', out, '--workers', '2'])
+        assert [json.loads(line) for line in open(out)] == rows
+        assert len(rows) == 8 and all(r['preimage_ok'] for r in rows if r['branch'] == 'close')
+
+        hex_path = os.path.join(td, 'blocks.hex')
+        with open(hex_path, 'wt') as f:
+            f.write(_block(1).hex() + '\n\n' + _block(5).hex()[:-2] + '\n')
+        printed = run_cli(['scan-blocks', '--format', 'hex', hex_path])
+        pooled = list(scan_files([hex_path], fmt='hex', workers=2, batch_blocks=1))
+    assert [(r.blocks, r.error) for r in pooled] == [(1, None), (0, 'block 1: truncated block')]
+    hex_rows = [json.loads(line) for line in printed.splitlines()]
+    assert hex_rows[:2] == rows[:2]
+    assert hex_rows[-1]['ok'] is False and 'block 1: truncated block' in hex_rows[-1]['error']
@@ -0,0 +1,107 @@
+import importlib
+import json
+import os
+import sys
+import tempfile
+
+import pytest
+
+from typing import Sequence
+from ssv.cli import main as ssv_main
+from ssv.psbtio import combine, combine_by_txid, parse_maps, serialize_maps, unsigned_txid
+
+
+def _psbt_available() -> bool:
+    try:
+        m = importlib.import_module('bitcointx.core.psbt')
+        return any(hasattr(m, attr) for attr in ('PSBT', 'PartiallySignedTransaction'))
+    except Exception:
+        return False
+
+
+def run_cli(argv: Sequence[str]) -> str:
+    old = sys.argv[:]
+    try:
+        sys.argv = ['ssv'] + list(argv)
+        from io import StringIO
+        import contextlib
+        buf = StringIO()
+        with contextlib.redirect_stdout(buf):
+            ssv_main()
+        return buf.getvalue()
+    finally:
+        sys.argv = old
+
+
+def _base(vout: int = 0) -> bytes:
+    psbt_mod = importlib.import_module('bitcointx.core.psbt')
+    PSBT = getattr(psbt_mod, 'PSBT', getattr(psbt_mod, 'PartiallySignedTransaction'))
+    core = importlib.import_module('bitcointx.core')
+    spk = core.script.CScript(bytes.fromhex('5120' + '11' * 32))
+    tx = core.CTransaction([core.CTxIn(core.COutPoint(core.lx('00' * 32), vout))], [core.CTxOut(5000, spk)], nVersion=2)
+    psbt = PSBT(unsigned_tx=tx)
+    psbt.set_utxo(core.CTxOut(10000, spk), 0)
+    return psbt.serialize()
+
+
+# PSBT_IN_TAP_SCRIPT_SIG: 0x14 || xonly || leaf hash  ->  64-byte signature
+def _with_script_sig(raw: bytes, xonly_byte: int, sig_byte: int) -> bytes:
+    maps = parse_maps(raw)
+    maps.inputs[0][b'\x14' + bytes([xonly_byte]) * 32 + b'\x55' * 32] = bytes([sig_byte]) * 64
+    return serialize_maps(maps)
+
+
+@pytest.mark.skipif(not _psbt_available(), reason='python-bitcointx PSBT API not available')
+def test_combine_merges_partial_copies():
+    base = _base()
+    borrower = _with_script_sig(base, 0x11, 0xaa)
+    provider = _with_script_sig(base, 0x22, 0xbb)
+    out = combine([borrower, provider.hex().encode(), borrower])
+    keys = [k for k in parse_maps(out).inputs[0] if k[0] == 0x14]
+    assert sorted(k[1] for k in keys) == [0x11, 0x22]
+    assert parse_maps(out).globals == parse_maps(base).globals
+    psbt_mod = importlib.import_module('bitcointx.core.psbt')
+    getattr(psbt_mod, 'PartiallySignedTransaction').deserialize(out)  # still a valid PSBT
+    with pytest.raises(ValueError, match='PSBT 1: conflicting values for input 0 key 14'):
+        combine([borrower, _with_script_sig(base, 0x11, 0xcc)])
+    with pytest.raises(ValueError, match='different unsigned transactions'):
+        combine([base, _base(1)])
+
+
+@pytest.mark.skipif(not _psbt_available(), reason='python-bitcointx PSBT API not available')
+def test_combine_by_txid_groups_and_isolates_conflicts():
+    a, b = _base(0), _base(1)
+    groups = combine_by_txid([
+        _with_script_sig(a, 0x11, 0xaa), _with_script_sig(b, 0x11, 0xaa), b'junk',
+        _with_script_sig(a, 0x22, 0xbb), _with_script_sig(b, 0x11, 0xcc),
+    ])
+    assert [(g.txid, g.count, g.error is None) for g in groups] == [
+        (unsigned_txid(a), 2, True), (unsigned_txid(b), 2, False), (None, 1, False)]
+    assert len([k for k in parse_maps(groups[0].psbt).inputs[0] if k[0] == 0x14]) == 2
+    assert 'conflicting' in groups[1].error and 'PSBT 2' in groups[2].error
+
+
+@pytest.mark.skipif(not _psbt_available(), reason='python-bitcointx PSBT API not available')
+def test_cli_combine_single_and_batch():
+    a, b = _base(0), _base(1)
+    with tempfile.TemporaryDirectory() as td:
+        paths = []
+        for n, raw in enumerate([_with_script_sig(a, 0x11, 0xaa), _with_script_sig(a, 0x22, 0xbb),
+                                 _with_script_sig(b, 0x11, 0xaa)]):
+            p = os.path.join(td, f'{n}.psbt')
+            with open(p, 'wb') as f:
+                f.write(raw)
+            paths.append(p)
+        out = os.path.join(td, 'out.psbt')
+        run_cli(['combine', '--psbt-in', paths[0], '--psbt-in', paths[1], '--psbt-out', out, '--format', 'binary'])
+        with open(out, 'rb') as f:
+            assert len([k for k in parse_maps(f.read()).inputs[0] if k[0] == 0x14]) == 2
+        listing = os.path.join(td, 'list.txt')
+        with open(listing, 'wt') as f:
+            f.write('\n'.join(paths + [os.path.join(td, 'missing.psbt')]) + '\n')
+        rows = [json.loads(line) for line in run_cli(['combine', '--batch', '--from-list', listing,
+                                                      '--out-dir', os.path.join(td, 'merged')]).splitlines()]
+        assert [(r.get('txid'), r.get('count'), r['ok']) for r in rows[:2]] == [
+            (unsigned_txid(a), 2, True), (unsigned_txid(b), 1, True)]
+        assert rows[2]['ok'] is False and rows[2]['path'].endswith('missing.psbt')
+        assert os.path.exists(os.path.join(td, 'merged', unsigned_txid(a) + '.psbt'))
@@ -0,0 +1,119 @@
+import importlib
+import json
+import os
+import sys
+import tempfile
+
+import pytest
+
+from typing import Sequence
+from ssv.cli import main as ssv_main
+from ssv.psbtcreate import BORROWER_SEQUENCE, create_from_spec
+from ssv.psbtio import parse_maps
+
+
+def _psbt_available() -> bool:
+    try:
+        m = importlib.import_module('bitcointx.core.psbt')
+        return any(hasattr(m, attr) for attr in ('PSBT', 'PartiallySignedTransaction'))
+    except Exception:
+        return False
+
+
+def run_cli(argv: Sequence[str]) -> str:
+    old = sys.argv[:]
+    try:
+        sys.argv = ['ssv'] + list(argv)
+        from io import StringIO
+        import contextlib
+        buf = StringIO()
+        with contextlib.redirect_stdout(buf):
+            ssv_main()
+        return buf.getvalue()
+    finally:
+        sys.argv = old
+
+
+INTERNAL = '79be667ef9dcbbac55a06295ce870b07029bfcdb2dce28d959f2815b16f81798'
+SPEC = {
+    'outpoint': 'ab' * 32 + ':1', 'amount': 100000, 'mode': 'provider',
+    'hash_h': '00' * 32, 'borrower_pk': '11' * 32, 'csv_blocks': 144, 'provider_pk': '22' * 32,
+    'internal_key': INTERNAL, 'output': ['0014' + '33' * 20 + ':90000'], 'anchor': ['5120' + '44' * 32 + ':330'],
+    'opret': ['cafe'],
+}
+
+
+def _tapscript() -> bytes:
+    from ssv.tapscript import build_tapscript
+    return build_tapscript('00' * 32, '11' * 32, 144, '22' * 32)
+
+
+@pytest.mark.skipif(not _psbt_available(), reason='python-bitcointx PSBT API not available')
+def test_create_provider_psbt_fields():
+    from bitcointx.core.psbt import PartiallySignedTransaction as PSBT
+    from ssv.taproot import compute_output_key, scriptpubkey_from_xonly
+    from ssv.tapscript import tapleaf_hash_tagged
+    from ssv.verify import verify_taproot_path
+    created = create_from_spec(SPEC)
+    psbt = PSBT.deserialize(created.psbt)
+    tx = psbt.unsigned_tx
+    assert tx.nVersion == 2 and tx.vin[0].nSequence == 144 == created.n_sequence
+    assert tx.vin[0].prevout.n == 1 and tx.vin[0].prevout.hash == bytes.fromhex('ab' * 32)
+    assert [o.nValue for o in tx.vout] == [90000, 330, 0]
+    assert bytes(tx.vout[2].scriptPubKey) == bytes.fromhex('6a02cafe')
+    qx, _parity = compute_output_key(bytes.fromhex(INTERNAL), tapleaf_hash_tagged(_tapscript()), [])
+    spk = scriptpubkey_from_xonly(qx)
+    assert bytes(psbt.inputs[0].witness_utxo.scriptPubKey) == spk and created.vault_spk == spk.hex()
+    assert psbt.inputs[0].witness_utxo.nValue == 100000
+    leaf_keys = [k for k in parse_maps(created.psbt).inputs[0] if k[0] == 0x15]
+    assert len(leaf_keys) == 1
+    assert parse_maps(created.psbt).inputs[0][leaf_keys[0]] == _tapscript() + b'\xc0'
+    assert verify_taproot_path(_tapscript().hex(), leaf_keys[0][1:].hex(), created.vault_spk)['ok'] is True
+
+
+def test_create_borrower_sequence_and_errors():
+    created = create_from_spec(dict(SPEC, mode='borrower'))
+    assert created.n_sequence == BORROWER_SEQUENCE
+    with pytest.raises(ValueError, match='exceed the vault amount'):
+        create_from_spec(dict(SPEC, amount=1000))
+    with pytest.raises(ValueError, match='--control or --internal-key'):
+        create_from_spec(dict(SPEC, internal_key=None))
+    with pytest.raises(ValueError, match='TXID:VOUT'):
+        create_from_spec(dict(SPEC, outpoint='ab' * 32))
+
+
+@pytest.mark.skipif(not _psbt_available(), reason='python-bitcointx PSBT API not available')
+def test_create_psbt_cli_then_finalize():
+    from ssv.psbtio import load_psbt_from_file
+    with tempfile.TemporaryDirectory() as td:
+        p = os.path.join(td, 'close.psbt')
+        tx_out = os.path.join(td, 'tx.hex')
+        out = run_cli(['create-psbt', '--outpoint', SPEC['outpoint'], '--amount', '100000', '--mode', 'provider',
+                       '--hash-h', '00' * 32, '--borrower-pk', '11' * 32, '--csv-blocks', '144',
+                       '--provider-pk', '22' * 32, '--internal-key', INTERNAL,
+                       '--output', SPEC['output'][0], '--psbt-out', p, '--format', 'binary', '--json'])
+        info = json.loads(out)
+        assert load_psbt_from_file(p).unsigned_tx.vin[0].nSequence == info['n_sequence'] == 144
+        control = next(k for k in parse_maps(open(p, 'rb').read()).inputs[0] if k[0] == 0x15)[1:]
+        run_cli(['finalize', '--psbt-in', p, '--psbt-out', p, '--mode', 'provider', '--sig', 'aa' * 64,
+                 '--hash-h', '00' * 32, '--borrower-pk', '11' * 32, '--csv-blocks', '144', '--provider-pk', '22' * 32,
+                 '--control', control.hex(), '--tx-out', tx_out])
+        with open(tx_out) as f:
+            raw = f.read().strip()
+    assert raw.startswith('020000000001') and info['txid'] in out
+
+
+def test_create_psbt_manifest():
+    with tempfile.TemporaryDirectory() as td:
+        manifest = os.path.join(td, 'm.jsonl')
+        rows_path = os.path.join(td, 'rows.jsonl')
+        with open(manifest, 'wt') as f:
+            f.write(json.dumps(dict(SPEC, id='a', psbt_out=os.path.join(td, 'a.psbt'))) + '\n')
+            f.write(json.dumps(dict(SPEC, id='b', amount=5)) + '\n')
+            f.write(json.dumps(dict(SPEC, id='c', outpoint='cd' * 32 + ':0')) + '\n')
+        run_cli(['create-psbt', '--manifest', manifest, '--out', rows_path, '--chunk-size', '2'])
+        rows = [json.loads(line) for line in open(rows_path)]
+        assert os.path.exists(os.path.join(td, 'a.psbt'))
+    assert [(r['line'], r['id'], r['ok']) for r in rows] == [(1, 'a', True), (2, 'b', False), (3, 'c', True)]
+    assert 'exceed the vault amount' in rows[1]['error']
+    assert rows[2]['psbt'].startswith('cHNidP') and rows[0]['txid'] != rows[2]['txid']
@@ -0,0 +1,132 @@
+import importlib
+import json
+import os
+import sys
+import tempfile
+
+import pytest
+
+from typing import Sequence
+from ssv.cli import main as ssv_main
+from ssv.estimate import estimate_psbt, estimate_spend, fee_for, witness_size
+from ssv.psbtcreate import create_from_spec
+from ssv.tapscript import build_tapscript
+from ssv.witness import Branch, build_witness
+
+
+def _psbt_available() -> bool:
+    try:
+        m = importlib.import_module('bitcointx.core.psbt')
+        return any(hasattr(m, attr) for attr in ('PSBT', 'PartiallySignedTransaction'))
+    except Exception:
+        return False
+
+
+def run_cli(argv: Sequence[str]) -> str:
+    old = sys.argv[:]
+    try:
+        sys.argv = ['ssv'] + list(argv)
+        from io import StringIO
+        import contextlib
+        buf = StringIO()
+        with contextlib.redirect_stdout(buf):
+            ssv_main()
+        return buf.getvalue()
+    finally:
+        sys.argv = old
+
+
+INTERNAL = '79be667ef9dcbbac55a06295ce870b07029bfcdb2dce28d959f2815b16f81798'
+POLICY = {'hash_h': '00' * 32, 'borrower_pk': '11' * 32, 'csv_blocks': 144, 'provider_pk': '22' * 32}
+
+
+def _serialized_witness(stack) -> int:
+    from ssv.tapscript import compactsize
+    return len(compactsize(len(stack))) + sum(len(compactsize(len(x))) + len(x) for x in stack)
+
+
+def test_witness_size_follows_build_witness_layout():
+    script = build_tapscript(POLICY['hash_h'], POLICY['borrower_pk'], 144, POLICY['provider_pk'])
+    for sig_len in (64, 65):
+        for depth in (0, 1, 7):
+            control = b'\xc0' + b'\x01' * (32 + 32 * depth)
+            close = build_witness(Branch.CLOSE, b'\x00' * sig_len, script, control, preimage=b'\x00' * 32)
+            liq = build_witness(Branch.LIQUIDATE, b'\x00' * sig_len, script, control)
+            assert witness_size(Branch.CLOSE, len(script), len(control), sig_len=sig_len) == _serialized_witness(close)
+            assert witness_size(Branch.LIQUIDATE, len(script), len(control), sig_len=sig_len) == _serialized_witness(liq)
+    est = estimate_spend(100, Branch.LIQUIDATE, len(script), 33, feerate='1.1')
+    assert est.weight == 402 + est.witness_bytes and est.vsize == -(-est.weight // 4)
+    assert fee_for(153, '1.1') == 169 and fee_for(100, 2.3) == 230 and fee_for(7, 0) == 0
+    with pytest.raises(ValueError, match='feerate'):
+        fee_for(100, '-1')
+    with pytest.raises(ValueError, match='signature must be 64'):
+        witness_size(Branch.CLOSE, len(script), 33, sig_len=63)
+
+
+def test_estimate_psbt_and_batch_cli():
+    spec = dict(POLICY, outpoint='ab' * 32 + ':0', amount=10000, mode='provider', internal_key=INTERNAL,
+                output=['0014' + '33' * 20 + ':9000'])
+    created = create_from_spec(spec)
+    res = estimate_psbt(created.psbt, feerate=2)
+    assert res['txid'] == created.txid and set(res) >= {'close', 'liquidate'}
+    assert res['close']['witness_bytes'] - res['liquidate']['witness_bytes'] == 33  # preimage push
+    assert res['liquidate']['fee'] == 2 * res['liquidate']['vsize']
+    with tempfile.TemporaryDirectory() as td:
+        p = os.path.join(td, 'in.psbt')
+        with open(p, 'wb') as f:
+            f.write(created.psbt)
+        one = json.loads(run_cli(['estimate', '--psbt-in', p, '--mode', 'provider', '--feerate', '2']))
+        assert one['liquidate'] == res['liquidate'] and 'close' not in one
+        manifest = os.path.join(td, 'm.jsonl')
+        with open(manifest, 'wt') as f:
+            f.write(json.dumps({'id': 'a', 'psbt_in': p, 'feerate': 2}) + '\n')
+            f.write(json.dumps({'id': 'b', 'psbt_in': os.path.join(td, 'missing.psbt')}) + '\n')
+        rows = [json.loads(line) for line in run_cli(['estimate', '--manifest', manifest, '--workers', '2']).splitlines()]
+    assert rows[0]['ok'] is True and rows[0]['close'] == res['close'] and rows[0]['id'] == 'a'
+    assert rows[1]['ok'] is False and rows[1]['line'] == 2
+
+
+def test_estimate_counts_final_scriptsig_of_other_inputs():
+    from ssv.psbtio import parse_maps, serialize_maps
+    from ssv.tapscript import compactsize
+    spec = dict(POLICY, outpoint='ab' * 32 + ':0', amount=10000, mode='provider', internal_key=INTERNAL,
+                output=['0014' + '33' * 20 + ':9000'])
+    maps = parse_maps(create_from_spec(spec).psbt)
+    unsigned = maps.globals[b'\x00']
+    extra = [bytes([i]) * 32 + b'\x00' * 4 + b'\x00' + b'\xff' * 4 for i in (1, 2)]
+    # splice two more inputs (empty scriptSigs) into the unsigned tx
+    tx = unsigned[:4] + bytes([3]) + unsigned[5:5 + 41] + b''.join(extra) + unsigned[5 + 41:]
+    nested = b'\x16' + b'\x00\x14' + b'\x55' * 20  # 23-byte P2SH-P2WPKH scriptSig
+    witness = compactsize(2) + compactsize(71) + b'\x01' * 71 + compactsize(33) + b'\x02' * 33
+    legacy = b'\x48' + b'\x03' * 72 + b'\x21' + b'\x04' * 33
+    psbt = serialize_maps(maps._replace(globals=maps.globals | {b'\x00': tx},
+                                        inputs=[maps.inputs[0], {b'\x07': nested, b'\x08': witness}, {b'\x07': legacy}]))
+    res = estimate_psbt(psbt, modes=('provider',))
+    assert res['non_witness_size'] == len(tx) + 23 + 107
+    wit = res['liquidate']['witness_bytes']
+    assert res['liquidate']['weight'] == 4 * res['non_witness_size'] + 2 + wit + len(witness) + 1
+    with pytest.raises(ValueError, match='input 2 is not finalized'):
+        estimate_psbt(serialize_maps(maps._replace(globals=maps.globals | {b'\x00': tx},
+                                                   inputs=[maps.inputs[0], {b'\x08': witness}, {}])))
+
+
+@pytest.mark.skipif(not _psbt_available(), reason='python-bitcointx PSBT API not available')
+def test_estimate_matches_finalized_tx():
+    for mode, branch, extra in (('borrower', 'close', ['--preimage', '00' * 32]), ('provider', 'liquidate', [])):
+        spec = dict(POLICY, outpoint='ab' * 32 + ':0', amount=10000, mode=mode, internal_key=INTERNAL,
+                    output=['0014' + '33' * 20 + ':9000'])
+        created = create_from_spec(spec)
+        with tempfile.TemporaryDirectory() as td:
+            p = os.path.join(td, 'in.psbt')
+            with open(p, 'wb') as f:
+                f.write(created.psbt)
+            tx_out = os.path.join(td, 'tx.hex')
+            run_cli(['finalize', '--psbt-in', p, '--psbt-out', os.path.join(td, 'out.psbt'), '--tx-out', tx_out,
+                     '--mode', mode, '--sig', 'aa' * 65, '--hash-h', POLICY['hash_h'],
+                     '--borrower-pk', POLICY['borrower_pk'], '--csv-blocks', '144',
+                     '--provider-pk', POLICY['provider_pk'], '--control', 'c0' + INTERNAL] + extra)
+            with open(tx_out) as f:
+                raw = bytes.fromhex(f.read().strip())
+            res = estimate_psbt(created.psbt, modes=(mode,), sig_len=65)
+        stripped = res['non_witness_size']
+        assert res[branch]['weight'] == 4 * stripped + (len(raw) - stripped)
@@ -0,0 +1,237 @@
+import importlib
+import json
+import os
+import tempfile
+
+import pytest
+
+from typing import Sequence
+from ssv.cli import main as ssv_main
+
+
+def _psbt_available() -> bool:
+    try:
+        m = importlib.import_module('bitcointx.core.psbt')
+        return any(hasattr(m, attr) for attr in ('PSBT', 'PartiallySignedTransaction'))
+    except Exception:
+        return False
+
+
+def run_cli(argv: Sequence[str]) -> str:
+    import sys
+    old = sys.argv[:]
+    try:
+        sys.argv = ['ssv'] + list(argv)
+        from io import StringIO
+        import contextlib
+        buf = StringIO()
+        with contextlib.redirect_stdout(buf):
+            ssv_main()
+        return buf.getvalue()
+    finally:
+        sys.argv = old
+
+
+def _two_input_psbt():
+    psbt_mod = importlib.import_module('bitcointx.core.psbt')
+    PSBT = getattr(psbt_mod, 'PSBT', getattr(psbt_mod, 'PartiallySignedTransaction'))
+    core = importlib.import_module('bitcointx.core')
+    CScript = core.script.CScript
+    spk = bytes.fromhex('5120' + '11' * 32)
+    tx = core.CTransaction(
+        [core.CTxIn(core.COutPoint(core.lx('00' * 32), 0)), core.CTxIn(core.COutPoint(core.lx('00' * 32), 1))],
+        [core.CTxOut(5000, CScript(spk))],
+        2,
+    )
+    psbt = PSBT(unsigned_tx=tx)
+    for i in range(2):
+        psbt.set_utxo(core.CTxOut(10000, CScript(spk)), i)
+    return PSBT, psbt
+
+
+def _witness(psbt, i):
+    pi = psbt.inputs[i]
+    w = getattr(pi, 'final_script_witness', None) or getattr(pi, 'final_scriptwitness', None)
+    return [bytes(x) for x in w.stack]
+
+
+POLICY = {'hash_h': '00' * 32, 'borrower_pk': '11' * 32, 'csv_blocks': 5, 'provider_pk': '22' * 32}
+
+
+@pytest.mark.skipif(not _psbt_available(), reason='python-bitcointx PSBT API not available')
+def test_finalize_spec_finalizes_all_inputs_in_one_pass():
+    from ssv.tapscript import build_tapscript
+    PSBT, psbt = _two_input_psbt()
+    taps = build_tapscript('00' * 32, '11' * 32, 5, '22' * 32)
+    ctrl = 'c0' + '33' * 32
+    spec = [
+        dict(POLICY, input_index=0, mode='borrower', sig='aa' * 64, preimage='bb' * 32, control=ctrl),
+        {'input-index': 1, 'mode': 'provider', 'sig': 'cc' * 65, 'tapscript': taps.hex(), 'control': ctrl},
+    ]
+    with tempfile.TemporaryDirectory() as td:
+        p = os.path.join(td, 't.psbt')
+        out = os.path.join(td, 'out.psbt')
+        sp = os.path.join(td, 'spec.json')
+        with open(p, 'wt') as f:
+            f.write(psbt.to_base64())
+        with open(sp, 'wt') as f:
+            json.dump(spec, f)
+        run_cli(['finalize', '--psbt-in', p, '--psbt-out', out, '--spec', sp])
+        with open(out) as f:
+            done = PSBT.from_base64(f.read())
+    assert _witness(done, 0) == [b'\xaa' * 64, b'\xbb' * 32, b'\x01', taps, bytes.fromhex(ctrl)]
+    assert _witness(done, 1) == [b'\xcc' * 65, b'\x00', taps, bytes.fromhex(ctrl)]
+
+
+@pytest.mark.skipif(not _psbt_available(), reason='python-bitcointx PSBT API not available')
+def test_finalize_spec_rejects_bad_entry_before_writing():
+    _PSBT, psbt = _two_input_psbt()
+    spec = [
+        dict(POLICY, input_index=0, mode='provider', sig='aa' * 64, control='c0' + '33' * 32),
+        dict(POLICY, input_index=1, mode='borrower', sig='aa' * 64, control='c0' + '33' * 32),  # no preimage
+    ]
+    with tempfile.TemporaryDirectory() as td:
+        p = os.path.join(td, 't.psbt')
+        out = os.path.join(td, 'out.psbt')
+        sp = os.path.join(td, 'spec.json')
+        with open(p, 'wt') as f:
+            f.write(psbt.to_base64())
+        with open(sp, 'wt') as f:
+            json.dump(spec, f)
+        with pytest.raises(ValueError, match='spec entry 1 .*preimage'):
+            run_cli(['finalize', '--psbt-in', p, '--psbt-out', out, '--spec', sp])
+        assert not os.path.exists(out)
+        spec[1] = dict(spec[0])
+        with open(sp, 'wt') as f:
+            json.dump(spec, f)
+        with pytest.raises(ValueError, match='only once'):
+            run_cli(['finalize', '--psbt-in', p, '--psbt-out', out, '--spec', sp])
+        with pytest.raises(ValueError, match='--sig, --control cannot be combined with --spec'):
+            run_cli(['finalize', '--psbt-in', p, '--psbt-out', out, '--spec', sp, '--sig', 'bb' * 64,
+                     '--control', 'c0' + '33' * 32])
+        spec[1] = dict(spec[0], input_index=None)
+        with open(sp, 'wt') as f:
+            json.dump(spec, f)
+        with pytest.raises(ValueError, match='spec entry 1: input_index must be an integer'):
+            run_cli(['finalize', '--psbt-in', p, '--psbt-out', out, '--spec', sp])
+
+
+@pytest.mark.skipif(not _psbt_available(), reason='python-bitcointx PSBT API not available')
+def test_finalize_single_input_sets_witness():
+    PSBT, psbt = _two_input_psbt()
+    with tempfile.TemporaryDirectory() as td:
+        p = os.path.join(td, 't.psbt')
+        out = os.path.join(td, 'out.psbt')
+        with open(p, 'wt') as f:
+            f.write(psbt.to_base64())
+        run_cli(['finalize', '--mode', 'provider', '--psbt-in', p, '--psbt-out', out, '--input-index', '1',
+                 '--sig', 'aa' * 64, '--control', 'c0' + '33' * 32, '--tapscript', '51'])
+        with open(out) as f:
+            done = PSBT.from_base64(f.read())
+    assert _witness(done, 1) == [b'\xaa' * 64, b'\x00', b'\x51', bytes.fromhex('c0' + '33' * 32)]
+
+
+@pytest.mark.skipif(not _psbt_available(), reason='python-bitcointx PSBT API not available')
+def test_finalize_streams_stdin_to_stdout_binary():
+    import subprocess
+    import sys
+    PSBT, psbt = _two_input_psbt()
+    src = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src'))
+    env = dict(os.environ, PYTHONPATH=src)
+    out = subprocess.run(
+        [sys.executable, '-m', 'ssv.cli', 'finalize', '--psbt-in', '-', '--psbt-out', '-', '--format', 'binary',
+         '--mode', 'provider', '--sig', 'aa' * 64, '--control', 'c0' + '33' * 32, '--tapscript', '51'],
+        input=psbt.to_base64().encode(), env=env, capture_output=True,
+    )
+    assert out.returncode == 0, out.stderr
+    assert out.stdout.startswith(b'psbt\xff')
+    assert _witness(PSBT.deserialize(out.stdout), 0)[0] == bytes.fromhex('aa' * 64)
+    with tempfile.TemporaryDirectory() as td:
+        p = os.path.join(td, 'in.psbt')
+        with open(p, 'wb') as f:
+            f.write(out.stdout)
+        with pytest.raises(ValueError, match='only one of'):
+            run_cli(['finalize', '--psbt-in', p, '--psbt-out', '-', '--tx-out', '-',
+                     '--mode', 'provider', '--sig', 'aa' * 64, '--control', 'c0' + '33' * 32, '--tapscript', '51'])
+        hex_out = run_cli(['finalize', '--psbt-in', p, '--psbt-out', '-', '--format', 'hex', '--input-index', '1',
+                           '--mode', 'provider', '--sig', 'bb' * 64, '--control', 'c0' + '33' * 32, '--tapscript', '51'])
+    assert hex_out.startswith('70736274ff')
+
+
+@pytest.mark.skipif(not _psbt_available(), reason='python-bitcointx PSBT API not available')
+def test_finalize_tx_out_splices_witnesses(capsys):
+    core = importlib.import_module('bitcointx.core')
+    PSBT, psbt = _two_input_psbt()
+    with tempfile.TemporaryDirectory() as td:
+        src = os.path.join(td, 'in.psbt')
+        with open(src, 'wt') as f:
+            f.write(psbt.to_base64())
+        spec = os.path.join(td, 'spec.json')
+        with open(spec, 'wt') as f:
+            json.dump([dict(POLICY, input_index=i, mode='provider', sig=f'{i + 1:02x}' * 64, control='c0' + '33' * 32)
+                       for i in range(2)], f)
+        out, tx_out = os.path.join(td, 'out.psbt'), os.path.join(td, 'tx.hex')
+        run_cli(['finalize', '--psbt-in', src, '--psbt-out', out, '--spec', spec, '--tx-out', tx_out])
+        with open(tx_out) as f:
+            raw = bytes.fromhex(f.read())
+        final = PSBT.from_base64(open(out).read())
+        partial_tx = os.path.join(td, 'partial.hex')
+        run_cli(['finalize', '--psbt-in', src, '--psbt-out', out, '--mode', 'provider', '--sig', 'aa' * 64,
+                 '--control', 'c0' + '33' * 32, '--tapscript', '51', '--tx-out', partial_tx])
+        assert not os.path.exists(partial_tx)
+    tx = core.CTransaction.deserialize(raw)
+    assert tx.serialize() == raw and raw[4:6] == b'\x00\x01'
+    for i in range(2):
+        assert [bytes(x) for x in tx.wit.vtxinwit[i].scriptWitness.stack] == _witness(final, i)
+    err = capsys.readouterr().err
+    assert f'txid {core.b2lx(tx.GetTxid())} ' in err
+    assert 'input 1 is not finalized' in err
+
+
+def test_extract_tx_layout():
+    import hashlib
+    from ssv.psbtio import extract_tx
+    unsigned = (bytes.fromhex('02000000') + b'\x01' + b'\x11' * 32 + b'\x00' * 4 + b'\x00' + b'\xff' * 4
+                + b'\x01' + (1000).to_bytes(8, 'little') + b'\x01\x51' + b'\x00' * 4)
+    tx = extract_tx(unsigned, [[b'\xaa' * 3, b'']])
+    assert tx.raw == unsigned[:4] + b'\x00\x01' + unsigned[4:-4] + b'\x02\x03' + b'\xaa' * 3 + b'\x00' + unsigned[-4:]
+    assert tx.txid == hashlib.sha256(hashlib.sha256(unsigned).digest()).digest()[::-1].hex()
+    assert tx.wtxid != tx.txid
+    assert extract_tx(unsigned, [None]).raw == unsigned
+    legacy = extract_tx(unsigned, [None], [b'\x51'])
+    assert legacy.raw == unsigned[:41] + b'\x01\x51' + unsigned[42:]
+    assert legacy.txid == hashlib.sha256(hashlib.sha256(legacy.raw).digest()).digest()[::-1].hex()
+    with pytest.raises(ValueError, match='expected 1 witness'):
+        extract_tx(unsigned, [])
+
+
+@pytest.mark.skipif(not _psbt_available(), reason='python-bitcointx PSBT API not available')
+def test_tx_out_keeps_final_script_sigs_of_other_inputs(capsys):
+    psbt_mod = importlib.import_module('bitcointx.core.psbt')
+    PSBT = getattr(psbt_mod, 'PSBT', getattr(psbt_mod, 'PartiallySignedTransaction'))
+    core = importlib.import_module('bitcointx.core')
+    CScript, CScriptWitness = core.script.CScript, core.script.CScriptWitness
+    p2pkh = CScript(bytes.fromhex('76a914' + '66' * 20 + '88ac'))
+    prev = core.CTransaction([core.CTxIn(core.COutPoint(core.lx('77' * 32), 0))], [core.CTxOut(3000, p2pkh)] * 3, 2)
+    tx = core.CTransaction([core.CTxIn(core.COutPoint(core.lx(f'{i:02x}' * 32), i)) for i in range(2)]
+                           + [core.CTxIn(core.COutPoint(prev.GetTxid(), 2))],
+                           [core.CTxOut(5000, CScript(bytes.fromhex('0014' + '44' * 20)))], 2)
+    psbt = PSBT(unsigned_tx=tx)
+    psbt.set_utxo(core.CTxOut(10000, CScript(bytes.fromhex('5120' + '11' * 32))), 0)
+    psbt.set_utxo(core.CTxOut(3000, CScript(bytes.fromhex('a914' + '88' * 20 + '87'))), 1)
+    psbt.set_utxo(prev, 2)
+    nested = psbt.inputs[1]  # P2SH-P2WPKH: scriptSig plus witness
+    nested.final_script_sig = b'\x16\x00\x14' + b'\x55' * 20
+    nested.final_script_witness = CScriptWitness([b'\x30' * 71, b'\x02' * 33])
+    psbt.inputs[2].final_script_sig = b'\x48' + b'\x30' * 72 + b'\x21' + b'\x03' * 33  # legacy: scriptSig only
+    with tempfile.TemporaryDirectory() as td:
+        src, out, tx_out = (os.path.join(td, n) for n in ('in.psbt', 'out.psbt', 'tx.hex'))
+        with open(src, 'wt') as f:
+            f.write(psbt.to_base64())
+        run_cli(['finalize', '--psbt-in', src, '--psbt-out', out, '--mode', 'provider', '--sig', 'aa' * 64,
+                 '--tapscript', '51', '--control', 'c0' + '33' * 32, '--tx-out', tx_out])
+        with open(tx_out) as f:
+            raw = bytes.fromhex(f.read())
+        expected = PSBT.from_base64(open(out).read()).extract_transaction()
+    assert raw == expected.serialize()
+    assert f'txid {core.b2lx(expected.GetTxid())} ' in capsys.readouterr().err
@@ -0,0 +1,183 @@
+import json
+import os
+import sys
+import tempfile
+import importlib
+
+import pytest
+
+from typing import Sequence
+from ssv.cli import main as ssv_main
+from ssv.guards import (
+    anchor_guard,
+    evaluate_guards,
+    failure_message,
+    load_guards_file,
+    opret_guard,
+    value_guard,
+)
+
+
+class _Spk:
+    def __init__(self, b: bytes):
+        self._b = b
+
+    def hex(self) -> str:
+        return self._b.hex()
+
+
+class _Out:
+    def __init__(self, spk: bytes, value: int):
+        self.scriptPubKey = _Spk(spk)
+        self.nValue = value
+
+
+ANCHOR_SPK = bytes.fromhex('5120' + '11' * 32)
+OPRET_SPK = bytes.fromhex('6a04deadbeef')
+
+
+def _outputs():
+    return [_Out(ANCHOR_SPK, 546), _Out(OPRET_SPK, 0), _Out(bytes.fromhex('0014' + '22' * 20), 100000)]
+
+
+def run_cli(argv: Sequence[str]) -> str:
+    old = sys.argv[:]
+    try:
+        sys.argv = ['ssv'] + list(argv)
+        from io import StringIO
+        import contextlib
+        buf = StringIO()
+        with contextlib.redirect_stdout(buf):
+            ssv_main()
+        return buf.getvalue()
+    finally:
+        sys.argv = old
+
+
+def test_evaluate_guards_results_in_guard_order():
+    guards = [
+        value_guard(2, 100000),
+        anchor_guard(0, ANCHOR_SPK.hex(), 546),
+        opret_guard(1, 'deadbeef'),
+        anchor_guard(0, ANCHOR_SPK.hex(), 547),
+        opret_guard(5, 'deadbeef', 0),
+    ]
+    results = evaluate_guards(_outputs(), guards)
+    assert [r.ok for r in results] == [True, True, True, False, False]
+    assert results[3].reason == 'value mismatch' and results[3].actual_value == 546
+    assert results[4].reason == 'output index 5 out of range (num_outputs=3)'
+    assert failure_message(results) == (
+        'Anchor guard failed: value mismatch (index 0); '
+        'OP_RETURN guard failed: output index 5 out of range (num_outputs=3) (index 5)'
+    )
+    assert failure_message(results[:3]) is None
+
+
+def test_guard_builders_validate_inputs():
+    with pytest.raises(ValueError, match='hex'):
+        anchor_guard(0, 'zz', 1)
+    with pytest.raises(ValueError, match='non-negative'):
+        value_guard(-1, 1)
+    with pytest.raises(ValueError, match='non-negative'):
+        opret_guard(0, '00', -1)
+
+
+def test_load_guards_file():
+    with tempfile.TemporaryDirectory() as td:
+        p = os.path.join(td, 'g.json')
+        with open(p, 'wt') as f:
+            json.dump([{'type': 'anchor', 'index': 0, 'spk': ANCHOR_SPK.hex(), 'value': 546},
+                       {'type': 'opret', 'index': 1, 'data': 'deadbeef'},
+                       {'type': 'value', 'index': 2, 'value': 100000}], f)
+        guards = load_guards_file(p)
+        assert [g.kind for g in guards] == ['anchor', 'opret', 'value']
+        assert all(r.ok for r in evaluate_guards(_outputs(), guards))
+        with open(p, 'wt') as f:
+            json.dump([{'type': 'value', 'index': 0, 'value': 1}, {'type': 'bogus', 'index': 0}], f)
+        with pytest.raises(ValueError, match='entry 1: unknown guard type'):
+            load_guards_file(p)
+
+
+def _psbt_available() -> bool:
+    try:
+        m = importlib.import_module('bitcointx.core.psbt')
+        return any(hasattr(m, attr) for attr in ('PSBT', 'PartiallySignedTransaction'))
+    except Exception:
+        return False
+
+
+def _write_psbt(path: str) -> None:
+    psbt_mod = importlib.import_module('bitcointx.core.psbt')
+    PSBT = getattr(psbt_mod, 'PSBT', getattr(psbt_mod, 'PartiallySignedTransaction'))
+    core = importlib.import_module('bitcointx.core')
+    CScript = core.script.CScript
+    vout = [core.CTxOut(o.nValue, CScript(bytes.fromhex(o.scriptPubKey.hex()))) for o in _outputs()]
+    tx = core.CTransaction([core.CTxIn(core.COutPoint(core.lx('00' * 32), 0))], vout, 2)
+    psbt = PSBT(unsigned_tx=tx)
+    psbt.set_utxo(core.CTxOut(200000, CScript(ANCHOR_SPK)), 0)
+    with open(path, 'wt') as f:
+        f.write(psbt.to_base64())
+
+
+@pytest.mark.skipif(not _psbt_available(), reason='python-bitcointx PSBT API not available')
+def test_cli_finalize_repeated_guards_and_file():
+    with tempfile.TemporaryDirectory() as td:
+        src = os.path.join(td, 'in.psbt')
+        out = os.path.join(td, 'out.psbt')
+        _write_psbt(src)
+        gfile = os.path.join(td, 'g.json')
+        with open(gfile, 'wt') as f:
+            json.dump([{'type': 'value', 'index': 2, 'value': 100000}], f)
+        base = ['finalize', '--mode', 'provider', '--psbt-in', src, '--psbt-out', out,
+                '--sig', 'aa' * 64, '--control', 'c0' + '33' * 32, '--tapscript', '51']
+        run_cli(base + [
+            '--require-anchor-index', '0', '--require-anchor-spk', ANCHOR_SPK.hex(), '--require-anchor-value', '546',
+            '--require-opret', '1:deadbeef:0', '--require-value', '2:100000', '--guards', gfile,
+        ])
+        assert os.path.exists(out)
+        os.unlink(out)
+        with pytest.raises(ValueError) as ei:
+            run_cli(base + ['--require-anchor', f'0:{ANCHOR_SPK.hex()}:1', '--require-opret', '1:00'])
+        assert 'Anchor guard failed: value mismatch (index 0)' in str(ei.value)
+        assert 'OP_RETURN guard failed: spk mismatch (index 1)' in str(ei.value)
+        assert not os.path.exists(out)
+        with pytest.raises(ValueError, match='--require-anchor-\\*'):
+            run_cli(base + ['--require-anchor-index', '0', '--require-anchor-index', '1',
+                            '--require-anchor-spk', ANCHOR_SPK.hex(), '--require-anchor-value', '546'])
+
+
+def test_output_index_matches_spk_and_payload_anywhere():
+    from ssv.guards import OutputIndex
+    outs = _outputs() + [_Out(ANCHOR_SPK, 1000), _Out(bytes.fromhex('6a4c04deadbeef'), 0)]
+    idx = OutputIndex(outs)
+    assert idx.spk_indices(ANCHOR_SPK.hex().upper()) == [0, 3]
+    assert idx.opret_indices('DEADBEEF') == [1, 4]
+    assert idx.spk_indices('00') == []
+    results = evaluate_guards(outs, [
+        anchor_guard(None, ANCHOR_SPK.hex(), 1000),
+        opret_guard(None, 'deadbeef', 0),
+        anchor_guard(None, ANCHOR_SPK.hex(), 7),
+        opret_guard(None, 'cafe'),
+    ])
+    assert [(r.ok, r.index) for r in results] == [(True, 3), (True, 1), (False, 0), (False, None)]
+    assert failure_message(results[3:]) == 'OP_RETURN guard failed: no OP_RETURN output with matching data (any index)'
+
+
+@pytest.mark.skipif(not _psbt_available(), reason='python-bitcointx PSBT API not available')
+def test_cli_verify_without_index_lists_matches():
+    with tempfile.TemporaryDirectory() as td:
+        src = os.path.join(td, 'in.psbt')
+        _write_psbt(src)
+        data = json.loads(run_cli(['anchor-verify', '--psbt-in', src, '--spk', ANCHOR_SPK.hex(), '--value', '546', '--json']))
+        assert data['ok'] is True and data['index'] is None
+        assert [m['index'] for m in data['matches']] == [0]
+        data = json.loads(run_cli(['opret-verify', '--psbt-in', src, '--data', 'deadbeef', '--json']))
+        assert data['ok'] is True and data['matches'][0]['index'] == 1
+        data = json.loads(run_cli(['opret-verify', '--psbt-in', src, '--data', '00', '--json']))
+        assert data['ok'] is False and data['matches'] == []
+        out = os.path.join(td, 'out.psbt')
+        run_cli(['finalize', '--mode', 'provider', '--psbt-in', src, '--psbt-out', out,
+                 '--sig', 'aa' * 64, '--control', 'c0' + '33' * 32, '--tapscript', '51',
+                 '--require-anchor-spk', ANCHOR_SPK.hex(), '--require-anchor-value', '546',
+                 '--require-opret', '*:deadbeef'])
+        assert os.path.exists(out)
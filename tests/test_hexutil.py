@@ -26,3 +26,28 @@ def test_file_or_hex_precedence_and_file_reading():
         assert file_or_hex('x', 'ff', p) == b'\xff'
         # file path used when hex not provided
         assert file_or_hex('x', None, p) == b'\x0a'
+
+
+def test_parse_hex_reports_offset_and_accepts_buffers():
+    import mmap
+    import pytest
+    from ssv.hexutil import parse_hex_many
+    with pytest.raises(ValueError, match=r"'g' at offset 3"):
+        parse_hex('x', ' 00fg11\n')
+    with pytest.raises(ValueError, match=r"b'z' at offset 2"):
+        parse_hex('x', b'00z1')
+    with pytest.raises(ValueError, match='odd number of digits'):
+        parse_hex('x', '0ab')
+    with pytest.raises(ValueError, match='empty'):
+        parse_hex('x', b'  \n')
+    assert parse_hex('x', memoryview(b'\t00ff\r\n'), length=2) == b'\x00\xff'
+    with tempfile.TemporaryDirectory() as td:
+        p = os.path.join(td, 'h.txt')
+        with open(p, 'wb') as f:
+            f.write(b'abcd' * 1000 + b'\n')
+        with open(p, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            assert parse_hex('x', mm) == b'\xab\xcd' * 1000
+        assert file_or_hex('x', None, p, length=2000) == b'\xab\xcd' * 1000
+    assert parse_hex_many([('a', '00', 1), ('b', b'ffee', None)]) == [b'\x00', b'\xff\xee']
+    with pytest.raises(ValueError, match='b must be 1 bytes'):
+        parse_hex_many([('a', '00', 1), ('b', 'ffee', 1)])
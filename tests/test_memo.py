@@ -0,0 +1,125 @@
+import os
+import tempfile
+import threading
+
+import pytest
+
+from ssv import memo
+from ssv.memo import DerivationCache, LRUCache
+from ssv.policy import PolicyParams
+from ssv.registry import derive_vault
+from ssv.taproot import compute_output_key
+from ssv.tapscript import build_tapscript_bytes, tapleaf_hash_tagged
+
+INTERNAL = bytes.fromhex('79be667ef9dcbbac55a06295ce870b07029bfcdb2dce28d959f2815b16f81798')
+
+
+def test_lru_eviction_and_counters():
+    c = LRUCache(2)
+    c.put('a', 1)
+    c.put('b', 2)
+    assert c.get('a') == 1  # refreshes 'a', so 'b' is evicted next
+    c.put('c', 3)
+    assert c.get('b') is None and c.get('c') == 3
+    assert c.stats() == (2, 1, 1, 2, 2)
+    off = LRUCache(0)
+    off.put('a', 1)
+    assert len(off) == 0 and off.get('a') is None
+
+
+def test_derivation_cache_matches_uncached_and_persists():
+    h, pb, pp = bytes(32), b'\x11' * 32, b'\x22' * 32
+    cache = DerivationCache(8)
+    script, leaf = cache.tapscript(h, pb, 144, pp)
+    assert script == build_tapscript_bytes(h, pb, 144, pp) and leaf == tapleaf_hash_tagged(script)
+    assert cache.output_key(INTERNAL, leaf) == compute_output_key(INTERNAL, leaf, [])
+    assert cache.tapscript(h, pb, 144, pp) is cache.tapscript(h, pb, 144, pp)
+    cache.output_key(INTERNAL, leaf)
+    assert cache.stats()['policy']['hits'] == 2 and cache.stats()['output'] == {
+        'hits': 1, 'misses': 1, 'evictions': 0, 'size': 1, 'maxsize': 8}
+    with tempfile.TemporaryDirectory() as td:
+        path = os.path.join(td, 'memo.bin')
+        cache.save(path)
+        again = DerivationCache(8, path)
+        assert again.load() == 2
+        assert again.policy.items() == cache.policy.items()
+        assert [(k, v[:2]) for k, v in again.output.items()] == [(k, v[:2]) for k, v in cache.output.items()]
+        with open(path, 'r+b') as f:
+            f.truncate(os.path.getsize(path) - 1)
+        with pytest.raises(ValueError, match='truncated'):
+            again.load()
+    with pytest.raises(ValueError, match='csv_blocks'):
+        cache.tapscript(h, pb, 0, pp)
+
+
+def test_tampered_memo_file_is_not_trusted_for_verification():
+    from ssv.verify import check_taproot_path
+    vault = derive_vault(PolicyParams('00' * 32, '11' * 32, '22' * 32, 144), INTERNAL)
+    wrong = DerivationCache(8)
+    wrong.policy.put((bytes(32), b'\x11' * 32, 144, b'\x22' * 32), (b'\x51', b'\x00' * 32))
+    wrong.output.put((INTERNAL, vault.leaf_hash), (b'\x77' * 32, vault.control[0] & 1, True))
+    with tempfile.TemporaryDirectory() as td:
+        path = os.path.join(td, 'memo.bin')
+        wrong.save(path)
+        loaded = DerivationCache(8, path)
+        assert loaded.load() == 1  # the forged policy entry is dropped
+        assert loaded.output_key(INTERNAL, vault.leaf_hash) == (b'\x77' * 32, vault.control[0] & 1)
+        assert loaded.output_key(INTERNAL, vault.leaf_hash, verified=True) == (vault.spk[2:], vault.control[0] & 1)
+        memo.reset_default_cache()
+        try:
+            memo._DEFAULT, memo._DEFAULT_PID = DerivationCache(8, path), os.getpid()
+            memo._DEFAULT.load()
+            forged = b'\x51\x20' + b'\x77' * 32
+            assert check_taproot_path(vault.tapscript, vault.control, forged).ok is False
+            assert check_taproot_path(vault.tapscript, vault.control, vault.spk).ok is True
+            memo._DEFAULT.load()  # poison the output level again
+            assert derive_vault(PolicyParams('00' * 32, '11' * 32, '22' * 32, 144), INTERNAL) == vault
+        finally:
+            memo.reset_default_cache()
+
+
+def test_default_cache_from_env_and_threads(monkeypatch):
+    with tempfile.TemporaryDirectory() as td:
+        path = os.path.join(td, 'memo.bin')
+        monkeypatch.setenv('SSV_MEMO_FILE', path)
+        monkeypatch.setenv('SSV_MEMO_SIZE', '16')
+        memo.reset_default_cache()
+        try:
+            params = [PolicyParams('00' * 32, '11' * 32, '22' * 32, 100 + i % 4) for i in range(64)]
+            results = {}
+
+            def work(n: int) -> None:
+                results[n] = [derive_vault(p, INTERNAL).spk for p in params]
+
+            threads = [threading.Thread(target=work, args=(n,)) for n in range(4)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+            assert all(r == results[0] for r in results.values())
+            stats = memo.default_cache().stats()
+            assert stats['policy']['size'] == 4 and stats['policy']['hits'] + stats['policy']['misses'] == 256
+            memo.default_cache().save()
+            memo.reset_default_cache()
+            assert memo.default_cache().stats()['output']['size'] == 4
+        finally:
+            memo.reset_default_cache()
+
+
+
+def test_pool_workers_persist_their_entries(monkeypatch):
+    import json
+    from ssv.batch import build_vaults
+    with tempfile.TemporaryDirectory() as td:
+        path = os.path.join(td, 'memo.bin')
+        monkeypatch.setenv('SSV_MEMO_FILE', path)
+        memo.reset_default_cache()
+        try:
+            lines = [json.dumps({'h': f'{i:064x}', 'pk_b': '11' * 32, 'pk_p': '22' * 32, 'csv_blocks': 10 + i,
+                                 'internal_key': INTERNAL.hex()}) for i in range(1, 9)]
+            rows = list(build_vaults(lines, workers=2, chunk_size=2))
+            assert all(r['ok'] for r in rows) and memo._DEFAULT is None  # the parent derived nothing
+            loaded = DerivationCache(64, path)
+            assert loaded.load() == 16  # 8 policies + 8 output keys, merged from both workers
+        finally:
+            memo.reset_default_cache()
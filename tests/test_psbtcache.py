@@ -0,0 +1,114 @@
+import importlib
+import os
+import tempfile
+
+import pytest
+
+from ssv import psbtcache
+from ssv.psbtio import PSBTView
+
+
+def _psbt_available() -> bool:
+    try:
+        m = importlib.import_module('bitcointx.core.psbt')
+        return any(hasattr(m, attr) for attr in ('PSBT', 'PartiallySignedTransaction'))
+    except Exception:
+        return False
+
+
+def _psbt_bytes(n_outputs: int = 3) -> bytes:
+    psbt_mod = importlib.import_module('bitcointx.core.psbt')
+    PSBT = getattr(psbt_mod, 'PSBT', getattr(psbt_mod, 'PartiallySignedTransaction'))
+    core = importlib.import_module('bitcointx.core')
+    spk = core.script.CScript(bytes.fromhex('5120' + '11' * 32))
+    tx = core.CTransaction(
+        [core.CTxIn(core.COutPoint(core.lx('ab' * 32), 7), nSequence=144), core.CTxIn(core.COutPoint(core.lx('cd' * 32), 0))],
+        [core.CTxOut(1000 + i, spk) for i in range(n_outputs)], nLockTime=9, nVersion=2,
+    )
+    psbt = PSBT(unsigned_tx=tx)
+    psbt.set_utxo(core.CTxOut(50000, spk), 0)
+    return psbt.serialize()
+
+
+def _fields(p):
+    return (
+        p.tx.nVersion, p.tx.nLockTime,
+        [(i.prevout_hash, i.prevout_n, i.nSequence) for i in p.tx.vin],
+        [None if i.witness_utxo is None else (i.witness_utxo.nValue, i.witness_utxo.scriptPubKey) for i in p.inputs],
+        [(o.nValue, o.scriptPubKey) for o in p.tx.vout],
+    )
+
+
+@pytest.mark.skipif(not _psbt_available(), reason='python-bitcointx PSBT API not available')
+def test_summary_roundtrip_matches_view():
+    view = PSBTView(_psbt_bytes())
+    summary = psbtcache.parse_summary(psbtcache.summarize(view))
+    assert _fields(summary) == _fields(view)
+    with pytest.raises(ValueError):
+        psbtcache.parse_summary(psbtcache.summarize(view)[:-3])
+
+
+@pytest.mark.skipif(not _psbt_available(), reason='python-bitcointx PSBT API not available')
+def test_cache_hit_skips_parse_and_evicts_lru(monkeypatch):
+    with tempfile.TemporaryDirectory() as td:
+        cache = os.path.join(td, 'cache')
+        paths = []
+        for n in range(1, 4):
+            p = os.path.join(td, f'{n}.psbt')
+            with open(p, 'wb') as f:
+                f.write(_psbt_bytes(n))
+            paths.append(p)
+        first = psbtcache.load_cached(paths[0], cache)
+        assert len(os.listdir(cache)) == 1
+
+        def boom(*a, **k):
+            raise AssertionError('PSBT parsed on a cache hit')
+
+        monkeypatch.setattr(psbtcache, 'PSBTView', boom)
+        hit = psbtcache.load_cached(paths[0], cache)
+        assert isinstance(hit, psbtcache.PSBTSummary)
+        assert _fields(hit) == _fields(first)
+        monkeypatch.undo()
+
+        entry_size = os.path.getsize(os.path.join(cache, os.listdir(cache)[0]))
+        old = os.path.join(cache, os.listdir(cache)[0])
+        os.utime(old, ns=(1, 1))  # make entry 1 the least recently used
+        for p in paths[1:]:
+            psbtcache.load_cached(p, cache, max_bytes=entry_size * 3)
+        assert len(os.listdir(cache)) == 2
+        assert not os.path.exists(old)
+
+
+@pytest.mark.skipif(not _psbt_available(), reason='python-bitcointx PSBT API not available')
+def test_readonly_commands_use_cache_dir(monkeypatch, capsys):
+    from ssv.cli import main
+    with tempfile.TemporaryDirectory() as td:
+        p = os.path.join(td, 'a.psbt')
+        with open(p, 'wb') as f:
+            f.write(_psbt_bytes())
+        cache = os.path.join(td, 'cache')
+        monkeypatch.setenv('SSV_PSBT_CACHE_DIR', cache)
+        for _ in range(2):
+            main(['anchor-verify', '--psbt-in', p, '--index', '2', '--spk', '5120' + '11' * 32, '--value', '1002'])
+        assert len(os.listdir(cache)) == 1
+    assert capsys.readouterr().out.count('[OK] anchor output matches') == 2
+
+
+@pytest.mark.skipif(not _psbt_available(), reason='python-bitcointx PSBT API not available')
+def test_unwritable_cache_does_not_fail_the_load(monkeypatch):
+    def denied(*a, **k):
+        raise PermissionError(13, 'Permission denied')
+
+    with tempfile.TemporaryDirectory() as td:
+        p = os.path.join(td, 'a.psbt')
+        with open(p, 'wb') as f:
+            f.write(_psbt_bytes())
+        cache = os.path.join(td, 'cache')
+        monkeypatch.setattr(os, 'replace', denied)
+        assert isinstance(psbtcache.load_cached(p, cache), PSBTView)
+        assert os.listdir(cache) == []  # the temp file is cleaned up
+        monkeypatch.undo()
+        psbtcache.load_cached(p, cache)
+        monkeypatch.setattr(os, 'utime', denied)  # read-only cache dir: the hit still counts
+        assert isinstance(psbtcache.load_cached(p, cache), psbtcache.PSBTSummary)
+        monkeypatch.undo()
@@ -4,7 +4,7 @@ import tempfile
 
 import pytest
 
-from ssv.psbtio import load_psbt_from_file, write_psbt, to_raw_tx_hex, get_input_witness_spk_hex
+from ssv.psbtio import decode_psbt_bytes, load_psbt_from_file, write_psbt, to_raw_tx_hex, get_input_witness_spk_hex
 
 
 def _psbt_available() -> bool:
@@ -46,3 +46,122 @@ def test_psbt_to_raw_and_witness_errors():
         _ = to_raw_tx_hex(psbt)
     with pytest.raises(Exception):
         _ = get_input_witness_spk_hex(psbt, 0)
+
+
+@pytest.mark.skipif(not _psbt_available(), reason='python-bitcointx PSBT API not available')
+def test_load_psbt_binary_hex_and_wrapped_base64():
+    import base64
+    import textwrap
+    psbt_mod = importlib.import_module('bitcointx.core.psbt')
+    PSBT = getattr(psbt_mod, 'PSBT', getattr(psbt_mod, 'PartiallySignedTransaction'))
+    core = importlib.import_module('bitcointx.core')
+    spk = core.script.CScript(bytes.fromhex('5120' + '33' * 32))
+    tx = core.CTransaction([core.CTxIn(core.COutPoint(core.lx('00' * 32), 0))], [core.CTxOut(1234, spk)], 2)
+    raw = PSBT(unsigned_tx=tx).serialize()
+    encodings = {
+        'bin': raw,
+        'hex': ('  ' + raw.hex().upper() + '\n').encode(),
+        'hexwrap': '\n'.join(textwrap.wrap(raw.hex(), 64)).encode() + b'\n',
+        'b64': '\n'.join(textwrap.wrap(base64.b64encode(raw).decode(), 76)).encode() + b'\n',
+    }
+    with tempfile.TemporaryDirectory() as td:
+        for name, data in encodings.items():
+            p = os.path.join(td, name)
+            with open(p, 'wb') as f:
+                f.write(data)
+            assert load_psbt_from_file(p).serialize() == raw, name
+        for bad in (b'', b'not a psbt\n'):
+            p = os.path.join(td, 'bad')
+            with open(p, 'wb') as f:
+                f.write(bad)
+            with pytest.raises(ValueError):
+                load_psbt_from_file(p)
+    with pytest.raises(ValueError, match='invalid base64'):
+        decode_psbt_bytes(encodings['b64'][:20] + b'*' + encodings['b64'][20:])
+
+
+def _multi_input_psbt():
+    psbt_mod = importlib.import_module('bitcointx.core.psbt')
+    PSBT = getattr(psbt_mod, 'PSBT', getattr(psbt_mod, 'PartiallySignedTransaction'))
+    core = importlib.import_module('bitcointx.core')
+    CScript = core.script.CScript
+    spk_a = CScript(bytes.fromhex('5120' + '44' * 32))
+    spk_b = CScript(bytes.fromhex('0014' + '55' * 20))
+    prev = core.CTransaction([core.CTxIn(core.COutPoint(core.lx('aa' * 32), 1))],
+                             [core.CTxOut(7000 + i, spk_b) for i in range(300)])
+    tx = core.CTransaction(
+        [core.CTxIn(core.COutPoint(core.lx('bb' * 32), 3), nSequence=10),
+         core.CTxIn(core.COutPoint(prev.GetTxid(), 2))],
+        [core.CTxOut(1234, spk_a), core.CTxOut(0, CScript(bytes.fromhex('6a02beef'))), core.CTxOut(99, spk_b)],
+        nLockTime=500, nVersion=2,
+    )
+    psbt = PSBT(unsigned_tx=tx)
+    psbt.set_utxo(core.CTxOut(50000, spk_a), 0)
+    psbt.set_utxo(prev, 1)
+    return psbt
+
+
+def _serialize_without_utxos(psbt):
+    return type(psbt)(unsigned_tx=psbt.unsigned_tx).serialize()
+
+
+@pytest.mark.skipif(not _psbt_available(), reason='python-bitcointx PSBT API not available')
+def test_psbt_view_matches_bitcointx():
+    from ssv.psbtio import PSBTView, load_psbt_view
+    psbt = _multi_input_psbt()
+    view = PSBTView(psbt.serialize())
+    tx = psbt.unsigned_tx
+    assert (view.tx.nVersion, view.tx.nLockTime) == (2, 500)
+    assert [(o.nValue, o.scriptPubKey) for o in view.tx.vout] == [(o.nValue, bytes(o.scriptPubKey)) for o in tx.vout]
+    assert [(i.prevout_hash, i.prevout_n, i.nSequence) for i in view.tx.vin] == \
+        [(i.prevout.hash, i.prevout.n, i.nSequence) for i in tx.vin]
+    assert view.inputs[0].witness_utxo.nValue == 50000
+    for i, pi in enumerate(psbt.inputs):
+        wu = view.inputs[i].witness_utxo
+        if pi.witness_utxo is None:
+            assert wu is None
+        else:
+            assert (wu.nValue, wu.scriptPubKey) == (pi.witness_utxo.nValue, bytes(pi.witness_utxo.scriptPubKey))
+    assert get_input_witness_spk_hex(view, 0) == '5120' + '44' * 32
+    with pytest.raises(ValueError, match='missing witness_utxo'):
+        get_input_witness_spk_hex(PSBTView(_serialize_without_utxos(psbt)), 0)
+    with tempfile.TemporaryDirectory() as td:
+        p = os.path.join(td, 'v.psbt')
+        with open(p, 'wb') as f:
+            f.write(psbt.serialize())
+        with load_psbt_view(p) as v2:
+            assert v2.tx.vout[2].nValue == 99
+        write_psbt(psbt, p)
+        assert load_psbt_view(p).tx.vout[1].scriptPubKey == bytes.fromhex('6a02beef')
+    with pytest.raises(ValueError, match='truncated'):
+        PSBTView(psbt.serialize()[:40])
+
+
+@pytest.mark.skipif(not _psbt_available(), reason='python-bitcointx PSBT API not available')
+def test_read_only_commands_do_not_import_bitcointx():
+    import subprocess
+    import sys
+    src = os.path.join(os.path.dirname(__file__), '..', 'src')
+    with tempfile.TemporaryDirectory() as td:
+        p = os.path.join(td, 'v.psbt')
+        write_psbt(_multi_input_psbt(), p)
+        code = (
+            "import sys; sys.modules['bitcointx'] = None\n"
+            "from ssv.cli import main\n"
+            f"main(['anchor-show', '--psbt-in', {p!r}, '--json'])\n"
+            f"main(['opret-verify', '--psbt-in', {p!r}, '--data', 'beef'])\n"
+        )
+        env = dict(os.environ, PYTHONPATH=os.path.abspath(src))
+        out = subprocess.run([sys.executable, '-c', code], env=env, capture_output=True, text=True)
+    assert out.returncode == 0, out.stderr
+    assert '"value": 1234' in out.stdout
+    assert '[OK] OP_RETURN output found at index 1' in out.stdout
+
+
+def test_encode_psbt_formats():
+    from ssv.psbtio import decode_psbt_bytes, encode_psbt
+    raw = b'psbt\xff' + bytes(range(40))
+    for fmt in ('base64', 'hex', 'binary'):
+        assert decode_psbt_bytes(encode_psbt(raw, fmt)) == raw
+    with pytest.raises(ValueError, match='unknown PSBT format'):
+        encode_psbt(raw, 'json')
@@ -0,0 +1,126 @@
+import importlib
+import json
+import os
+import sys
+import tempfile
+
+import pytest
+
+from typing import Sequence
+from ssv.cli import main as ssv_main
+from ssv.policy import PolicyParams
+from ssv import registry
+from ssv.registry import Registry, derive_vault
+
+
+def _psbt_available() -> bool:
+    try:
+        m = importlib.import_module('bitcointx.core.psbt')
+        return any(hasattr(m, attr) for attr in ('PSBT', 'PartiallySignedTransaction'))
+    except Exception:
+        return False
+
+
+def run_cli(argv: Sequence[str]) -> str:
+    old = sys.argv[:]
+    try:
+        sys.argv = ['ssv'] + list(argv)
+        from io import StringIO
+        import contextlib
+        buf = StringIO()
+        with contextlib.redirect_stdout(buf):
+            ssv_main()
+        return buf.getvalue()
+    finally:
+        sys.argv = old
+
+
+INTERNAL = '79be667ef9dcbbac55a06295ce870b07029bfcdb2dce28d959f2815b16f81798'
+
+
+def _record(i: int) -> dict:
+    return {'h': f'{i:064x}', 'pk_b': '11' * 32, 'pk_p': '22' * 32, 'csv_blocks': 100 + i,
+            'internal_key': INTERNAL, 'id': f'v{i}', 'outpoint': f'{i:064x}:{i}'}
+
+
+def test_registry_add_and_lookup():
+    params = PolicyParams('00' * 32, '11' * 32, '22' * 32, 144)
+    vault = derive_vault(params, bytes.fromhex(INTERNAL), 'a')
+    with tempfile.TemporaryDirectory() as td:
+        with Registry(os.path.join(td, 'r.db')) as reg:
+            reg.add(vault, ['ab' * 32 + ':1'])
+            reg.add(vault)  # same spk: replaced, not duplicated
+            assert reg.count() == 1
+            assert reg.lookup_spk(vault.spk) == vault
+            assert reg.lookup_outpoint('ab' * 32 + ':1') == vault
+            assert reg.lookup_outpoint('ab' * 32 + ':2') is None
+            assert reg.lookup_spk(b'\x51\x20' + bytes(32)) is None
+    assert vault.spk[:2] == b'\x51\x20' and vault.control[1:] == bytes.fromhex(INTERNAL)
+
+
+def test_registry_import_and_show_cli():
+    with tempfile.TemporaryDirectory() as td:
+        db = os.path.join(td, 'r.db')
+        src = os.path.join(td, 'vaults.jsonl')
+        with open(src, 'wt') as f:
+            for i in range(1, 40):
+                f.write(json.dumps(_record(i)) + '\n')
+            f.write(json.dumps(dict(_record(99), csv_blocks=0)) + '\n')
+            f.write(json.dumps(dict(_record(98), outpoint='nope')) + '\n')
+        out = run_cli(['registry-import', '--registry', db, '--in', src, '--workers', '2', '--chunk-size', '8'])
+        errors = [json.loads(line) for line in out.splitlines()]
+        assert [e['line'] for e in errors] == [40, 41]
+        shown = json.loads(run_cli(['registry-show', '--registry', db, '--outpoint', _record(7)['outpoint']]))
+        assert shown['id'] == 'v7' and shown['csv_blocks'] == 107
+        again = json.loads(run_cli(['registry-show', '--registry', db, '--spk', shown['spk']]))
+        assert again == shown
+        with pytest.raises(ValueError, match='no vault registered'):
+            run_cli(['registry-show', '--registry', db, '--outpoint', _record(99)['outpoint']])
+        assert db not in registry._OPEN  # the commands close their own connection
+
+
+@pytest.mark.skipif(not _psbt_available(), reason='python-bitcointx PSBT API not available')
+def test_verify_and_finalize_resolve_from_registry():
+    from ssv.psbtcreate import create_from_spec
+    from ssv.psbtio import load_psbt_from_file
+    policy = {'hash_h': '00' * 32, 'borrower_pk': '11' * 32, 'csv_blocks': 144, 'provider_pk': '22' * 32}
+    with tempfile.TemporaryDirectory() as td:
+        db = os.path.join(td, 'r.db')
+        with Registry(db) as reg:
+            vault = derive_vault(PolicyParams('00' * 32, '11' * 32, '22' * 32, 144), bytes.fromhex(INTERNAL))
+            reg.add(vault)
+        created = create_from_spec(dict(policy, outpoint='ab' * 32 + ':0', amount=10000, mode='provider',
+                                        internal_key=INTERNAL, output=['0014' + '33' * 20 + ':9000']))
+        p = os.path.join(td, 'in.psbt')
+        with open(p, 'wb') as f:
+            f.write(created.psbt)
+        res = json.loads(run_cli(['verify-path', '--psbt-in', p, '--registry', db, '--json']))
+        assert res['ok'] is True and res['actual_spk'] == vault.spk.hex()
+
+        out = os.path.join(td, 'out.psbt')
+        run_cli(['finalize', '--psbt-in', p, '--psbt-out', out, '--mode', 'provider', '--sig', 'aa' * 64,
+                 '--registry', db])
+        stack = list(load_psbt_from_file(out).inputs[0].final_script_witness.stack)
+        assert [bytes(x) for x in stack] == [b'\xaa' * 64, b'\x00', vault.tapscript, vault.control]
+
+        other = os.path.join(td, 'other.db')
+        with pytest.raises(ValueError, match='does not exist'):
+            run_cli(['verify-path', '--psbt-in', p, '--registry', other])
+        Registry(other).close()
+        with pytest.raises(ValueError, match='no vault registered for spk'):
+            run_cli(['finalize', '--psbt-in', p, '--psbt-out', out, '--mode', 'provider', '--sig', 'aa' * 64,
+                     '--registry', other])
+        assert set(registry._OPEN) == {db, other}
+        registry.close_registries()
+        assert registry._OPEN == {}
+
+
+def test_import_reports_ok_only_after_commit():
+    from ssv.registry import import_vaults
+    lines = [json.dumps(_record(i)) for i in range(1, 6)]
+    with tempfile.TemporaryDirectory() as td:
+        with Registry(os.path.join(td, 'r.db')) as reg:
+            rows = import_vaults(reg, lines, batch=2)
+            first = next(rows)
+            assert first['line'] == 1 and reg.count() == 2  # its batch is stored before it is reported
+            assert [r['line'] for r in rows] == [2, 3, 4, 5] and reg.count() == 5
@@ -0,0 +1,66 @@
+import os
+
+import pytest
+
+from ssv import secp256k1
+from ssv.tapscript import build_tapscript, tapleaf_hash_tagged
+from ssv.taproot import compute_output_key, ec_backend_name, get_ec_backend
+
+
+def _vectors():
+    script = build_tapscript('00' * 32, '11' * 32, 10, '22' * 32)
+    leaf = tapleaf_hash_tagged(script)
+    yield bytes.fromhex('33' * 32), bytes.fromhex('22' * 32), []
+    yield bytes.fromhex('33' * 32), leaf, []
+    yield bytes.fromhex('33' * 32), leaf, [bytes.fromhex('44' * 32), bytes.fromhex('55' * 32)]
+    g = secp256k1.GX.to_bytes(32, 'big')
+    yield g, leaf, [bytes.fromhex('66' * 32)]
+
+
+def test_point_mul_g_matches_double_and_add():
+    def naive(k: int):
+        acc = secp256k1.INFINITY
+        base = (secp256k1.GX, secp256k1.GY, 1)
+        while k:
+            if k & 1:
+                aff = secp256k1.to_affine(base)
+                assert aff is not None
+                acc = secp256k1._jac_add_affine(acc, aff)
+            base = secp256k1._jac_double(base)
+            k >>= 1
+        return secp256k1.to_affine(acc)
+
+    for k in (1, 2, 255, 256, 0xDEADBEEF, secp256k1.N - 1, int.from_bytes(os.urandom(32), 'big') % secp256k1.N):
+        assert secp256k1.to_affine(secp256k1.point_mul_g(k)) == naive(k)
+    assert secp256k1.to_affine(secp256k1.point_mul_g(0)) is None
+
+
+def test_lift_x_rejects_off_curve():
+    # x = 5 has no matching y on secp256k1 (5^3 + 7 = 132 is a non-residue)
+    with pytest.raises(ValueError):
+        secp256k1.lift_x(5)
+    x, y = secp256k1.lift_x(secp256k1.GX)
+    assert x == secp256k1.GX and y % 2 == 0
+
+
+def test_python_backend_matches_coincurve():
+    pytest.importorskip('coincurve', reason='coincurve not installed')
+    py = get_ec_backend('python')
+    cc = get_ec_backend('coincurve')
+    for internal, _leaf, _nodes in _vectors():
+        for t in (1, 12345, int.from_bytes(os.urandom(32), 'big') % secp256k1.N):
+            assert py.tweak_xonly(py.load_xonly(internal), t) == cc.tweak_xonly(cc.load_xonly(internal), t)
+
+
+def test_compute_output_key_uses_python_backend_when_forced(monkeypatch):
+    pytest.importorskip('coincurve', reason='coincurve not installed')
+    expected = [compute_output_key(*v) for v in _vectors()]
+    monkeypatch.setenv('SSV_EC_BACKEND', 'python')
+    assert ec_backend_name() == 'python'
+    assert [compute_output_key(*v) for v in _vectors()] == expected
+
+
+def test_python_backend_rejects_invalid_internal_key(monkeypatch):
+    monkeypatch.setenv('SSV_EC_BACKEND', 'python')
+    with pytest.raises(ValueError, match='invalid internal key'):
+        compute_output_key((5).to_bytes(32, 'big'), b'\x11' * 32, [])
@@ -0,0 +1,87 @@
+import json
+import os
+import tempfile
+import threading
+import asyncio
+
+import pytest
+
+from ssv.server import Client, RemoteError, Server
+
+
+@pytest.fixture
+def daemon():
+    td = tempfile.mkdtemp()
+    sock = os.path.join(td, 'ssv.sock')
+    server = Server(sock, workers=1)
+    ready = threading.Event()
+    t = threading.Thread(target=lambda: asyncio.run(server.serve(ready.set)), daemon=True)
+    t.start()
+    assert ready.wait(10)
+    assert os.stat(sock).st_mode & 0o777 == 0o600
+    yield sock
+    with Client(sock) as c:
+        c.call('shutdown')
+    t.join(10)
+    assert not os.path.exists(sock)
+
+
+def test_server_build_tapscript_matches_cli(daemon):
+    from ssv.cli import build_tapscript_info
+    with Client(daemon) as c:
+        assert c.call('ping') == 'pong'
+        res = c.call('build_tapscript', {'hash_h': 'aa' * 32, 'borrower_pk': 'bb' * 32, 'csv_blocks': 5, 'provider_pk': 'cc' * 32})
+        # a second call on the same connection reuses the warm worker
+        again = c.call('build_tapscript', {'hash_h': 'aa' * 32, 'borrower_pk': 'bb' * 32, 'csv_blocks': 5, 'provider_pk': 'cc' * 32})
+    assert res == again == build_tapscript_info('aa' * 32, 'bb' * 32, 5, 'cc' * 32)
+
+
+def test_server_errors_are_jsonrpc_errors(daemon):
+    with Client(daemon) as c:
+        with pytest.raises(RemoteError, match='method not found'):
+            c.call('nope')
+        with pytest.raises(RemoteError, match='csv_blocks'):
+            c.call('build_tapscript', {'hash_h': 'aa' * 32, 'borrower_pk': 'bb' * 32, 'csv_blocks': 0, 'provider_pk': 'cc' * 32})
+        with pytest.raises(RemoteError) as ei:
+            c.call('build_tapscript', {'hash_h': 'aa' * 32})
+        assert ei.value.code == -32602
+
+
+def test_connect_flag_forwards_cli_invocation(daemon, capsys):
+    from ssv.cli import main as ssv_main
+    argv = ['--connect', daemon, 'build-tapscript', '--hash-h', 'aa' * 32, '--borrower-pk', 'bb' * 32,
+            '--csv-blocks', '5', '--provider-pk', 'cc' * 32, '--json']
+    with pytest.raises(SystemExit) as ei:
+        ssv_main(argv)
+    assert ei.value.code == 0
+    data = json.loads(capsys.readouterr().out)
+    assert 'tapscript_hex' in data
+
+    with pytest.raises(SystemExit) as ei:
+        ssv_main(['--connect', daemon, 'build-tapscript', '--hash-h', 'aa' * 32, '--borrower-pk', 'bb' * 32,
+                  '--csv-blocks', '0', '--provider-pk', 'cc' * 32])
+    assert ei.value.code == 1
+    assert 'csv_blocks' in capsys.readouterr().err
+
+
+def test_connect_forwards_stdin_and_binary_stdout(daemon, monkeypatch):
+    import io
+    from ssv.cli import main as ssv_main
+    from ssv.psbtcreate import create_from_spec
+    psbt = create_from_spec({'hash_h': '00' * 32, 'borrower_pk': '11' * 32, 'csv_blocks': 144, 'provider_pk': '22' * 32,
+                             'outpoint': 'ab' * 32 + ':0', 'amount': 10000, 'mode': 'provider',
+                             'internal_key': '79be667ef9dcbbac55a06295ce870b07029bfcdb2dce28d959f2815b16f81798',
+                             'output': ['0014' + '33' * 20 + ':9000']}).psbt
+    argv = ['finalize', '--psbt-in', '-', '--psbt-out', '-', '--format', 'binary', '--mode', 'provider',
+            '--sig', 'aa' * 64, '--tapscript', '51', '--control', 'c0' + '33' * 32]
+    outputs = []
+    for prefix in ([], ['--connect', daemon]):
+        monkeypatch.setattr('sys.stdin', io.TextIOWrapper(io.BytesIO(psbt)))
+        out = io.BytesIO()
+        monkeypatch.setattr('sys.stdout', io.TextIOWrapper(out, write_through=True))
+        try:
+            ssv_main(prefix + argv)
+        except SystemExit as e:
+            assert e.code == 0
+        outputs.append(out.getvalue())
+    assert outputs[0].startswith(b'psbt\xff') and outputs[1] == outputs[0]
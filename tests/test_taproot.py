@@ -59,3 +59,54 @@ def test_scriptpubkey_from_xonly_validates_length():
 
     with pytest.raises(ValueError, match='32 bytes'):
         scriptpubkey_from_xonly(b'\x01' * 31)
+
+
+def test_compute_output_keys_matches_single_calls_in_order():
+    from ssv.taproot import compute_output_keys
+
+    internals = [bytes.fromhex('33' * 32), bytes.fromhex('79be667ef9dcbbac55a06295ce870b07029bfcdb2dce28d959f2815b16f81798')]
+    items = [(internals[i % 2], bytes([i]) * 32, [bytes([i + 1]) * 32] * (i % 3)) for i in range(40)]
+    expected = [compute_output_key(*item) for item in items]
+    assert compute_output_keys(items) == expected
+    assert compute_output_keys(items, workers=3, chunk_size=7) == expected
+    assert compute_output_keys(items, workers=2, executor='process', chunk_size=16) == expected
+
+
+def test_compute_output_keys_reports_offending_item():
+    from ssv.taproot import compute_output_keys
+
+    items = [(b'\x33' * 32, b'\x11' * 32, []), (b'\x33' * 32, b'\x11' * 31, [])]
+    with pytest.raises(ValueError, match='item 1: leaf hash'):
+        compute_output_keys(items)
+
+
+def test_control_block_is_a_view_over_the_buffer():
+    from ssv.taproot import _merkle_ascend, output_key_from_control, parse_control_block
+
+    internal = bytes.fromhex('79be667ef9dcbbac55a06295ce870b07029bfcdb2dce28d959f2815b16f81798')
+    nodes = [b'\x01' * 32, b'\xfe' * 32]
+    raw = bytearray(b'\xc1' + internal + b''.join(nodes))
+    view = memoryview(raw)
+    cb = parse_control_block(view)
+    assert cb.raw is view and cb.num_nodes == 2
+    assert (cb.leaf_version, cb.parity, cb.internal_key, cb.merkle_nodes) == (0xC0, 1, internal, tuple(nodes))
+    assert cb == parse_control_block_hex(raw.hex()) and bytes(cb) == bytes(raw)
+    leaf = b'\x55' * 32
+    assert cb.merkle_root(leaf) == _merkle_ascend(leaf, nodes)
+    assert output_key_from_control(cb, leaf) == compute_output_key(internal, leaf, nodes)
+    with pytest.raises(ValueError, match='too short'):
+        parse_control_block(view[:32])
+
+
+def test_control_block_field_constructor_is_kept():
+    from ssv.taproot import ControlBlock
+
+    internal = b'\x33' * 32
+    nodes = (b'\x01' * 32,)
+    cb = ControlBlock(leaf_version=0xC0, parity=1, internal_key=internal, merkle_nodes=nodes)
+    assert bytes(cb) == b'\xc1' + internal + nodes[0]
+    assert ControlBlock(0xC0, 1, internal, nodes) == cb == ControlBlock(bytes(cb))
+    assert cb.as_dict() == {'leaf_version': 0xC0, 'parity': 1, 'internal_key': internal, 'merkle_nodes': nodes}
+    assert cb.replace(parity=0, merkle_nodes=()).raw == b'\xc0' + internal
+    with pytest.raises(ValueError, match='32 bytes'):
+        ControlBlock(leaf_version=0xC0, parity=0, internal_key=b'\x33' * 31, merkle_nodes=())
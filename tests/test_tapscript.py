@@ -39,3 +39,52 @@ def test_build_tapscript_rejects_large_csv():
     pp = '22' * 32
     with pytest.raises(ValueError):
         build_tapscript(h, pb, 70000, pp)
+
+
+def test_tagged_sha256_matches_reference_and_batch():
+    import hashlib
+    from ssv.tapscript import tagged_sha256, tagged_sha256_many
+
+    def ref(tag: str, msg: bytes) -> bytes:
+        t = hashlib.sha256(tag.encode()).digest()
+        return hashlib.sha256(t + t + msg).digest()
+
+    msgs = [b'', b'\x01' * 32, b'\x02' * 64, b'\x03' * 81]
+    for tag in ('TapLeaf', 'TapBranch', 'TapTweak', 'SomeOtherTag'):
+        expected = [ref(tag, m) for m in msgs]
+        assert [tagged_sha256(tag, m) for m in msgs] == expected
+        assert tagged_sha256_many(tag, msgs) == expected
+    # repeated calls must not mutate the cached midstate
+    assert tagged_sha256('TapLeaf', b'x') == tagged_sha256('TapLeaf', b'x')
+
+
+def _reference_tapscript(h: bytes, pb: bytes, csv: int, pp: bytes) -> bytes:
+    from ssv.tapscript import pushdata, push_scriptnum
+    return (b'\x63\xa8' + pushdata(h) + b'\x88' + pushdata(pb) + b'\xac\x67'
+            + push_scriptnum(csv) + b'\xb2\x75' + pushdata(pp) + b'\xac\x68')
+
+
+def test_template_round_trips_every_csv_value():
+    from ssv.policy import PolicyParams
+    from ssv.tapscript import build_tapscript_bytes, match_tapscript
+    h, pb, pp = bytes(range(32)), b'\x11' * 32, b'\x22' * 32
+    for csv in range(1, 65536):
+        script = build_tapscript_bytes(h, pb, csv, pp)
+        assert match_tapscript(script) == PolicyParams(h.hex(), pb.hex(), pp.hex(), csv)
+    for csv in (1, 127, 128, 32767, 32768, 65535):
+        script = build_tapscript(h.hex(), pb.hex(), csv, pp.hex())
+        assert script == _reference_tapscript(h, pb, csv, pp)
+        assert match_tapscript(memoryview(script)).csv_blocks == csv
+
+
+def test_match_tapscript_rejects_near_misses():
+    from ssv.tapscript import match_tapscript
+    script = build_tapscript('00' * 32, '11' * 32, 200, '22' * 32)
+    assert match_tapscript(b'\x51') is None
+    assert match_tapscript(script[:-1] + b'\x67') is None
+    assert match_tapscript(script[:70] + b'\xad' + script[71:]) is None
+    # non-minimal CSV push (0x0a encoded on two bytes)
+    padded = _reference_tapscript(b'\x00' * 32, b'\x11' * 32, 10, b'\x22' * 32).replace(b'\x01\x0a\xb2', b'\x02\x0a\x00\xb2')
+    assert match_tapscript(padded) is None
+    # negative CSV value
+    assert match_tapscript(script.replace(b'\x02\xc8\x00\xb2', b'\x02\xc8\x80\xb2')) is None
@@ -0,0 +1,90 @@
+import json
+import os
+import sys
+import tempfile
+
+import pytest
+
+from typing import Sequence
+from ssv.cli import main as ssv_main
+from ssv.policy import PolicyParams
+from ssv.registry import derive_vault
+from ssv.taptree import TapLeaf, build_taptree
+from ssv.verify import check_taproot_path
+
+
+def run_cli(argv: Sequence[str]) -> str:
+    old = sys.argv[:]
+    try:
+        sys.argv = ['ssv'] + list(argv)
+        from io import StringIO
+        import contextlib
+        buf = StringIO()
+        with contextlib.redirect_stdout(buf):
+            ssv_main()
+        return buf.getvalue()
+    finally:
+        sys.argv = old
+
+
+INTERNAL = bytes.fromhex('79be667ef9dcbbac55a06295ce870b07029bfcdb2dce28d959f2815b16f81798')
+
+
+def _leaves(weights):
+    return [TapLeaf(bytes([0x51, 0x01, i]), w, f'l{i}') for i, w in enumerate(weights)]
+
+
+def test_huffman_depths_and_every_control_block_verifies():
+    tree = build_taptree(_leaves([1, 8, 1, 4, 2]), INTERNAL)
+    assert [leaf.depth for leaf in tree.leaves] == [4, 1, 4, 2, 3]
+    assert tree.leaf('l1').control[0] == 0xC0 | tree.parity
+    for leaf in tree.leaves:
+        res = check_taproot_path(leaf.script, leaf.control, tree.spk)
+        assert res.ok is True, (leaf.name, res.reason)
+    assert tree.expected_control_size() == pytest.approx(33 + 32 * (8 * 1 + 4 * 2 + 2 * 3 + 2 * 4) / 16)
+    # equal weights give a balanced tree
+    assert {leaf.depth for leaf in build_taptree(_leaves([1] * 8), INTERNAL).leaves} == {3}
+
+
+def test_single_leaf_matches_vault_derivation():
+    vault = derive_vault(PolicyParams('00' * 32, '11' * 32, '22' * 32, 144), INTERNAL)
+    tree = build_taptree([TapLeaf(vault.tapscript)], INTERNAL)
+    assert (tree.merkle_root, tree.spk, tree.leaves[0].control) == (vault.leaf_hash, vault.spk, vault.control)
+
+
+def test_skewed_weights_stay_within_the_depth_limit():
+    leaves = [TapLeaf(bytes([i % 256, i // 256]), 2.0 ** -i) for i in range(3000)]
+    tree = build_taptree(leaves, INTERNAL)
+    depths = [leaf.depth for leaf in tree.leaves]
+    assert max(depths) == 128 and depths[0] == 1
+    assert sum(2.0 ** -d for d in depths) == 1  # a full binary tree
+    for leaf in tree.leaves[:2] + tree.leaves[-2:]:
+        assert check_taproot_path(leaf.script, leaf.control, tree.spk).ok is True
+
+
+def test_invalid_leaves_and_cli():
+    with pytest.raises(ValueError, match='at least one leaf'):
+        build_taptree([], INTERNAL)
+    with pytest.raises(ValueError, match='leaf 1: weight'):
+        build_taptree([TapLeaf(b'\x51'), TapLeaf(b'\x51', -1)], INTERNAL)
+    with tempfile.TemporaryDirectory() as td:
+        p = os.path.join(td, 'leaves.json')
+        with open(p, 'wt') as f:
+            json.dump([{'tapscript': '510101', 'weight': 0.9, 'name': 'close'},
+                       {'tapscript': '510102', 'weight': 0.1, 'name': 'liquidate'}], f)
+        out = json.loads(run_cli(['taptree', '--leaves', p, '--internal-key', INTERNAL.hex()]))
+    tree = build_taptree([TapLeaf(b'\x51\x01\x01', 0.9, 'close'), TapLeaf(b'\x51\x01\x02', 0.1, 'liquidate')], INTERNAL)
+    assert out == tree.as_dict() and out['expected_control_bytes'] == 65
+
+
+def test_untrusted_memo_entry_does_not_change_the_tree():
+    from ssv import memo
+    from ssv.memo import DerivationCache
+    expected = build_taptree(_leaves([1, 2, 3]), INTERNAL)
+    memo.reset_default_cache()
+    try:
+        memo._DEFAULT, memo._DEFAULT_PID = DerivationCache(8), os.getpid()
+        memo._DEFAULT.output.put((INTERNAL, expected.merkle_root), (b'\x77' * 32, 0, False))  # as loaded from a file
+        assert build_taptree(_leaves([1, 2, 3]), INTERNAL) == expected
+    finally:
+        memo.reset_default_cache()
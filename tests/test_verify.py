@@ -55,3 +55,20 @@ def test_verify_path_rejects_parity_mismatch():
     res = verify_taproot_path(script.hex(), ctrl.hex(), spk_hex)
     assert res['ok'] is False
     assert res['reason'] == 'control block parity mismatch'
+
+
+def test_check_taproot_path_bytes_native():
+    from ssv.taproot import parse_control_block
+    from ssv.verify import check_taproot_path
+
+    script = build_tapscript('00' * 32, '11' * 32, 10, '22' * 32)
+    internal = bytes.fromhex('79be667ef9dcbbac55a06295ce870b07029bfcdb2dce28d959f2815b16f81798')
+    qx, parity = compute_output_key(internal, tapleaf_hash_tagged(script), [])
+    spk = scriptpubkey_from_xonly(qx)
+    ctrl = bytes([0xC0 | parity]) + internal
+    res = check_taproot_path(memoryview(script), memoryview(ctrl), spk)
+    assert res.ok is True and res.expected_spk == spk
+    assert check_taproot_path(script, parse_control_block(ctrl), spk).as_dict() == \
+        verify_taproot_path(script.hex(), ctrl.hex(), spk.hex())
+    bad = check_taproot_path(script, bytes([0xC0 | (parity ^ 1)]) + internal, spk)
+    assert bad.ok is False and bad.reason == 'control block parity mismatch'
@@ -51,3 +51,18 @@ def test_build_witness_rejects_non_32_byte_preimage():
     ctrl = bytes.fromhex('c0' + '33'*32)
     with pytest.raises(ValueError, match='preimage'):
         build_witness(Branch.CLOSE, bytes.fromhex('aa'*64), taps, ctrl, preimage=b'\x01'*31)
+
+
+def test_build_witness_from_memoryviews_gives_bytes_stack():
+    from ssv.taproot import parse_control_block
+    raw = bytearray(b'\xc0' + b'\x33' * 32)
+    cb = parse_control_block(memoryview(raw))
+    stack = build_witness(Branch.CLOSE, memoryview(b'\xaa' * 64), memoryview(b'\x51'), cb,
+                          preimage=memoryview(b'\xbb' * 32))
+    assert all(type(item) is bytes for item in stack)
+    assert stack[-1] == bytes(raw)
+    try:
+        from bitcointx.core.script import CScriptWitness
+    except ImportError:
+        return
+    assert [bytes(x) for x in CScriptWitness(stack).stack] == stack
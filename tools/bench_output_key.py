@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+bench_output_key.py — Taproot output-key throughput per EC backend
+
+Measures keys/sec of ``ssv.taproot.compute_output_key`` for each available
+backend (coincurve and the pure-Python fallback). The fallback's one-off
+fixed-base table build is reported separately. With ``--batch`` it instead
+compares a loop of single calls against ``compute_output_keys`` at several
+batch sizes (a handful of shared internal keys, as in a provider's book).
+
+Usage:
+  python tools/bench_output_key.py [--n 2000] [--json]
+  python tools/bench_output_key.py --batch [--sizes 1,1000,100000] [--workers 4 --executor process]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import time
+from typing import Any, Dict, List
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from ssv import secp256k1  # noqa: E402
+from ssv.taproot import EC_BACKENDS, compute_output_key, compute_output_keys  # noqa: E402
+
+
+def _backend_available(name: str) -> bool:
+    if name != 'coincurve':
+        return True
+    try:
+        import coincurve  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def bench(n: int) -> List[Dict[str, Any]]:
+    internal = bytes.fromhex('33' * 32)
+    leaves = [os.urandom(32) for _ in range(n)]
+    t0 = time.perf_counter()
+    secp256k1._g_table()
+    table_s = time.perf_counter() - t0
+    rows: List[Dict[str, Any]] = []
+    for name in EC_BACKENDS:
+        if not _backend_available(name):
+            continue
+        os.environ['SSV_EC_BACKEND'] = name
+        t0 = time.perf_counter()
+        for leaf in leaves:
+            compute_output_key(internal, leaf, [])
+        elapsed = time.perf_counter() - t0
+        row: Dict[str, Any] = {'backend': name, 'n': n, 'seconds': elapsed, 'keys_per_sec': n / elapsed}
+        if name == 'python':
+            row['table_build_seconds'] = table_s
+        rows.append(row)
+    os.environ.pop('SSV_EC_BACKEND', None)
+    return rows
+
+
+def bench_batch(sizes: List[int], workers: int, executor: str) -> List[Dict[str, Any]]:
+    internals = [bytes.fromhex('33' * 32), secp256k1.GX.to_bytes(32, 'big'), bytes.fromhex('79' * 32)]
+    internals = [k for k in internals if _is_valid_xonly(k)]
+    rows: List[Dict[str, Any]] = []
+    for n in sizes:
+        items = [(internals[i % len(internals)], os.urandom(32), []) for i in range(n)]
+        t0 = time.perf_counter()
+        for internal, leaf, nodes in items:
+            compute_output_key(internal, leaf, nodes)
+        single_s = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        compute_output_keys(items, workers=workers, executor=executor)
+        batch_s = time.perf_counter() - t0
+        rows.append({
+            'n': n,
+            'single_keys_per_sec': n / single_s,
+            'batch_keys_per_sec': n / batch_s,
+            'workers': workers,
+            'executor': executor,
+        })
+    return rows
+
+
+def _is_valid_xonly(xonly: bytes) -> bool:
+    try:
+        secp256k1.lift_x(int.from_bytes(xonly, 'big'))
+    except ValueError:
+        return False
+    return True
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description='Benchmark Taproot output-key derivation per EC backend')
+    ap.add_argument('--n', type=int, default=2000, help='keys per backend')
+    ap.add_argument('--json', action='store_true', help='print JSON output')
+    ap.add_argument('--batch', action='store_true', help='benchmark compute_output_keys at --sizes')
+    ap.add_argument('--sizes', default='1,1000,100000', help='comma-separated batch sizes')
+    ap.add_argument('--workers', type=int, default=1, help='batch pool size')
+    ap.add_argument('--executor', choices=['thread', 'process'], default='thread', help='batch pool type')
+    args = ap.parse_args()
+    if args.batch:
+        rows = bench_batch([int(x) for x in args.sizes.split(',')], args.workers, args.executor)
+        if args.json:
+            print(json.dumps(rows))
+            return
+        for r in rows:
+            print(f"{r['n']:>7} items: single {r['single_keys_per_sec']:>9.0f} keys/s  batch {r['batch_keys_per_sec']:>9.0f} keys/s")
+        return
+    rows = bench(args.n)
+    if args.json:
+        print(json.dumps(rows))
+        return
+    for r in rows:
+        extra = f"  (table build {r['table_build_seconds'] * 1e3:.1f} ms)" if 'table_build_seconds' in r else ''
+        print(f"{r['backend']:>10}: {r['keys_per_sec']:>10.0f} keys/s{extra}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+bench_psbt_load.py — load time and peak RSS of ssv.psbtio.load_psbt_from_file
+
+Builds multi-MB PSBTs whose inputs carry full ``non_witness_utxo``
+transactions, writes them as binary, hex and base64, and loads each one in
+a fresh interpreter two ways:
+  legacy  read text -> hex regex -> unhexlify -> base64 encode -> from_base64
+          (the loader before the mmap rewrite; binary files are unsupported)
+  mmap    ssv.psbtio.load_psbt_from_file (sniff format, decode once)
+
+Peak RSS is reported as growth over the interpreter baseline measured after
+imports, so it reflects the loader itself.
+
+Usage:
+  python tools/bench_psbt_load.py [--inputs 8] [--prev-outputs 4000] [--runs 3] [--json]
+"""
+from __future__ import annotations
+
+import argparse
+import base64
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from typing import Dict, List
+
+SRC = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+_CHILD = r'''
+import resource, sys, time
+sys.path.insert(0, {src!r})
+from bitcointx.core.psbt import PartiallySignedTransaction as PSBT
+import ssv.psbtio as psbtio
+mode, path = sys.argv[1], sys.argv[2]
+base = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+t0 = time.perf_counter()
+if mode == 'legacy':
+    import base64, binascii
+    from ssv.hexutil import is_hex_str
+    with open(path, 'rt') as f:
+        s = f.read().strip()
+    if is_hex_str(s):
+        s = base64.b64encode(binascii.unhexlify(s)).decode()
+    psbt = PSBT.from_base64(s)
+else:
+    psbt = psbtio.load_psbt_from_file(path)
+dt = time.perf_counter() - t0
+peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(dt * 1e3, (peak - base) / 1024.0)
+'''
+
+
+def _build_psbt(n_inputs: int, prev_outputs: int) -> bytes:
+    from bitcointx.core import COutPoint, CTransaction, CTxIn, CTxOut
+    from bitcointx.core.psbt import PartiallySignedTransaction
+    from bitcointx.core.script import CScript
+    spk = CScript(bytes.fromhex('0014' + '11' * 20))
+    prevs = []
+    for i in range(n_inputs):
+        vin = [CTxIn(COutPoint(bytes([i]) * 32, 0))]
+        prevs.append(CTransaction(vin, [CTxOut(1000 + j, spk) for j in range(prev_outputs)], 2))
+    tx = CTransaction([CTxIn(COutPoint(p.GetTxid(), 0)) for p in prevs], [CTxOut(500, spk)], 2)
+    psbt = PartiallySignedTransaction(unsigned_tx=tx)
+    for i, p in enumerate(prevs):
+        psbt.set_utxo(p, i)
+    return psbt.serialize()
+
+
+def _run(mode: str, path: str, runs: int) -> Dict[str, float]:
+    child = _CHILD.format(src=SRC)
+    times: List[float] = []
+    rss: List[float] = []
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, '-c', child, mode, path], check=True, capture_output=True, text=True)
+        ms, mb = out.stdout.split()
+        times.append(float(ms))
+        rss.append(float(mb))
+    return {'median_ms': statistics.median(times), 'peak_rss_mb': max(rss)}
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description='Benchmark PSBT loading (time and peak RSS)')
+    ap.add_argument('--inputs', type=int, default=8, help='inputs, each with a non_witness_utxo')
+    ap.add_argument('--prev-outputs', type=int, default=4000, help='outputs per previous transaction')
+    ap.add_argument('--runs', type=int, default=3, help='fresh interpreters per case')
+    ap.add_argument('--json', action='store_true', help='print JSON output')
+    args = ap.parse_args()
+
+    raw = _build_psbt(args.inputs, args.prev_outputs)
+    results: Dict[str, Dict[str, float]] = {}
+    with tempfile.TemporaryDirectory() as td:
+        files = {
+            'binary': raw,
+            'hex': raw.hex().encode(),
+            'base64': base64.b64encode(raw),
+        }
+        for fmt, data in files.items():
+            path = os.path.join(td, f'p.{fmt}')
+            with open(path, 'wb') as f:
+                f.write(data)
+            for mode in ('legacy', 'mmap'):
+                if mode == 'legacy' and fmt == 'binary':
+                    continue  # not accepted by the legacy loader
+                results[f'{fmt}/{mode}'] = _run(mode, path, args.runs)
+
+    if args.json:
+        print(json.dumps({'psbt_bytes': len(raw), 'results': results}))
+        return
+    print(f'PSBT size: {len(raw) / 1e6:.2f} MB binary')
+    for case, r in results.items():
+        print(f"{case:>14}: median {r['median_ms']:8.1f} ms  peak RSS +{r['peak_rss_mb']:7.1f} MB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+bench_serve.py — latency of `ssv serve` versus per-process CLI invocation
+
+Starts a daemon on a temporary socket and times the same build-tapscript
+request three ways:
+  process  a fresh `python -m ssv.cli build-tapscript ...` per call
+  connect  a fresh `python -m ssv.cli --connect SOCK build-tapscript ...`
+           (what shell scripts get by adding one flag)
+  client   an in-process ssv.server.Client reusing one connection
+
+Usage:
+  python tools/bench_serve.py [--n 30] [--workers 2] [--json]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, List
+
+SRC = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.insert(0, SRC)
+
+from ssv.server import Client  # noqa: E402
+
+BUILD_ARGV = ['build-tapscript', '--hash-h', '00' * 32, '--borrower-pk', '11' * 32,
+              '--csv-blocks', '10', '--provider-pk', '22' * 32, '--json']
+BUILD_PARAMS = {'hash_h': '00' * 32, 'borrower_pk': '11' * 32, 'csv_blocks': 10, 'provider_pk': '22' * 32}
+
+
+def _time(fn: Callable[[], Any], n: int) -> Dict[str, float]:
+    samples: List[float] = []
+    for _ in range(n):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1e3)
+    samples.sort()
+    return {'median_ms': statistics.median(samples), 'p95_ms': samples[max(0, int(len(samples) * 0.95) - 1)]}
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description='Compare ssv serve latency with per-process invocation')
+    ap.add_argument('--n', type=int, default=30, help='calls per mode')
+    ap.add_argument('--workers', type=int, default=2, help='daemon worker processes')
+    ap.add_argument('--json', action='store_true', help='print JSON output')
+    args = ap.parse_args()
+
+    env = dict(os.environ, PYTHONPATH=SRC + os.pathsep + os.environ.get('PYTHONPATH', ''))
+    py = [sys.executable, '-m', 'ssv.cli']
+    with tempfile.TemporaryDirectory() as td:
+        sock = os.path.join(td, 'ssv.sock')
+        daemon = subprocess.Popen(py + ['serve', '--socket', sock, '--workers', str(args.workers)],
+                                  env=env, stderr=subprocess.DEVNULL)
+        try:
+            deadline = time.time() + 10
+            while not os.path.exists(sock):
+                if time.time() > deadline:
+                    raise RuntimeError('daemon did not start')
+                time.sleep(0.05)
+            client = Client(sock)
+            client.call('build_tapscript', BUILD_PARAMS)  # warm the workers
+            results = {
+                'process': _time(lambda: subprocess.run(py + BUILD_ARGV, env=env, check=True, capture_output=True), args.n),
+                'connect': _time(lambda: subprocess.run(py + ['--connect', sock] + BUILD_ARGV, env=env, check=True, capture_output=True), args.n),
+                'client': _time(lambda: client.call('build_tapscript', BUILD_PARAMS), args.n),
+            }
+            client.call('shutdown')
+            client.close()
+        finally:
+            try:
+                daemon.wait(10)
+            except subprocess.TimeoutExpired:
+                daemon.kill()
+
+    if args.json:
+        print(json.dumps(results))
+        return
+    for mode, r in results.items():
+        print(f"{mode:>8}: median {r['median_ms']:7.2f} ms  p95 {r['p95_ms']:7.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+bench_startup.py — cold-start latency and import cost per `ssv` subcommand
+
+Runs each subcommand in a fresh interpreter with ``-X importtime`` and
+reports median wall time plus the heaviest top-level imports. PSBT-based
+subcommands are included only when python-bitcointx is installed (fixtures
+are generated in a temp dir). Use ``--budget-ms`` in CI to fail when any
+case exceeds the cold-start budget.
+
+Usage:
+  python tools/bench_startup.py [--runs 5] [--top 5] [--budget-ms 150] [--json]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+SRC = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+H, PB, PP = '00' * 32, '11' * 32, '22' * 32
+CTRL = 'c0' + '33' * 32
+
+
+def _write_psbt_fixture(td: str) -> Optional[str]:
+    try:
+        from bitcointx.core import COutPoint, CTransaction, CTxIn, CTxOut, lx
+        from bitcointx.core.psbt import PartiallySignedTransaction
+        from bitcointx.core.script import CScript
+    except ImportError:
+        return None
+    spk = bytes.fromhex('5120' + '11' * 32)
+    tx = CTransaction([CTxIn(COutPoint(lx('00' * 32), 0))], [CTxOut(1000, CScript(spk))], 2)
+    path = os.path.join(td, 'bench.psbt')
+    with open(path, 'wt') as f:
+        f.write(PartiallySignedTransaction(unsigned_tx=tx).to_base64())
+    return path
+
+
+def cases(td: str) -> List[Tuple[str, List[str]]]:
+    out: List[Tuple[str, List[str]]] = [
+        ('--help', ['--help']),
+        ('build-tapscript', ['build-tapscript', '--hash-h', H, '--borrower-pk', PB, '--csv-blocks', '10', '--provider-pk', PP]),
+        ('verify-path', ['verify-path', '--tapscript', '63', '--control', CTRL, '--witness-spk', '5120' + '00' * 32]),
+    ]
+    psbt = _write_psbt_fixture(td)
+    if psbt:
+        spk = '5120' + '11' * 32
+        out += [
+            ('anchor-show', ['anchor-show', '--psbt-in', psbt]),
+            ('anchor-verify', ['anchor-verify', '--psbt-in', psbt, '--index', '0', '--spk', spk, '--value', '1000']),
+            ('opret-verify', ['opret-verify', '--psbt-in', psbt, '--index', '0', '--data', 'aa']),
+            ('finalize', ['finalize', '--mode', 'provider', '--psbt-in', psbt, '--psbt-out', os.path.join(td, 'out.psbt'),
+                          '--sig', '00' * 64, '--control', CTRL, '--hash-h', H, '--borrower-pk', PB,
+                          '--csv-blocks', '10', '--provider-pk', PP]),
+        ]
+    return out
+
+
+def _parse_importtime(stderr: str) -> List[Tuple[str, int]]:
+    """Top-level (un-nested) modules with their cumulative import time in us."""
+    rows: List[Tuple[str, int]] = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _self_us, cum_us, name = line[len('import time:'):].split('|')
+        if name.startswith(' ') and not name.startswith('  '):
+            rows.append((name.strip(), int(cum_us)))
+    return rows
+
+
+def run_case(argv: List[str], runs: int) -> Dict[str, Any]:
+    env = dict(os.environ, PYTHONPATH=SRC + os.pathsep + os.environ.get('PYTHONPATH', ''))
+    cmd = [sys.executable, '-X', 'importtime', '-m', 'ssv.cli'] + argv
+    walls: List[float] = []
+    imports: List[Tuple[str, int]] = []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        proc = subprocess.run(cmd, env=env, capture_output=True, text=True)
+        walls.append((time.perf_counter() - t0) * 1e3)
+        imports = _parse_importtime(proc.stderr)
+    return {
+        'wall_ms': statistics.median(walls),
+        'import_ms': sum(us for _n, us in imports) / 1e3,
+        'imports': sorted(imports, key=lambda r: -r[1]),
+    }
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description='Cold-start latency per ssv subcommand')
+    ap.add_argument('--runs', type=int, default=5, help='fresh interpreters per case (median reported)')
+    ap.add_argument('--top', type=int, default=5, help='heaviest top-level imports to list')
+    ap.add_argument('--budget-ms', type=float, help='exit non-zero if any median wall time exceeds this')
+    ap.add_argument('--json', action='store_true', help='print JSON output')
+    args = ap.parse_args()
+
+    results: Dict[str, Dict[str, Any]] = {}
+    with tempfile.TemporaryDirectory() as td:
+        for name, argv in cases(td):
+            res = run_case(argv, args.runs)
+            res['imports'] = res['imports'][:args.top]
+            results[name] = res
+
+    if args.json:
+        print(json.dumps(results))
+    else:
+        for name, res in results.items():
+            top = ', '.join(f'{n} {us / 1e3:.1f}ms' for n, us in res['imports'])
+            print(f"{name:>16}: wall {res['wall_ms']:6.1f} ms  imports {res['import_ms']:6.1f} ms  [{top}]")
+
+    if args.budget_ms is not None:
+        over = [n for n, r in results.items() if r['wall_ms'] > args.budget_ms]
+        if over:
+            print(f"over budget ({args.budget_ms} ms): {', '.join(over)}", file=sys.stderr)
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()